@@ -0,0 +1,55 @@
+'''Contains function used by backend.backend.settings to build postgres
+connection settings from DATABASE_CONNECTION_MODE and DATABASE_PGBOUNCER env vars.
+'''
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+# Supported values of DATABASE_CONNECTION_MODE env var
+CONNECTION_MODES = ('none', 'persistent', 'pool')
+
+
+def get_connection_options(mode, pgbouncer, env):
+    '''Takes connection mode (none, persistent, or pool), bool (True if behind
+    pgbouncer in transaction pooling mode), and dict of env vars. Returns dict
+    of keys to add to DATABASES['default'].
+    Raises ImproperlyConfigured if mode is invalid or pool is not installed.
+    '''
+    if mode not in CONNECTION_MODES:
+        raise ImproperlyConfigured(
+            'DATABASE_CONNECTION_MODE must be none, persistent, or pool'
+        )
+
+    options = {'OPTIONS': {}}
+
+    # Keep connection open between requests, check it is still usable before
+    # reusing (reconnects instead of erroring if closed by server or network)
+    if mode == 'persistent':
+        options['CONN_MAX_AGE'] = int(env.get('DATABASE_CONN_MAX_AGE', 60))
+        options['CONN_HEALTH_CHECKS'] = True
+
+    # Check out connections from psycopg pool shared by all threads in process
+    # (connections are checked before they are handed out)
+    elif mode == 'pool':
+        try:
+            import psycopg_pool  # pylint: disable=import-outside-toplevel,unused-import
+        except ImportError as err:
+            raise ImproperlyConfigured(
+                'DATABASE_CONNECTION_MODE=pool requires psycopg-pool '
+                '(pip install "psycopg[pool]")'
+            ) from err
+        options['CONN_HEALTH_CHECKS'] = True
+        options['OPTIONS']['pool'] = {
+            'min_size': int(env.get('DATABASE_POOL_MIN_SIZE', 2)),
+            'max_size': int(env.get('DATABASE_POOL_MAX_SIZE', 4)),
+            'timeout': int(env.get('DATABASE_POOL_TIMEOUT', 10)),
+        }
+
+    # Transaction pooling hands each transaction to any server connection, so
+    # nothing can outlive a transaction: named cursors (used by iterator()) and
+    # prepared statements (psycopg prepares queries run 5+ times) both break
+    if pgbouncer:
+        options['DISABLE_SERVER_SIDE_CURSORS'] = True
+        options['OPTIONS']['prepare_threshold'] = None
+
+    return options
@@ -18,6 +18,7 @@ from django.core.exceptions import ImproperlyConfigured
 from django.core.management.utils import get_random_secret_key
 
 from .validate_url_prefix import validate_url_prefix
+from .database_options import get_connection_options
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -150,6 +151,24 @@ DATABASES = {
     }
 }
 
+# Read DATABASE_CONNECTION_MODE from env var, or default to none if not present
+# If none a new connection is opened for each request (or celery task) and
+# closed when it finishes
+# If persistent each thread keeps its connection open for DATABASE_CONN_MAX_AGE
+# seconds (checked before it is reused, reconnects if it was closed)
+# If pool each process keeps a psycopg connection pool with between
+# DATABASE_POOL_MIN_SIZE and DATABASE_POOL_MAX_SIZE connections
+DATABASE_CONNECTION_MODE = os.environ.get('DATABASE_CONNECTION_MODE', 'none').lower()
+
+# Read DATABASE_PGBOUNCER from env var, or default to False if not present
+# If True server-side cursors and prepared statements are disabled (required
+# if DATABASE_HOST is pgbouncer in transaction pooling mode)
+DATABASE_PGBOUNCER = os.environ.get('DATABASE_PGBOUNCER', '').lower() == 'true'
+
+DATABASES["default"].update(
+    get_connection_options(DATABASE_CONNECTION_MODE, DATABASE_PGBOUNCER, os.environ)
+)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -172,6 +191,27 @@ CACHES = {
     }
 }
 
+# Read OVERVIEW_STATE_STORAGE from env var, or default to pickle if not present
+# If pickle the whole overview state is stored as a single pickled value
+# If hash each plant and group is stored as a separate field in a redis hash
+# (incremental updates only rewrite the entry that changed)
+# If compact the whole state is stored as a single value with a columnar layout
+# (uses less memory than pickle, see plant_tracker/compact_state.py)
+OVERVIEW_STATE_STORAGE = os.environ.get('OVERVIEW_STATE_STORAGE', 'pickle').lower()
+if OVERVIEW_STATE_STORAGE not in ('pickle', 'hash', 'compact'):
+    raise ImproperlyConfigured('OVERVIEW_STATE_STORAGE must be pickle, hash, or compact')
+
+# Read OVERVIEW_STATE_COMPRESSION from env var, or default to False if not present
+# If True compact overview states are compressed with zlib (only used if
+# OVERVIEW_STATE_STORAGE is compact)
+OVERVIEW_STATE_COMPRESSION = os.environ.get('OVERVIEW_STATE_COMPRESSION', '').lower() == 'true'
+
+# Read OVERVIEW_STATE_LOCAL_CACHE_SIZE from env var, or default to 0 (disabled)
+# If greater than 0 each worker keeps up to this many overview states in memory
+# (invalidated by redis pub/sub, expire after OVERVIEW_STATE_LOCAL_CACHE_TTL)
+OVERVIEW_STATE_LOCAL_CACHE_SIZE = int(os.environ.get('OVERVIEW_STATE_LOCAL_CACHE_SIZE', 0))
+OVERVIEW_STATE_LOCAL_CACHE_TTL = int(os.environ.get('OVERVIEW_STATE_LOCAL_CACHE_TTL', 60))
+
 # Celery settings
 CELERY_BROKER_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}"
 CELERY_RESULT_BACKEND = f"redis://{REDIS_HOST}:{REDIS_PORT}"
@@ -1,8 +1,12 @@
 # pylint: disable=missing-docstring,too-many-lines,R0801
 
+from unittest.mock import patch
+
 from django.test import TestCase
+from django.core.exceptions import ImproperlyConfigured
 
 from .validate_url_prefix import validate_url_prefix
+from .database_options import get_connection_options
 
 
 class ValidateUrlPrefixTests(TestCase):
@@ -96,3 +100,53 @@ class ValidateUrlPrefixTests(TestCase):
         self.assertIsNone(validate_url_prefix('https://website.com/index/'))
         self.assertIsNone(validate_url_prefix('htp://website.com/manage/'))
         self.assertIsNone(validate_url_prefix('http//website.com/manage/'))
+
+
+class DatabaseConnectionOptionsTests(TestCase):
+    def test_default_mode(self):
+        # Should not add any options (new connection per request)
+        self.assertEqual(get_connection_options('none', False, {}), {'OPTIONS': {}})
+
+    def test_persistent_mode(self):
+        # Should keep connections for 60 seconds by default, enable health checks
+        self.assertEqual(
+            get_connection_options('persistent', False, {}),
+            {'OPTIONS': {}, 'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True}
+        )
+
+        # Should read max age from env var
+        options = get_connection_options('persistent', False, {'DATABASE_CONN_MAX_AGE': '300'})
+        self.assertEqual(options['CONN_MAX_AGE'], 300)
+
+    def test_pool_mode(self):
+        # Mock psycopg_pool as installed
+        with patch.dict('sys.modules', {'psycopg_pool': object()}):
+            options = get_connection_options('pool', False, {'DATABASE_POOL_MAX_SIZE': '8'})
+
+        # Should add pool options (default min_size + timeout, max_size from
+        # env var), enable health checks, should not set CONN_MAX_AGE (django
+        # refuses to combine persistent connections with pool)
+        self.assertEqual(
+            options['OPTIONS']['pool'],
+            {'min_size': 2, 'max_size': 8, 'timeout': 10}
+        )
+        self.assertTrue(options['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('CONN_MAX_AGE', options)
+
+    def test_pool_mode_not_installed(self):
+        # Should raise ImproperlyConfigured if psycopg_pool can't be imported
+        with patch.dict('sys.modules', {'psycopg_pool': None}):
+            with self.assertRaises(ImproperlyConfigured):
+                get_connection_options('pool', False, {})
+
+    def test_pgbouncer(self):
+        # Should disable server-side cursors and prepared statements
+        options = get_connection_options('persistent', True, {})
+        self.assertTrue(options['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertIsNone(options['OPTIONS']['prepare_threshold'])
+        self.assertEqual(options['CONN_MAX_AGE'], 60)
+
+    def test_invalid_mode(self):
+        # Should raise ImproperlyConfigured if mode is not recognized
+        with self.assertRaises(ImproperlyConfigured):
+            get_connection_options('pgbouncer', False, {})
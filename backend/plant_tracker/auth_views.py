@@ -2,7 +2,6 @@
 
 from django import forms
 from django.conf import settings
-from django.core.cache import cache
 from django.contrib.auth import views
 from django.contrib.auth import get_user_model
 from django.core.validators import validate_email
@@ -27,7 +26,8 @@ from .view_decorators import (
 )
 from .models import UserEmailVerification
 from .tasks import send_verification_email
-from .get_state_views import get_overview_page_title
+from .get_state_views import update_cached_overview_state_title
+from .state_versions import bump_state_versions
 
 user_model = get_user_model()
 
@@ -385,10 +385,8 @@ def edit_user_details(data, user, **kwargs):
     user.save()
 
     # Update cached overview state title (user's name may have changed)
-    state = cache.get(f'overview_state_{user.pk}')
-    if state:
-        state['title'] = get_overview_page_title(user)
-        cache.set(f'overview_state_{user.pk}', state, None)
+    update_cached_overview_state_title(user)
+    bump_state_versions(user.pk)
 
     return JsonResponse({
         "success": "details updated",
@@ -0,0 +1,164 @@
+'''Compact encoding used by the compact overview state storage layout.
+
+Every plant and group entry in the overview state is a get_details dict with
+the same keys, so pickling the state repeats every key name in every entry.
+The compact encoding stores each section (plants, groups) as a tuple of key
+names followed by a list of values for each key (columnar, key names and the
+uuid dict keys are only stored once per section).
+
+Values are also shrunk where this does not lose anything:
+- UTC ISO timestamps are stored as integer microseconds since the epoch
+- Thumbnail URLs are stored relative to the media storage URL
+- Plant group details ({name, uuid} dicts) are stored as tuples
+
+The result is pickled and compressed with zlib if the OVERVIEW_STATE_COMPRESSION
+setting is enabled. Decoding always restores exactly the same state dict (same
+keys, values, and order), anything that can't be encoded losslessly (eg entries
+with different keys) is stored unchanged.
+'''
+
+import zlib
+import pickle
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+# First byte of encoded value (identifies format, detects old pickled values)
+RAW_HEADER = b'c'
+COMPRESSED_HEADER = b'z'
+
+# Keys in overview state that contain plant and group get_details dicts
+SECTION_KEYS = ('plants', 'groups')
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _decode_timestamp(value):
+    if isinstance(value, int):
+        return (_EPOCH + timedelta(microseconds=value)).isoformat()
+    return value
+
+
+def _encode_timestamp(value):
+    '''Takes ISO timestamp string, returns microseconds since epoch (or
+    unchanged value if not a UTC timestamp that decodes to the same string).
+    '''
+    if not isinstance(value, str):
+        return value
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if timestamp.utcoffset() != timedelta(0):
+        return value
+    microseconds = (timestamp - _EPOCH) // timedelta(microseconds=1)
+    if _decode_timestamp(microseconds) != value:
+        return value
+    return microseconds
+
+
+def _encode_group(value):
+    if isinstance(value, dict) and tuple(value) == ('name', 'uuid'):
+        return (value['name'], value['uuid'])
+    return value
+
+
+def _decode_group(value):
+    if isinstance(value, tuple):
+        return {'name': value[0], 'uuid': value[1]}
+    return value
+
+
+def _get_column_codecs():
+    '''Returns dict with get_details keys as keys and (encode, decode) function
+    tuples as values (keys not in dict are stored unchanged).
+    '''
+    media_url = default_storage.url('')
+
+    # Store path relative to media URL, wrap other URLs in tuple (not relative)
+    def encode_thumbnail(url):
+        if isinstance(url, str) and url.startswith(media_url):
+            return url[len(media_url):]
+        return None if url is None else (url,)
+
+    def decode_thumbnail(path):
+        if isinstance(path, tuple):
+            return path[0]
+        return None if path is None else media_url + path
+
+    timestamp_codec = (_encode_timestamp, _decode_timestamp)
+    return {
+        'created': timestamp_codec,
+        'last_watered': timestamp_codec,
+        'last_fertilized': timestamp_codec,
+        'thumbnail': (encode_thumbnail, decode_thumbnail),
+        'group': (_encode_group, _decode_group),
+    }
+
+
+def _encode_section(entries, codecs):
+    '''Takes dict with uuids as keys and details dicts as values, returns
+    (keys, columns) tuple (or unchanged dict if entries have different keys).
+    '''
+    keys = tuple(next(iter(entries.values()), {}))
+    for uuid, details in entries.items():
+        if tuple(details) != keys or details.get('uuid') != uuid:
+            return entries
+
+    columns = []
+    for key in keys:
+        values = [details[key] for details in entries.values()]
+        if key in codecs:
+            values = [codecs[key][0](value) for value in values]
+        columns.append(values)
+    return (keys, columns)
+
+
+def _decode_section(section, codecs):
+    if isinstance(section, dict):
+        return section
+
+    keys, columns = section
+    columns = [
+        [codecs[key][1](value) for value in values] if key in codecs else values
+        for key, values in zip(keys, columns)
+    ]
+    entries = (dict(zip(keys, values)) for values in zip(*columns))
+    return {details['uuid']: details for details in entries}
+
+
+def encode_state(state, compress=None):
+    '''Takes overview state dict, returns compact encoded bytes. Compresses if
+    compress arg is True (defaults to OVERVIEW_STATE_COMPRESSION setting).
+    '''
+    codecs = _get_column_codecs()
+    encoded = {
+        key: _encode_section(value, codecs) if key in SECTION_KEYS else value
+        for key, value in state.items()
+    }
+    value = pickle.dumps(encoded, protocol=pickle.HIGHEST_PROTOCOL)
+
+    if compress is None:
+        compress = settings.OVERVIEW_STATE_COMPRESSION
+    if compress:
+        return COMPRESSED_HEADER + zlib.compress(value)
+    return RAW_HEADER + value
+
+
+def decode_state(value):
+    '''Takes bytes returned by encode_state, returns overview state dict.
+    Returns None if value was not encoded by encode_state (eg pickled by
+    another storage layout before OVERVIEW_STATE_STORAGE was changed).
+    '''
+    header, value = value[:1], value[1:]
+    if header == COMPRESSED_HEADER:
+        value = zlib.decompress(value)
+    elif header != RAW_HEADER:
+        return None
+
+    codecs = _get_column_codecs()
+    return {
+        key: _decode_section(section, codecs) if key in SECTION_KEYS else section
+        for key, section in pickle.loads(value).items()
+    }
@@ -0,0 +1,61 @@
+'''Per-process database connection statistics exposed for monitoring.
+
+Counts requests served and connection setups (new connections, or checkouts
+from the pool if DATABASE_CONNECTION_MODE is pool) made by this process since it
+started. With the default mode there is one connection setup per request, the
+ratio shows how often persistent or pooled connections are reused.
+
+If DATABASE_CONNECTION_MODE is pool the psycopg pool statistics are included
+(pool size, available connections, requests waiting for a connection, time
+spent waiting, connection errors, etc).
+
+Each gunicorn worker has its own counters (and pool), the stats include the
+process ID so responses from different workers can be told apart.
+'''
+
+import os
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.core.signals import request_finished
+from django.db.backends.signals import connection_created
+
+_lock = threading.Lock()
+_counters = {'requests': 0, 'connection_setups': 0}
+
+
+def _increment(name):
+    with _lock:
+        _counters[name] += 1
+
+
+def count_request(**kwargs):
+    '''Signal receiver called when each request finishes.'''
+    _increment('requests')
+
+
+def count_connection_setup(**kwargs):
+    '''Signal receiver called when each database connection is set up.'''
+    _increment('connection_setups')
+
+
+request_finished.connect(count_request, dispatch_uid='count_request')
+connection_created.connect(count_connection_setup, dispatch_uid='count_connection_setup')
+
+
+def get_connection_stats():
+    '''Returns dict with process ID, connection settings, request and connection
+    setup counters, and psycopg pool statistics (None unless using pool).
+    '''
+    with _lock:
+        stats = {
+            'pid': os.getpid(),
+            'connection_mode': settings.DATABASE_CONNECTION_MODE,
+            'pgbouncer': settings.DATABASE_PGBOUNCER,
+            **_counters,
+            'pool': None
+        }
+    if 'pool' in connection.settings_dict['OPTIONS']:
+        stats['pool'] = connection.pool.get_stats()
+    return stats
@@ -3,6 +3,11 @@
 import fakeredis
 from django_redis.client import DefaultClient
 
+# In-memory server shared by all clients (django creates a separate cache
+# client for each thread, all threads should see the same data like real redis)
+FAKE_SERVER = fakeredis.FakeServer()
+
+
 class FakeRedisClient(DefaultClient):
     '''Mock client used to run unit tests without a redis server.'''
 
@@ -11,9 +16,8 @@ class FakeRedisClient(DefaultClient):
     def get_client(self, write=True, tried=None, show_index=False):
         '''Returns fakeredis client instead of real client.'''
         if self._client is None:
-            # Make a new in-memory FakeStrictRedis instance
-            fake_server = fakeredis.FakeServer()
-            self._client = fakeredis.FakeStrictRedis(server=fake_server)
+            # Make a new FakeStrictRedis instance connected to shared server
+            self._client = fakeredis.FakeStrictRedis(server=FAKE_SERVER)
 
         if show_index:
             return self._client, 0
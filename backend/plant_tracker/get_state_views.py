@@ -1,7 +1,8 @@
 '''Views that return initial states for frontend react apps.
 
 Contains functions that build states and extra functions to get cached overview
-state and incrementally update it (called by API views that update database).
+and manage page states and incrementally update them (called by API views that
+update database).
 
 Building the overview state on each request can add >50ms to page load, but
 loading from cache is practically instant and incremental updates typically
@@ -9,15 +10,93 @@ take <1ms, so this is much more efficient in most scenarios (especially when
 user goes back to overview after each plant).
 '''
 
+import json
+from datetime import datetime, timedelta, timezone
+from contextvars import ContextVar
+from contextlib import contextmanager
+
 from django.conf import settings
-from django.core.cache import cache
-from django.http import JsonResponse
-from django.db.models import Prefetch
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch, Q, OuterRef, Subquery
 from django.core.exceptions import ValidationError
-
-from .models import Plant, Group
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from .models import (
+    UUID,
+    Plant,
+    Group,
+    Photo,
+    PlantEvent,
+    NoteEvent,
+    DetailsChangedEvent
+)
 from .plant_species_options import PLANT_SPECIES_OPTIONS
-from .view_decorators import get_user_token, find_model_type
+from .view_decorators import get_user_token
+from .state_cache import (
+    get_overview_state_storage,
+    ManagePlantStateStorage,
+    ManageGroupStateStorage
+)
+from .local_state_cache import get_local_state_cache
+from .state_versions import (
+    get_display_names_version,
+    get_overview_etag,
+    get_manage_plant_etag,
+    get_manage_group_etag
+)
+
+
+# Keys in manage_plant state that are cached by get_manage_plant_state (slow to
+# query, updated incrementally), all other keys are queried on every request
+CACHED_MANAGE_PLANT_STATE_KEYS = ('photos', 'change_events', 'events', 'notes')
+
+# Max seconds a request waits for another worker to finish building a missing
+# overview state (builds it too if the other worker takes longer)
+OVERVIEW_REBUILD_WAIT = 5
+
+# Default and max number of entries returned by /get_overview_state_page
+OVERVIEW_PAGE_SIZE = 500
+MAX_OVERVIEW_PAGE_SIZE = 2000
+
+# Number of rows fetched from the database at a time by /stream_overview_state
+OVERVIEW_STREAM_CHUNK_SIZE = 500
+
+# Max number of days of event and note history that can be requested with the
+# /get_manage_state history_days querystring parameter
+MAX_MANAGE_PLANT_HISTORY_DAYS = 36500
+
+# Default and max number of photos returned by /get_plant_photos (max also
+# applies to the /get_manage_state photo_limit querystring parameter)
+PHOTO_PAGE_SIZE = 100
+MAX_PHOTO_PAGE_SIZE = 500
+
+
+class StaleOverviewState(dict):
+    '''Overview state dict returned by build_overview_state_once when it serves
+    the last deleted copy of the state while another worker rebuilds it (may be
+    missing changes). Must not be sent with the current ETag.
+    '''
+
+
+def build_manage_plant_details(plant):
+    '''Takes plant, returns dict with all manage_plant state keys that are not
+    cached (plant details, default photo, and details of related plants, which
+    can change when other plants or groups are edited).
+
+    Plant should be queried with
+    Plant.objects.get_with_manage_plant_details_annotation (or full annotation).
+    '''
+    return {
+        'plant_details': plant.get_details(),
+        'default_photo': plant.default_photo_details,
+        # Add object with DivisionEvent timestamps as keys, list of child plant
+        # objects as values (adds events to timeline with links to children)
+        'division_events': plant.get_division_event_details(),
+        # Add object with parent plant details if divided from existing plant
+        'divided_from': plant.get_parent_plant_details()
+    }
 
 
 def build_manage_plant_state(plant):
@@ -27,20 +106,12 @@ def build_manage_plant_state(plant):
     to annotate all data used (much more efficient, avoids dozens of queries).
     '''
 
-    state = {
-        'plant_details': plant.get_details(),
-        'photos': plant.get_photos(),
-        'default_photo': plant.default_photo_details,
-        'change_events': plant.get_change_events()
-    }
+    state = build_manage_plant_details(plant)
+    state['photos'] = plant.get_photos()
+    state['change_events'] = plant.get_change_events()
 
     # Add all water, fertilize, prune, and repot timestamps
-    state['events'] = {
-        'water': [e.isoformat() for e in plant.water_timestamps],
-        'fertilize': [e.isoformat() for e in plant.fertilize_timestamps],
-        'prune': [e.isoformat() for e in plant.prune_timestamps],
-        'repot': [e.isoformat() for e in plant.repot_timestamps],
-    }
+    state['events'] = plant.get_event_timestamps()
 
     # Add notes dict with timestamps as keys and text as values
     state['notes'] = {
@@ -48,14 +119,173 @@ def build_manage_plant_state(plant):
         for note in plant.noteevent_set.all()
     }
 
-    # Add object with DivisionEvent timestamps as keys, list of child plant
-    # objects as values (adds events to timeline with links to children)
-    state['division_events'] = plant.get_division_event_details()
+    return state
 
-    # Add object with parent plant details if divided from existing plant
-    state['divided_from'] = plant.get_parent_plant_details()
 
-    return state
+def get_manage_plant_state(uuid, plant_pk):
+    '''Takes plant uuid and primary key, returns manage_plant state.
+
+    Loads event history, photos, notes, and change_events from cache if present
+    and queries everything else (1 query plus names of related plants). Builds
+    full state from database and caches if not found.
+    '''
+    storage = ManagePlantStateStorage()
+    cached_state = storage.load(plant_pk)
+    if cached_state is None:
+        state = build_manage_plant_state(
+            Plant.objects.get_with_manage_plant_annotation(uuid)
+        )
+        storage.save(plant_pk, {
+            key: state[key] for key in CACHED_MANAGE_PLANT_STATE_KEYS
+        })
+        return state
+
+    return dict(
+        build_manage_plant_details(
+            Plant.objects.get_with_manage_plant_details_annotation(uuid)
+        ),
+        **cached_state
+    )
+
+
+def get_history_window_start(history_days):
+    '''Takes number of days, returns UTC datetime at start of the day N days
+    before the current day (start of the recent history window).
+    '''
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=history_days)
+
+
+def window_manage_plant_history(state, history_days):
+    '''Takes manage_plant state and number of days, returns copy with only the
+    water, fertilize, prune, and repot events and notes from the last N days.
+
+    Adds history key with start (ISO timestamp, older events and notes can be
+    requested from /get_plant_history) and counts (dict with year keys, dict
+    with number of events of each type and notes in the year as values,
+    includes years before start).
+    '''
+    start = get_history_window_start(history_days).isoformat()
+
+    # Count events and notes in each year (all timestamps in state are UTC ISO
+    # strings, compare as strings and use first 4 characters as year)
+    template = {event_type: 0 for event_type in state['events']}
+    template['notes'] = 0
+    counts = {}
+    for event_type, timestamps in state['events'].items():
+        for timestamp in timestamps:
+            counts.setdefault(timestamp[:4], dict(template))[event_type] += 1
+    for timestamp in state['notes']:
+        counts.setdefault(timestamp[:4], dict(template))['notes'] += 1
+
+    return dict(
+        state,
+        events={
+            event_type: [timestamp for timestamp in timestamps if timestamp >= start]
+            for event_type, timestamps in state['events'].items()
+        },
+        notes={
+            timestamp: text for timestamp, text in state['notes'].items()
+            if timestamp >= start
+        },
+        history={
+            'start': start,
+            'counts': dict(sorted(counts.items(), reverse=True))
+        }
+    )
+
+
+def limit_manage_plant_photos(state, photo_limit):
+    '''Takes manage_plant state and max number of photos, returns copy with
+    only the newest N photos (by timestamp, then primary key).
+
+    Adds photo_count (total number of photos) and photos_next_cursor (cursor
+    for /get_plant_photos to request the next older page, None if the state
+    contains all photos).
+    '''
+    newest = sorted(
+        state['photos'].values(),
+        key=lambda photo: (photo['timestamp'], photo['key']),
+        reverse=True
+    )
+    return dict(
+        state,
+        photos={photo['key']: photo for photo in newest[:photo_limit]},
+        photo_count=len(newest),
+        photos_next_cursor=(
+            encode_keyset_cursor(
+                datetime.fromisoformat(newest[photo_limit - 1]['timestamp']),
+                newest[photo_limit - 1]['key']
+            )
+            if 0 < photo_limit < len(newest) else
+            # Limit 0: first page of /get_plant_photos starts at newest photo
+            None
+        )
+    )
+
+
+def get_plant_photos_page_dict(plant_pk, cursor=None, limit=PHOTO_PAGE_SIZE):
+    '''Takes plant primary key, optional cursor returned by previous page (or
+    by limit_manage_plant_photos), and optional max number of photos.
+
+    Returns dict with photos (same format as manage_plant state photos, newest
+    first) and next_cursor (None if this is the last page). Queries database
+    with keyset pagination on (timestamp, pk), served by the plant, timestamp
+    descending index on Photo (does not scan older photos).
+    '''
+    queryset = Photo.objects.filter(plant_id=plant_pk).order_by('-timestamp', '-pk')
+    if cursor is not None:
+        timestamp, pk = decode_keyset_cursor(cursor)
+        queryset = queryset.filter(
+            Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, pk__lt=pk)
+        )
+
+    # Query 1 extra photo to check if there is another page
+    photos = list(queryset[:limit + 1])
+    return {
+        'photos': {
+            photo.pk: photo.get_details()
+            for photo in photos[:limit]
+        },
+        'next_cursor': (
+            encode_keyset_cursor(photos[limit - 1].timestamp, photos[limit - 1].pk)
+            if len(photos) > limit else None
+        )
+    }
+
+
+def get_plant_history_dict(plant_pk, start, end):
+    '''Takes plant primary key and start and end datetimes, returns dict with
+    events key (same format as manage_plant state events) and notes key (same
+    format as manage_plant state notes) containing everything from start up to
+    but not including end. Makes 2 queries (index range scans on plant and
+    timestamp, 1 for all event types and 1 for notes).
+    '''
+    events = {event_type: [] for event_type in PlantEvent.Type.values}
+    for event_type, timestamp in (
+        PlantEvent.objects
+            .filter(plant_id=plant_pk, timestamp__gte=start, timestamp__lt=end)
+            .order_by('-timestamp')
+            .values_list('type', 'timestamp')
+    ):
+        events[event_type].append(timestamp.isoformat())
+
+    notes = {
+        timestamp.isoformat(): text
+        for timestamp, text in (
+            NoteEvent.objects
+                .filter(plant_id=plant_pk, timestamp__gte=start, timestamp__lt=end)
+                .order_by('-timestamp')
+                .values_list('timestamp', 'text')
+        )
+    }
+
+    return {
+        'events': events,
+        'notes': notes,
+        'start': start.isoformat(),
+        'end': end.isoformat()
+    }
 
 
 def build_manage_group_state(group):
@@ -79,6 +309,37 @@ def build_manage_group_state(group):
     }
 
 
+def get_manage_group_state(uuid, group_pk, user_pk):
+    '''Takes group uuid, group primary key, and user primary key, returns
+    manage_group state.
+
+    Loads plant details from cache if present and queries group details (1
+    query). Builds full state from database and caches if not found, or if
+    cached state is older than the last time unnamed plants were renumbered.
+    '''
+    storage = ManageGroupStateStorage()
+    # Get version before querying (state is discarded if renumbered after)
+    display_names_version = get_display_names_version(user_pk)
+    group = Group.objects.get_with_manage_group_annotation(uuid)
+    cached_state = storage.load(group_pk)
+    if cached_state is None or cached_state['display_names'] != display_names_version:
+        state = build_manage_group_state(group)
+        storage.save(group_pk, {
+            'plants': state['plants'],
+            'display_names': display_names_version
+        })
+        return state
+
+    # Overwrite group name and uuid in plant details (may have changed)
+    group_details = {'name': group.display_name, 'uuid': str(group.uuid)}
+    for plant_details in cached_state['plants'].values():
+        plant_details['group'] = group_details
+    return {
+        'group_details': group.get_details(),
+        'plants': cached_state['plants']
+    }
+
+
 def has_archived_entries(user_id):
     '''Takes user_id, returns True if user has at least 1 archived plant or group.'''
     plant_queryset = (
@@ -101,6 +362,29 @@ def get_overview_page_title(user):
     return "Plant Overview"
 
 
+def get_overview_querysets(user, archived=False):
+    '''Takes user and optional archived bool, returns tuple with plants and
+    groups querysets containing all entries in the overview state (archived
+    overview state if archived is True) with all annotations used by
+    get_details, ordered by creation time.
+    '''
+    groups = Group.objects.filter(
+        user_id=user.pk,
+        archived=archived
+    ).with_overview_annotation()
+
+    plants = (
+        Plant.objects
+            .filter(user_id=user.pk, archived=archived)
+            .with_overview_annotation()
+            # Prefetch Group entry if plant is in a group (copy from annotated
+            # group queryset above, avoids extra queries)
+            .prefetch_related(Prefetch('group', queryset=groups))
+    )
+
+    return plants, groups
+
+
 def build_overview_state(user, archived=False):
     '''Takes user, builds state parsed by overview page and returns.
 
@@ -108,7 +392,8 @@ def build_overview_state(user, archived=False):
     non-archived plants and groups owned by user) and caches.
 
     If archived arg is True builds archive overview page (contains all archived
-    plants and groups owned by user), does not cache.
+    plants and groups owned by user) and caches. Returns None if user has no
+    archived plants or groups (not cached).
     '''
 
     # Only show link to archived overview if at least 1 archived plant or group
@@ -118,19 +403,7 @@ def build_overview_state(user, archived=False):
     if archived and not show_archive:
         return None
 
-    groups = Group.objects.filter(
-        user_id=user.pk,
-        archived=archived
-    ).with_overview_annotation()
-
-    plants = (
-        Plant.objects
-            .filter(user_id=user.pk, archived=archived)
-            .with_overview_annotation()
-            # Prefetch Group entry if plant is in a group (copy from annotated
-            # group queryset above, avoids extra queries)
-            .prefetch_related(Prefetch('group', queryset=groups))
-    )
+    plants, groups = get_overview_querysets(user, archived)
 
     state = {
         'plants': {
@@ -146,103 +419,828 @@ def build_overview_state(user, archived=False):
     }
 
     # Cache state indefinitely (updates automatically when database changes)
-    if not archived:
-        cache.set(f'overview_state_{user.pk}', state, None)
+    get_overview_state_storage(archived).save(user.pk, state)
 
     return state
 
 
+def _build_overview_state_locked(user, token, archived=False, operations=()):
+    '''Takes user, rebuild lock token, optional archived bool, and optional
+    list of storage operations. Builds overview state, applies operations and
+    all pending operations added by other workers while it was built, then
+    releases rebuild lock. Returns state.
+    '''
+    storage = get_overview_state_storage(archived)
+    try:
+        state = build_overview_state(user, archived)
+        operations = [*operations, *storage.pop_pending(user.pk)]
+        if operations and storage.apply_batch(user.pk, operations):
+            state = storage.load(user.pk)
+        return state
+    finally:
+        storage.release_rebuild_lock(user.pk, token)
+
+
+def build_overview_state_once(user, archived=False):
+    '''Takes user and optional archived bool, builds overview state and
+    returns it unless another worker is already building it (single-flight).
+
+    If another worker is building the state returns the stale copy of the
+    state if it was deleted recently (as StaleOverviewState), otherwise waits
+    for the other worker to finish (up to OVERVIEW_REBUILD_WAIT seconds) and
+    returns the state it built.
+    '''
+    storage = get_overview_state_storage(archived)
+    token = storage.acquire_rebuild_lock(user.pk)
+    if token is None:
+        state = storage.load_stale(user.pk)
+        if state is not None:
+            return StaleOverviewState(state)
+        if storage.wait_for_rebuild(user.pk, OVERVIEW_REBUILD_WAIT):
+            state = storage.load(user.pk)
+            if state is not None:
+                return state
+        # Build without lock if other worker failed or is taking too long
+        token = storage.acquire_rebuild_lock(user.pk)
+        if token is None:
+            return build_overview_state(user, archived)
+    return _build_overview_state_locked(user, token, archived)
+
+
 def get_overview_state(user):
     '''Takes user, returns state object parsed by the overview page react app.
     Loads state from cache if present, builds from database if not found.
     '''
-    state = cache.get(f'overview_state_{user.pk}')
+    state = get_overview_state_storage().load(user.pk)
     if state is None:
-        state = build_overview_state(user)
+        state = build_overview_state_once(user)
     return state
 
 
-def get_overview_state_from_instance(instance):
-    '''Takes plant or group, returns overview state for user that owns entry.
-    Loads state from cache if present, builds from database if not found.
+def get_archived_overview_state_dict(user):
+    '''Takes user, returns state object parsed by the archived overview page
+    react app (None if user has no archived plants or groups). Loads state from
+    cache if present, builds from database if not found.
     '''
-    state = cache.get(f'overview_state_{instance.user_id}')
+    state = get_overview_state_storage(archived=True).load(user.pk)
     if state is None:
-        state = build_overview_state(instance.user)
+        state = build_overview_state_once(user, archived=True)
     return state
 
 
+def get_overview_state_changes_dict(user, since):
+    '''Takes user and overview change log version received by client earlier.
+
+    Returns dict with current version, full=False, plants and groups dicts
+    containing details of each entry that was added or changed since client
+    version, removed dict with lists of plant and group uuids that were removed,
+    and current show_archive and title values.
+
+    If version is too old (changes no longer in log) or the overview state is
+    not cached returns dict with current version, full=True, and full state.
+    '''
+    storage = get_overview_state_storage()
+    # Get version before loading entries (any change made after is sent again
+    # next time, never missed)
+    version, fields = storage.load_changes(user.pk, since)
+    if fields is not None:
+        entries = storage.load_entries(user.pk, fields)
+        if entries is not None:
+            entries['removed'] = {'plants': [], 'groups': []}
+            for field in dict.fromkeys(fields):
+                key, uuid = field.split(':', 1)
+                if uuid not in entries[key]:
+                    entries['removed'][key].append(uuid)
+            return {'version': version, 'full': False, **entries}
+
+    state = storage.load(user.pk)
+    if state is None:
+        # Building resets change log, get new version after building (stale
+        # state returned while another worker builds is older than version,
+        # client receives full state again on next request)
+        state = build_overview_state_once(user)
+        version = storage.load_changes(user.pk, since)[0]
+    return {'version': version, 'full': True, 'state': state}
+
+
+def get_overview_state_json(user):
+    '''Takes user, returns tuple with overview state as JSON bytes (same as
+    JsonResponse) and bool that is True if the JSON contains a stale copy of
+    the state (see build_overview_state_once, never cached).
+    Loads cached JSON if present, serializes cached state and caches if not.
+    '''
+    storage = get_overview_state_storage()
+    state_json = storage.load_json(user.pk)
+    if state_json is not None:
+        return state_json, False
+
+    stale = False
+
+    def serialize():
+        nonlocal stale
+        state = get_overview_state(user)
+        stale = isinstance(state, StaleOverviewState)
+        return json.dumps(state, cls=DjangoJSONEncoder).encode()
+
+    return storage.cache_json(user.pk, serialize), stale
+
+
+def encode_keyset_cursor(timestamp, pk):
+    '''Takes datetime and primary key of last entry on a page, returns cursor
+    string for the next page (microseconds since epoch and primary key).
+    '''
+    timestamp = (timestamp - datetime(1970, 1, 1, tzinfo=timezone.utc))
+    return f'{timestamp // timedelta(microseconds=1)}_{pk}'
+
+
+def decode_keyset_cursor(cursor):
+    '''Takes cursor string returned by encode_keyset_cursor, returns tuple
+    with timestamp and primary key. Raises ValueError if invalid.
+    '''
+    timestamp, pk = cursor.split('_')
+    return (
+        datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(microseconds=int(timestamp)),
+        int(pk)
+    )
+
+
+def encode_overview_page_cursor(instance):
+    '''Takes Plant or Group, returns cursor string for the next overview page
+    (created timestamp and primary key).
+    '''
+    return encode_keyset_cursor(instance.created, instance.pk)
+
+
+def decode_overview_page_cursor(cursor):
+    '''Takes cursor string returned by encode_overview_page_cursor, returns
+    tuple with created timestamp and primary key. Raises ValueError if invalid.
+    '''
+    return decode_keyset_cursor(cursor)
+
+
+def get_overview_state_page_dict(user, key, cursor=None, limit=OVERVIEW_PAGE_SIZE):
+    '''Takes user, overview state key (plants or groups), optional cursor
+    returned by previous page, and optional max number of entries.
+
+    Returns dict with key (plants or groups), entries (dict with uuids as keys
+    and get_details dicts as values, same as overview state), and next_cursor
+    (None if this is the last page). The first page (no cursor) also contains
+    show_archive and title.
+
+    Queries database directly with keyset pagination on (created, pk), does not
+    build or cache the full overview state (used for very large collections).
+    '''
+    plants, groups = get_overview_querysets(user)
+    queryset = (plants if key == 'plants' else groups).order_by('created', 'pk')
+    if cursor is not None:
+        created, pk = decode_overview_page_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created__gt=created) | Q(created=created, pk__gt=pk)
+        )
+
+    # Query 1 extra entry to check if there is another page
+    entries = list(queryset[:limit + 1])
+    page = {
+        'key': key,
+        'entries': {
+            str(entry.uuid): entry.get_details()
+            for entry in entries[:limit]
+        },
+        'next_cursor': (
+            encode_overview_page_cursor(entries[limit - 1])
+            if len(entries) > limit else None
+        )
+    }
+    if cursor is None:
+        page['show_archive'] = has_archived_entries(user.pk)
+        page['title'] = get_overview_page_title(user)
+    return page
+
+
+def _stream_overview_entries(queryset):
+    '''Takes plants or groups queryset, yields JSON bytes containing comma
+    separated "uuid": details pairs (one chunk per OVERVIEW_STREAM_CHUNK_SIZE
+    entries, only that many model instances are in memory at once).
+    '''
+    chunk = []
+    separator = b''
+    for entry in queryset.iterator(chunk_size=OVERVIEW_STREAM_CHUNK_SIZE):
+        chunk.append(
+            json.dumps(str(entry.uuid)) + ': ' +
+            json.dumps(entry.get_details(), cls=DjangoJSONEncoder)
+        )
+        if len(chunk) >= OVERVIEW_STREAM_CHUNK_SIZE:
+            yield separator + ', '.join(chunk).encode()
+            separator = b', '
+            chunk = []
+    if chunk:
+        yield separator + ', '.join(chunk).encode()
+
+
+def stream_overview_state_json(user):
+    '''Takes user, yields overview state JSON bytes in chunks while plants and
+    groups are queried (same JSON as get_overview_state_json). Does not load or
+    build the cached state, so memory use does not grow with collection size.
+    '''
+    plants, groups = get_overview_querysets(user)
+    yield b'{"plants": {'
+    yield from _stream_overview_entries(plants)
+    yield b'}, "groups": {'
+    yield from _stream_overview_entries(groups)
+    yield (
+        '}, "show_archive": ' + json.dumps(has_archived_entries(user.pk)) +
+        ', "title": ' + json.dumps(get_overview_page_title(user)) + '}'
+    ).encode()
+
+
 def get_instance_overview_state_key(instance):
     '''Returns overview state key for a Plant (plants) or Group (groups).'''
     return f'{instance._meta.model_name}s'
 
 
+# Buffered cached overview state updates while inside overview_state_batch
+# block (dict with (user primary key, archived bool) tuples as keys, tuple with
+# function that returns user and list of storage operations as values), None
+# outside block
+_overview_state_batch = ContextVar('overview_state_batch', default=None)
+
+# Buffered cached manage_group state updates while inside overview_state_batch
+# block (dict with group primary keys as keys, lists of storage operations as
+# values), None outside block
+_manage_group_state_batch = ContextVar('manage_group_state_batch', default=None)
+
+
+def _apply_overview_state_operations(user_pk, get_user, operations, archived=False):
+    '''Takes user primary key, function that returns user, list of storage
+    operations (see apply_batch), and optional archived bool. Applies all
+    operations to cached overview state (archived overview state if archived is
+    True) in a single transaction. If user does not have a cached main overview
+    state builds from database first (includes changes), then applies
+    operations again (archived state is not built until requested).
+
+    If another worker is already building the main overview state it may have
+    queried the database before these changes were written, so operations are
+    added to the pending placeholder (applied by the other worker when it
+    finishes) instead of building the state again.
+    '''
+    storage = get_overview_state_storage(archived)
+    if storage.apply_batch(user_pk, operations) or archived:
+        return
+    token = storage.acquire_rebuild_lock(user_pk)
+    if token is not None:
+        _build_overview_state_locked(get_user(), token, operations=operations)
+    else:
+        storage.add_pending(user_pk, operations)
+        # Apply now in case other worker finished before placeholder was added
+        # (operations overwrite values, applying twice has the same result)
+        storage.apply_batch(user_pk, operations)
+
+
+def _update_cached_overview_state(user_pk, get_user, *operation, archived=False):
+    '''Takes user primary key, function that returns user, storage method
+    name, and args for storage method. Updates cached overview state of user
+    (archived overview state if archived kwarg is True) immediately, or buffers
+    update until the end of overview_state_batch block.
+    '''
+    batch = _overview_state_batch.get()
+    if batch is not None:
+        batch.setdefault((user_pk, archived), (get_user, []))[1].append(operation)
+    else:
+        _apply_overview_state_operations(user_pk, get_user, [operation], archived)
+
+
+@contextmanager
+def overview_state_batch():
+    '''Context manager that buffers all cached overview state updates made in
+    the block and writes them in a single transaction per user when it exits
+    (one redis round trip instead of one per plant in bulk endpoints). Cached
+    manage_group state updates are also buffered (single transaction for all).
+
+    Block should contain the database writes as well as the cache updates, so
+    the state is built with the new data if it was not cached. If an exception
+    is raised the buffered updates are discarded and cached state is deleted
+    (rebuilt from database on next request).
+    '''
+    # Nested block: updates are written when outer block exits
+    if _overview_state_batch.get() is not None:
+        yield
+        return
+
+    batch = {}
+    group_batch = {}
+    token = _overview_state_batch.set(batch)
+    group_token = _manage_group_state_batch.set(group_batch)
+    try:
+        yield
+    except BaseException:
+        for user_pk, archived in batch:
+            get_overview_state_storage(archived).delete(user_pk)
+        ManageGroupStateStorage().delete(list(group_batch))
+        raise
+    finally:
+        _overview_state_batch.reset(token)
+        _manage_group_state_batch.reset(group_token)
+
+    for (user_pk, archived), (get_user, operations) in batch.items():
+        _apply_overview_state_operations(user_pk, get_user, operations, archived)
+    ManageGroupStateStorage().apply_batch(group_batch)
+
+
 def update_cached_overview_details_keys(instance, update_dict):
     '''Updates keys in Plant or Group get_details dict in cached overview state.
 
     Takes Plant or Group entry and dict with one or more keys from get_details
-    dict and new values, writes new values to cached overview state.
+    dict and new values, writes new values to cached overview state (archived
+    overview state if entry is archived). If Plant is in a group also writes
+    new values to cached manage_group state (same dict).
 
     Cannot use to add new entries to cached state (only updates if uuid exists).
     '''
-    state = get_overview_state_from_instance(instance)
-    key = get_instance_overview_state_key(instance)
-    if str(instance.uuid) in state[key]:
-        state[key][str(instance.uuid)].update(update_dict)
-        cache.set(f'overview_state_{instance.user_id}', state, None)
+    if isinstance(instance, Plant):
+        update_cached_manage_group_details_keys(instance, update_dict)
+    _update_cached_overview_state(
+        instance.user_id,
+        lambda: instance.user,
+        'update_entry',
+        get_instance_overview_state_key(instance),
+        str(instance.uuid),
+        update_dict,
+        archived=instance.archived
+    )
 
 
 def add_instance_to_cached_overview_state(instance):
-    '''Takes plant or group entry, adds details to cached overview state.
-    If entry is archived removes from cached overview state.
+    '''Takes plant or group entry, adds details to cached overview state and
+    removes from cached archived overview state. If entry is archived removes
+    from cached overview state and adds to cached archived overview state (only
+    if it exists, details are not built otherwise).
     '''
     if instance.archived:
-        remove_instance_from_cached_overview_state(instance)
+        _update_cached_overview_state(
+            instance.user_id,
+            lambda: instance.user,
+            'delete_entry',
+            get_instance_overview_state_key(instance),
+            str(instance.uuid)
+        )
+        if get_overview_state_storage(archived=True).exists(instance.user_id):
+            _update_cached_overview_state(
+                instance.user_id,
+                lambda: instance.user,
+                'set_entry',
+                get_instance_overview_state_key(instance),
+                str(instance.uuid),
+                instance.get_details(),
+                archived=True
+            )
     else:
-        key = get_instance_overview_state_key(instance)
-        state = get_overview_state_from_instance(instance)
-        state[key][str(instance.uuid)] = instance.get_details()
-        cache.set(f'overview_state_{instance.user_id}', state, None)
+        _update_cached_overview_state(
+            instance.user_id,
+            lambda: instance.user,
+            'set_entry',
+            get_instance_overview_state_key(instance),
+            str(instance.uuid),
+            instance.get_details()
+        )
+        _update_cached_overview_state(
+            instance.user_id,
+            lambda: instance.user,
+            'delete_entry',
+            get_instance_overview_state_key(instance),
+            str(instance.uuid),
+            archived=True
+        )
 
 
 def remove_instance_from_cached_overview_state(instance):
-    '''Takes plant or group entry, removes from cached overview state.'''
-    key = get_instance_overview_state_key(instance)
-    state = get_overview_state_from_instance(instance)
-    if str(instance.uuid) in state[key]:
-        del state[key][str(instance.uuid)]
-        cache.set(f'overview_state_{instance.user_id}', state, None)
+    '''Takes plant or group entry, removes from cached overview state (or
+    cached archived overview state if entry is archived).
+    '''
+    _update_cached_overview_state(
+        instance.user_id,
+        lambda: instance.user,
+        'delete_entry',
+        get_instance_overview_state_key(instance),
+        str(instance.uuid),
+        archived=instance.archived
+    )
+
+
+def update_cached_group_details_of_plants(user, group_details):
+    '''Takes user and dict with group primary keys as keys and group details
+    dicts (same as Plant.get_group_details, None if group was deleted) as
+    values. Updates group key in cached overview state entries of each group's
+    plants (group name is shown on plant cards).
+
+    Plants are queried by group, so must call before groups are deleted (plant
+    group is set to NULL). Does nothing if dict is empty.
+    '''
+    if not group_details:
+        return
+    plants = Plant.objects.filter(
+        group_id__in=group_details
+    ).values_list('uuid', 'archived', 'group_id')
+    with overview_state_batch():
+        for uuid, archived, group_id in plants:
+            _update_cached_overview_state(
+                user.pk,
+                lambda: user,
+                'update_entry',
+                'plants',
+                str(uuid),
+                {'group': group_details[group_id]},
+                archived=archived
+            )
+
+
+def update_cached_unnamed_display_names(user, model, created, pk, group_details=None):
+    '''Takes user, Plant or Group model, and created timestamp and primary key
+    of an entry that was named, unnamed, or deleted. Updates display_name of
+    each unnamed entry created at or after it ("Unnamed plant/group n" index
+    shifted) in cached overview states. If groups were renumbered also updates
+    group name in details of plants in each group. Returns list of primary keys
+    of renumbered entries.
+
+    Optional group_details dict (see update_cached_group_details_of_plants) is
+    used to update plants of other changed groups in the same query (eg group
+    that was named, no longer renumbered but its plants show the old name).
+
+    Must call after database is updated. Entries created before the changed
+    entry are not updated (their indices can't change).
+    '''
+    unnamed = (
+        model.objects
+            .filter(user_id=user.pk)
+            .unnamed()
+            .order_by('created', 'pk')
+            .values_list('pk', 'uuid', 'archived', 'created')
+    )
+    model_name = model._meta.model_name
+    renumbered = {}
+    with overview_state_batch():
+        for index, (entry_pk, uuid, archived, entry_created) in enumerate(unnamed, 1):
+            if (entry_created, entry_pk) < (created, pk):
+                continue
+            display_name = f'Unnamed {model_name} {index}'
+            renumbered[entry_pk] = {'name': display_name, 'uuid': str(uuid)}
+            _update_cached_overview_state(
+                user.pk,
+                lambda: user,
+                'update_entry',
+                f'{model_name}s',
+                str(uuid),
+                {'display_name': display_name},
+                archived=archived
+            )
+
+        if model is Group:
+            update_cached_group_details_of_plants(
+                user,
+                {**(group_details or {}), **renumbered}
+            )
+
+    return list(renumbered)
 
 
 def update_cached_overview_state_show_archive_bool(user):
-    '''Updates show_archive bool in cached overview state.'''
-    state = get_overview_state(user)
-    state['show_archive'] = has_archived_entries(user.pk)
-    cache.set(f'overview_state_{user.pk}', state, None)
+    '''Updates show_archive bool in cached overview state. Deletes cached
+    archived overview state if user no longer has archived plants or groups.
+    '''
+    show_archive = has_archived_entries(user.pk)
+    _update_cached_overview_state(
+        user.pk,
+        lambda: user,
+        'set_value',
+        'show_archive',
+        show_archive
+    )
+    if not show_archive:
+        get_overview_state_storage(archived=True).delete(user.pk)
+
+
+def update_cached_overview_state_title(user):
+    '''Updates title in cached overview state (does nothing if not cached).'''
+    get_overview_state_storage().set_value(
+        user.pk,
+        'title',
+        get_overview_page_title(user)
+    )
+
+
+def _update_cached_manage_group_states(operations):
+    '''Takes dict with group primary keys as keys and lists of storage
+    operations as values (see InstanceStateStorage.apply_batch). Applies all
+    operations to cached manage_group states immediately, or buffers until the
+    end of overview_state_batch block (does nothing if not cached).
+    '''
+    batch = _manage_group_state_batch.get()
+    if batch is not None:
+        for group_pk, group_operations in operations.items():
+            batch.setdefault(group_pk, []).extend(group_operations)
+    else:
+        ManageGroupStateStorage().apply_batch(operations)
+
+
+def update_cached_manage_group_details_keys(plant, update_dict):
+    '''Takes Plant and dict with one or more keys from get_details dict and
+    new values, writes new values to cached manage_group state of plant's group
+    (does nothing if plant is not in a group).
+    '''
+    if plant.group_id:
+        _update_cached_manage_group_states({plant.group_id: [
+            ('update_entry', 'plants', str(plant.uuid), update_dict)
+        ]})
+
+
+def add_plants_to_cached_manage_group_state(group, plants):
+    '''Takes Group and list of Plants added to group, adds plant details to
+    cached manage_group state. Plants should have overview annotations (details
+    are only built if group state is cached, but need several queries if not).
+    '''
+    if plants and ManageGroupStateStorage().exists(group.pk):
+        _update_cached_manage_group_states({group.pk: [
+            ('set_entry', 'plants', str(plant.uuid), plant.get_details())
+            for plant in plants
+        ]})
+
+
+def remove_plants_from_cached_manage_group_states(plants_by_group):
+    '''Takes dict with group primary keys as keys and lists of uuid strings of
+    plants removed from each group as values, removes from cached manage_group
+    states.
+    '''
+    _update_cached_manage_group_states({
+        group_pk: [('delete_entries', 'plants', uuids)]
+        for group_pk, uuids in plants_by_group.items() if uuids
+    })
+
+
+def delete_cached_manage_group_states(group_pks):
+    '''Takes list of group primary keys, deletes cached manage_group states.'''
+    ManageGroupStateStorage().delete(group_pks)
+
+
+def _cached_timestamp(timestamp):
+    '''Takes datetime, returns ISO string in UTC (same format as timestamps
+    in manage_plant state built from database, needed to sort and deduplicate).
+    '''
+    return timestamp.astimezone(timezone.utc).isoformat()
+
+
+def update_cached_manage_plant_states(operations):
+    '''Takes dict with plant primary keys as keys and lists of storage
+    operations as values (see InstanceStateStorage.apply_batch). Applies all
+    operations to cached manage_plant states (does nothing if not cached).
+    '''
+    ManagePlantStateStorage().apply_batch(operations)
+
+
+def add_event_to_cached_manage_plant_states(plants, event_type, timestamp):
+    '''Takes list of plants, event type, and timestamp of new event. Adds
+    timestamp to events in cached manage_plant state of each plant.
+    '''
+    update_cached_manage_plant_states({
+        plant.pk: [('add_event', event_type, _cached_timestamp(timestamp))]
+        for plant in plants
+    })
+
+
+def remove_events_from_cached_manage_plant_state(plant, events):
+    '''Takes plant and dict with event type keys, lists of deleted event
+    timestamps as values. Removes from events in cached manage_plant state.
+    '''
+    update_cached_manage_plant_states({plant.pk: [
+        ('delete_events', event_type, timestamps)
+        for event_type, timestamps in events.items() if timestamps
+    ]})
+
+
+def add_note_to_cached_manage_plant_state(note):
+    '''Takes NoteEvent, adds or overwrites in cached manage_plant state.'''
+    update_cached_manage_plant_states({note.plant_id: [
+        ('set_entry', 'notes', _cached_timestamp(note.timestamp), note.text)
+    ]})
+
+
+def remove_notes_from_cached_manage_plant_state(plant, timestamps):
+    '''Takes plant and list of deleted NoteEvent timestamps, removes from
+    cached manage_plant state.
+    '''
+    update_cached_manage_plant_states({plant.pk: [
+        ('delete_entries', 'notes', timestamps)
+    ]})
+
+
+def add_photos_to_cached_manage_plant_state(plant, photos):
+    '''Takes plant and list of Photos, adds or overwrites photo details in
+    cached manage_plant state (call again when thumbnails are generated).
+    '''
+    update_cached_manage_plant_states({plant.pk: [
+        ('set_entry', 'photos', photo.pk, photo.get_details())
+        for photo in photos
+    ]})
+
+
+def remove_photos_from_cached_manage_plant_state(plant, photo_pks):
+    '''Takes plant and list of deleted Photo primary keys, removes from cached
+    manage_plant state.
+    '''
+    update_cached_manage_plant_states({plant.pk: [
+        ('delete_entries', 'photos', photo_pks)
+    ]})
+
+
+def add_change_event_to_cached_manage_plant_state(change_event):
+    '''Takes DetailsChangedEvent, adds or overwrites in cached manage_plant
+    state (returned by log_changed_details, may be new or existing event).
+    '''
+    update_cached_manage_plant_states({change_event.plant_id: [(
+        'set_entry',
+        'change_events',
+        _cached_timestamp(change_event.timestamp),
+        change_event.get_details()
+    )]})
+
+
+def delete_cached_manage_plant_states(plant_pks):
+    '''Takes list of plant primary keys, deletes cached manage_plant states
+    (rebuilt next time they are requested). Used when changes are too large
+    to update incrementally (bulk changes that create DetailsChangedEvents).
+    '''
+    ManagePlantStateStorage().delete(plant_pks)
+
+
+def delete_cached_manage_plant_states_with_group(user_pk, groups=None):
+    '''Takes user primary key and list of groups or group primary keys (or
+    None for all groups).
+    Deletes cached manage_plant states that contain DetailsChangedEvents with
+    any of the groups (must call when group name or uuid changes).
+    '''
+    change_events = DetailsChangedEvent.objects.filter(plant__user_id=user_pk)
+    if groups is None:
+        change_events = change_events.filter(
+            Q(group_before__isnull=False) | Q(group_after__isnull=False)
+        )
+    else:
+        change_events = change_events.filter(
+            Q(group_before__in=groups) | Q(group_after__in=groups)
+        )
+    delete_cached_manage_plant_states(
+        set(change_events.values_list('plant_id', flat=True))
+    )
+
+
+def conditional_state_response(request, etag, get_response):
+    '''Takes request, ETag for requested state, and function that returns
+    response containing state. Returns 304 if request If-None-Match header
+    matches ETag, otherwise calls function and returns response. Adds ETag
+    header to both so browser revalidates cached state on each request.
+
+    Function can set Cache-Control no-store if the response does not match the
+    ETag (eg stale state), ETag header is not added.
+    '''
+    etag = quote_etag(etag)
+    response = get_conditional_response(request, etag=etag) or get_response()
+    if 'no-store' in response.get('Cache-Control', ''):
+        return response
+    response.headers['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 @get_user_token
-def get_overview_page_state(_, user):
+def get_overview_page_state(request, user):
     '''Returns current overview page state for the requesting user.
     Called by SPA to get initial state for overview bundle.
+
+    Returns cached JSON bytes as-is (no deserialization or encoding). If the
+    in-process cache is enabled repeat requests are served from memory (ETag
+    and JSON bytes, no redis round trips).
+
+    If a stale copy of the state is returned while another worker rebuilds it
+    the response has no ETag (would be newer than the stale state, client would
+    keep receiving 304 after the state is rebuilt) and is not cached.
+    '''
+    local_cache = get_local_state_cache()
+    entry = local_cache.get(user.pk) if local_cache else None
+    if entry is not None:
+        etag = entry[0]
+    else:
+        # Read epoch before ETag (not cached if invalidated while loading)
+        epoch = local_cache.epoch if local_cache else None
+        etag = get_overview_etag(user.pk)
+
+    def get_response():
+        if entry is not None:
+            state_json, stale = entry[1], False
+        else:
+            state_json, stale = get_overview_state_json(user)
+            if local_cache and not stale:
+                local_cache.set(user.pk, (etag, state_json), epoch)
+        # pylint: disable-next=http-response-with-content-type-json
+        response = HttpResponse(state_json, content_type='application/json', status=200)
+        if stale:
+            patch_cache_control(response, no_store=True)
+        return response
+
+    return conditional_state_response(request, etag, get_response)
+
+
+@get_user_token
+def get_overview_state_page(request, user):
+    '''Returns one page of plant or group entries in the overview page state
+    for the requesting user (key querystring parameter, plants or groups).
+    Next page is requested with the next_cursor from the previous response in
+    the cursor querystring parameter. Number of entries is set by the optional
+    limit querystring parameter (max MAX_OVERVIEW_PAGE_SIZE).
+    '''
+    key = request.GET.get('key', 'plants')
+    if key not in ('plants', 'groups'):
+        return JsonResponse({"error": "key must be plants or groups"}, status=400)
+    try:
+        limit = int(request.GET.get('limit', OVERVIEW_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=400)
+    if not 1 <= limit <= MAX_OVERVIEW_PAGE_SIZE:
+        return JsonResponse(
+            {"error": f"limit must be between 1 and {MAX_OVERVIEW_PAGE_SIZE}"},
+            status=400
+        )
+    cursor = request.GET.get('cursor')
+    try:
+        page = get_overview_state_page_dict(user, key, cursor, limit)
+    except (ValueError, OverflowError):
+        return JsonResponse({"error": "invalid cursor"}, status=400)
+    return JsonResponse(page, status=200)
+
+
+@get_user_token
+def stream_overview_state(request, user):
+    '''Returns overview page state for the requesting user as a streaming
+    response (JSON written while plants and groups are queried, same JSON as
+    /get_overview_state). Used for very large collections.
     '''
-    return JsonResponse(
-        get_overview_state(user),
-        status=200
+    return conditional_state_response(
+        request,
+        get_overview_etag(user.pk),
+        lambda: StreamingHttpResponse(
+            stream_overview_state_json(user),
+            content_type='application/json',
+            status=200
+        )
     )
 
 
+@get_user_token
+def get_overview_state_changes(request, user):
+    '''Returns entries in the overview page state for the requesting user that
+    changed since the version in the since querystring parameter (full state if
+    since parameter is missing or version is too old).
+    Called by SPA to update overview state it already has after navigating.
+    '''
+    try:
+        since = int(request.GET.get('since', -1))
+    except ValueError:
+        return JsonResponse({"error": "since must be an integer"}, status=400)
+    return JsonResponse(get_overview_state_changes_dict(user, since), status=200)
+
+
 @get_user_token
 def get_archived_overview_state(_, user):
     '''Returns archived overview page state for the requesting user.
     Called by SPA to get initial state for overview bundle (archived route).
     '''
-    state = build_overview_state(user, archived=True)
+    state = get_archived_overview_state_dict(user)
     if not state:
         return JsonResponse({'redirect': '/'}, status=302)
     return JsonResponse(state, status=200)
 
 
+def find_manage_state_instance(uuid):
+    '''Takes uuid, returns dict with model_type (plant or group), pk, user_id,
+    group_pk, and parent_pk (plants only) keys if it matches a Plant or Group.
+    Returns None if neither. Used to check owner and get the ETag of a manage
+    page state without querying the whole annotated plant or group (1 primary
+    key lookup in UUID registry).
+    '''
+    fields = ('model_type', 'pk', 'user_id', 'group_pk', 'parent_pk')
+    # Plant subqueries also match uuid (None if registry entry is a group)
+    plant = Plant.objects.filter(pk=OuterRef('object_id'), uuid=OuterRef('uuid'))
+    entry = (
+        UUID.objects
+            .filter(uuid=uuid)
+            .annotate(
+                group_pk=Subquery(plant.values('group_id')),
+                parent_pk=Subquery(plant.values('divided_from_id'))
+            )
+            .values_list('model_type', 'object_id', 'user_id', 'group_pk', 'parent_pk')
+            .first()
+    )
+    if entry is None:
+        return None
+    return dict(zip(fields, entry))
+
+
 @get_user_token
 def get_manage_state(request, uuid, user):
     '''Returns state, title, and bundle name for the requested UUID.
@@ -250,38 +1248,86 @@ def get_manage_state(request, uuid, user):
     If UUID is an existing group returns manage_group bundle initial state.
     If UUID does not exist in database returns register bundle initial state.
     Frontend react-router uses page key to determine which bundle to load.
-    '''
 
-    try:
-        model_type = find_model_type(uuid)
-    except ValidationError:
-        return JsonResponse({'Error': 'Requires valid UUID'}, status=400)
+    If optional history_days querystring parameter is set the manage_plant
+    state only contains events and notes from the last N days (plus per-year
+    counts), older history can be requested from /get_plant_history.
+
+    If optional photo_limit querystring parameter is set the manage_plant state
+    only contains the newest N photos (plus total count), older photos can be
+    requested from /get_plant_photos.
+    '''
 
-    if model_type == 'plant':
-        plant = Plant.objects.get_with_manage_plant_annotation(uuid)
-        if plant.user_id != user.pk:
+    history_days = request.GET.get('history_days')
+    if history_days is not None:
+        try:
+            history_days = int(history_days)
+        except ValueError:
+            return JsonResponse({"error": "history_days must be an integer"}, status=400)
+        if not 0 <= history_days <= MAX_MANAGE_PLANT_HISTORY_DAYS:
             return JsonResponse(
-                {"error": "plant is owned by a different user"},
-                status=403
+                {"error": f"history_days must be between 0 and {MAX_MANAGE_PLANT_HISTORY_DAYS}"},
+                status=400
             )
-        return JsonResponse({
-            'page': 'manage_plant',
-            'title': 'Manage Plant',
-            'state': build_manage_plant_state(plant)
-        }, status=200)
-
-    if model_type == 'group':
-        group = Group.objects.get_with_manage_group_annotation(uuid)
-        if group.user_id != user.pk:
+
+    photo_limit = request.GET.get('photo_limit')
+    if photo_limit is not None:
+        try:
+            photo_limit = int(photo_limit)
+        except ValueError:
+            return JsonResponse({"error": "photo_limit must be an integer"}, status=400)
+        if not 0 <= photo_limit <= MAX_PHOTO_PAGE_SIZE:
             return JsonResponse(
-                {"error": "group is owned by a different user"},
-                status=403
+                {"error": f"photo_limit must be between 0 and {MAX_PHOTO_PAGE_SIZE}"},
+                status=400
             )
-        return JsonResponse({
-            'page': 'manage_group',
-            'title': 'Manage Group',
-            'state': build_manage_group_state(group)
-        }, status=200)
+
+    try:
+        instance = find_manage_state_instance(uuid)
+    except ValidationError:
+        return JsonResponse({'Error': 'Requires valid UUID'}, status=400)
+
+    if instance and instance['user_id'] != user.pk:
+        return JsonResponse(
+            {"error": f"{instance['model_type']} is owned by a different user"},
+            status=403
+        )
+
+    if instance and instance['model_type'] == 'plant':
+        etag = get_manage_plant_etag(
+            user.pk,
+            instance['pk'],
+            instance['group_pk'],
+            instance['parent_pk']
+        )
+        # Windowed state changes when the window moves (new day) even if the
+        # plant did not change, include window start in ETag
+        if history_days is not None:
+            etag += f'-{get_history_window_start(history_days).date().isoformat()}'
+        return conditional_state_response(
+            request,
+            etag,
+            lambda: JsonResponse({
+                'page': 'manage_plant',
+                'title': 'Manage Plant',
+                'state': limit_manage_plant_state(
+                    get_manage_plant_state(uuid, instance['pk']),
+                    history_days,
+                    photo_limit
+                )
+            }, status=200)
+        )
+
+    if instance and instance['model_type'] == 'group':
+        return conditional_state_response(
+            request,
+            get_manage_group_etag(user.pk, instance['pk']),
+            lambda: JsonResponse({
+                'page': 'manage_group',
+                'title': 'Manage Group',
+                'state': get_manage_group_state(uuid, instance['pk'], user.pk)
+            }, status=200)
+        )
 
     # UUID not found: return registration page state
     return JsonResponse({
@@ -291,6 +1337,123 @@ def get_manage_state(request, uuid, user):
     }, status=200)
 
 
+def limit_manage_plant_state(state, history_days=None, photo_limit=None):
+    '''Takes manage_plant state and optional history_days and photo_limit
+    querystring parameters, returns state with history window and photo limit
+    applied (unchanged if neither is set).
+    '''
+    if history_days is not None:
+        state = window_manage_plant_history(state, history_days)
+    if photo_limit is not None:
+        state = limit_manage_plant_photos(state, photo_limit)
+    return state
+
+
+def parse_history_timestamp(value, default):
+    '''Takes ISO timestamp querystring parameter and default datetime, returns
+    datetime (UTC if parameter has no timezone) or default if parameter is
+    missing. Raises ValueError if parameter is not a valid ISO timestamp.
+    '''
+    if value is None:
+        return default
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+@get_user_token
+def get_plant_history(request, uuid, user):
+    '''Returns water, fertilize, prune, and repot events and notes of the
+    requested plant with timestamps from the start querystring parameter up to
+    (not including) the end querystring parameter (ISO timestamps, end defaults
+    to now). Called by manage_plant page to load history older than the window
+    returned by /get_manage_state when history_days is set.
+    '''
+    try:
+        start = parse_history_timestamp(request.GET.get('start'), None)
+        end = parse_history_timestamp(request.GET.get('end'), datetime.now(timezone.utc))
+    except ValueError:
+        return JsonResponse({"error": "start and end must be ISO timestamps"}, status=400)
+    if start is None:
+        return JsonResponse({"error": "start is required"}, status=400)
+    if start >= end:
+        return JsonResponse({"error": "start must be before end"}, status=400)
+
+    try:
+        instance = find_manage_state_instance(uuid)
+    except ValidationError:
+        return JsonResponse({'Error': 'Requires valid UUID'}, status=400)
+
+    if not instance or instance['model_type'] != 'plant':
+        return JsonResponse({"error": "plant not found"}, status=404)
+    if instance['user_id'] != user.pk:
+        return JsonResponse({"error": "plant is owned by a different user"}, status=403)
+
+    return conditional_state_response(
+        request,
+        get_manage_plant_etag(
+            user.pk,
+            instance['pk'],
+            instance['group_pk'],
+            instance['parent_pk']
+        ),
+        lambda: JsonResponse(
+            get_plant_history_dict(instance['pk'], start, end),
+            status=200
+        )
+    )
+
+
+@get_user_token
+def get_plant_photos(request, uuid, user):
+    '''Returns one page of photos of the requested plant, newest first. Next
+    page is requested with the next_cursor from the previous response in the
+    cursor querystring parameter (first page can start after the photos in the
+    manage_plant state with its photos_next_cursor). Number of photos is set
+    by the optional limit querystring parameter (max MAX_PHOTO_PAGE_SIZE).
+    '''
+    try:
+        limit = int(request.GET.get('limit', PHOTO_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=400)
+    if not 1 <= limit <= MAX_PHOTO_PAGE_SIZE:
+        return JsonResponse(
+            {"error": f"limit must be between 1 and {MAX_PHOTO_PAGE_SIZE}"},
+            status=400
+        )
+    cursor = request.GET.get('cursor')
+    if cursor is not None:
+        try:
+            decode_keyset_cursor(cursor)
+        except (ValueError, OverflowError):
+            return JsonResponse({"error": "invalid cursor"}, status=400)
+
+    try:
+        instance = find_manage_state_instance(uuid)
+    except ValidationError:
+        return JsonResponse({'Error': 'Requires valid UUID'}, status=400)
+
+    if not instance or instance['model_type'] != 'plant':
+        return JsonResponse({"error": "plant not found"}, status=404)
+    if instance['user_id'] != user.pk:
+        return JsonResponse({"error": "plant is owned by a different user"}, status=403)
+
+    return conditional_state_response(
+        request,
+        get_manage_plant_etag(
+            user.pk,
+            instance['pk'],
+            instance['group_pk'],
+            instance['parent_pk']
+        ),
+        lambda: JsonResponse(
+            get_plant_photos_page_dict(instance['pk'], cursor, limit),
+            status=200
+        )
+    )
+
+
 @get_user_token
 def get_plant_species_options(request, user):
     '''Returns list used to populate plant species combobox suggestions.
@@ -307,16 +1470,24 @@ def get_plant_species_options(request, user):
 @get_user_token
 def get_plant_options(request, user):
     '''Returns dict of plants with no group (populates group add plants modal).'''
-    return JsonResponse(
-        {'options': Plant.objects.get_add_plants_to_group_modal_options(user)},
-        status=200
+    return conditional_state_response(
+        request,
+        get_overview_etag(user.pk),
+        lambda: JsonResponse(
+            {'options': Plant.objects.get_add_plants_to_group_modal_options(user)},
+            status=200
+        )
     )
 
 
 @get_user_token
 def get_add_to_group_options(request, user):
     '''Returns dict of groups (populates plant add to group modal).'''
-    return JsonResponse(
-        {'options': Group.objects.get_add_to_group_modal_options(user)},
-        status=200
+    return conditional_state_response(
+        request,
+        get_overview_etag(user.pk),
+        lambda: JsonResponse(
+            {'options': Group.objects.get_add_to_group_modal_options(user)},
+            status=200
+        )
     )
@@ -0,0 +1,150 @@
+'''Optional in-process cache (L1) in front of redis for overview state JSON.
+
+Each gunicorn worker keeps a small LRU of recently requested overview states
+(ETag and JSON bytes), so repeat requests handled by the same worker are served
+from memory without any redis round trips. Enabled by setting
+OVERVIEW_STATE_LOCAL_CACHE_SIZE (max number of users cached per worker) to a
+value greater than 0. Entries also expire after OVERVIEW_STATE_LOCAL_CACHE_TTL
+seconds.
+
+Every write to a cached overview state and every overview version bump (see
+state_versions.py) publishes the user primary key on a redis pub/sub channel.
+This happens even if the writer has the local cache disabled, so workers with
+different settings stay coherent. Each worker with the local cache enabled runs
+a daemon thread subscribed to the channel that removes invalidated entries.
+Entries are only served while the thread is subscribed (all entries are
+cleared if the connection drops, since invalidations may have been missed).
+
+The local cache has an epoch that is incremented by every invalidation. Values
+loaded from redis are only stored if the epoch did not change while they were
+loaded, so a value loaded before a write can't be stored after the write's
+invalidation was already processed.
+'''
+
+import time
+import logging
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+# Seconds to wait before reconnecting if pub/sub connection drops
+RECONNECT_DELAY = 1
+
+logger = logging.getLogger(__name__)
+
+
+def get_invalidation_channel():
+    '''Returns name of pub/sub channel used for overview state invalidations.'''
+    return cache.make_key('overview_state_invalidations')
+
+
+class LocalStateCache:
+    '''Bounded LRU with per-entry TTL, invalidated by redis pub/sub messages.'''
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.epoch = 0
+        self.subscribed = False
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def get(self, user_pk):
+        '''Returns cached value for user, or None if not cached or expired.'''
+        self._start_listener()
+        with self._lock:
+            if not self.subscribed:
+                return None
+            entry = self._entries.get(user_pk)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[user_pk]
+                return None
+            self._entries.move_to_end(user_pk)
+            return value
+
+    def set(self, user_pk, value, epoch):
+        '''Caches value for user unless an invalidation was processed since
+        epoch was read (value may be outdated). Evicts least recently used
+        entry if cache is full.
+        '''
+        with self._lock:
+            if epoch != self.epoch or not self.subscribed:
+                return
+            self._entries[user_pk] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(user_pk)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_pk):
+        '''Removes cached value for user.'''
+        with self._lock:
+            self.epoch += 1
+            self._entries.pop(user_pk, None)
+
+    def clear(self):
+        '''Removes all cached values.'''
+        with self._lock:
+            self.epoch += 1
+            self._entries.clear()
+
+    def _start_listener(self):
+        '''Starts pub/sub listener thread if not already running (started on
+        first use so it runs in each gunicorn worker, not the master process).
+        '''
+        if self._listener is None:
+            with self._lock:
+                if self._listener is None:
+                    self._listener = threading.Thread(
+                        target=self._listen,
+                        name='overview-state-invalidations',
+                        daemon=True
+                    )
+                    self._listener.start()
+
+    def _listen(self):
+        '''Subscribes to invalidation channel and processes messages forever.
+        Clears cache and reconnects if the connection drops.
+        '''
+        while True:
+            try:
+                pubsub = get_redis_connection("default").pubsub()
+                pubsub.subscribe(get_invalidation_channel())
+                for message in pubsub.listen():
+                    self.handle_message(message)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception('Overview state invalidation listener failed')
+            with self._lock:
+                self.subscribed = False
+            self.clear()
+            time.sleep(RECONNECT_DELAY)
+
+    def handle_message(self, message):
+        '''Takes pub/sub message, removes invalidated entry from cache.'''
+        if message['type'] == 'subscribe':
+            with self._lock:
+                self.subscribed = True
+        elif message['type'] == 'message':
+            self.invalidate(int(message['data']))
+
+
+@lru_cache(maxsize=None)
+def _get_local_state_cache(max_size, ttl):
+    return LocalStateCache(max_size, ttl)
+
+
+def get_local_state_cache():
+    '''Returns LocalStateCache instance, or None if disabled in settings.'''
+    if not settings.OVERVIEW_STATE_LOCAL_CACHE_SIZE:
+        return None
+    return _get_local_state_cache(
+        settings.OVERVIEW_STATE_LOCAL_CACHE_SIZE,
+        settings.OVERVIEW_STATE_LOCAL_CACHE_TTL
+    )
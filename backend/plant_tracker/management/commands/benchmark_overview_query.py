@@ -0,0 +1,118 @@
+import time
+from uuid import uuid4
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Subquery, OuterRef
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from plant_tracker.models import Plant, Photo, WaterEvent, FertilizeEvent
+
+
+def with_subquery_annotations(queryset):
+    '''Takes Plant queryset, returns with the correlated subquery annotations
+    used by with_overview_annotation before the denormalized columns were added
+    (one subquery per plant for each value).
+    '''
+    return queryset.annotate(
+        last_watered_time=Subquery(
+            WaterEvent.objects
+                .filter(plant_id=OuterRef("pk"))
+                .values("timestamp")[:1]
+        ),
+        last_fertilized_time=Subquery(
+            FertilizeEvent.objects
+                .filter(plant_id=OuterRef("pk"))
+                .values("timestamp")[:1]
+        ),
+        last_photo_thumbnail=Subquery(
+            Photo.objects
+                .filter(plant_id=OuterRef("pk"))
+                .order_by("-timestamp")
+                .values("thumbnail")[:1]
+        )
+    )
+
+
+def create_fake_plants(user, plants, events, photos):
+    '''Takes user and number of plants, events of each type per plant, and
+    photos per plant. Creates all with bulk_create (triggers update columns).
+    '''
+    now = timezone.now()
+    created = Plant.objects.bulk_create([
+        Plant(user=user, uuid=uuid4(), name=f'Plant {i}')
+        for i in range(plants)
+    ])
+    for model in (WaterEvent, FertilizeEvent):
+        model.objects.bulk_create([
+            model(plant=plant, timestamp=now - timedelta(days=day))
+            for plant in created
+            for day in range(events)
+        ])
+    Photo.objects.bulk_create([
+        Photo(
+            plant=plant,
+            photo=f'user_{user.pk}/images/{uuid4().hex}.jpg',
+            thumbnail=f'user_{user.pk}/thumbnails/{uuid4().hex}.webp',
+            timestamp=now - timedelta(days=day),
+            pending=False
+        )
+        for plant in created
+        for day in range(photos)
+    ])
+
+
+def time_queryset(queryset, iterations):
+    '''Evaluates queryset N times, returns average milliseconds per query.'''
+    start = time.perf_counter()
+    for _ in range(iterations):
+        list(queryset.all())
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare overview plant query time using correlated subqueries and "
+        "the denormalized last_watered/last_fertilized/last_photo columns "
+        "(creates fake plants in a transaction that is rolled back)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+        parser.add_argument('--events', type=int, default=5)
+        parser.add_argument('--photos', type=int, default=2)
+        parser.add_argument('--iterations', type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"\n{options['events']} events of each type and {options['photos']} "
+            f"photos per plant, {options['iterations']} iterations\n"
+        )
+        self.stdout.write(f"{'plants':>8}{'subqueries ms':>16}{'columns ms':>14}")
+
+        for size in options['sizes']:
+            with transaction.atomic():
+                user = get_user_model().objects.create_user(
+                    username=f'benchmark_{uuid4().hex[:8]}',
+                    password=uuid4().hex
+                )
+                create_fake_plants(user, size, options['events'], options['photos'])
+                plants = Plant.objects.filter(user=user, archived=False).order_by('created')
+
+                subqueries = time_queryset(
+                    with_subquery_annotations(plants),
+                    options['iterations']
+                )
+                columns = time_queryset(
+                    plants
+                        .with_last_watered_time_annotation()
+                        .with_last_fertilized_time_annotation()
+                        .with_last_photo_thumbnail_annotation(),
+                    options['iterations']
+                )
+                self.stdout.write(f"{size:>8}{subqueries:>16.2f}{columns:>14.2f}")
+
+                # Delete everything created by benchmark
+                transaction.set_rollback(True)
@@ -0,0 +1,134 @@
+import time
+import random
+from functools import partial
+from uuid import uuid4
+from datetime import timedelta
+
+from django.utils import timezone
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.core.files.storage import default_storage
+from django_redis import get_redis_connection
+
+from plant_tracker.compact_state import encode_state, decode_state
+
+
+def build_fake_overview_state(plants, groups):
+    '''Takes number of plants and groups, returns overview state dict with the
+    same shape as build_overview_state (random names, timestamps, and photos).
+    '''
+    now = timezone.now()
+
+    group_entries = {}
+    for i in range(groups):
+        uuid = str(uuid4())
+        group_entries[uuid] = {
+            'name': f'Group {i}',
+            'display_name': f'Group {i}',
+            'uuid': uuid,
+            'archived': False,
+            'created': (now - timedelta(seconds=random.randrange(10**8))).isoformat(),
+            'location': random.choice([None, 'Living room', 'Balcony']),
+            'description': None,
+            'plants': 0
+        }
+
+    plant_entries = {}
+    for i in range(plants):
+        uuid = str(uuid4())
+        group = None
+        if group_entries and random.random() < 0.5:
+            group = random.choice(list(group_entries.values()))
+            group['plants'] += 1
+        plant_entries[uuid] = {
+            'name': f'Plant {i}',
+            'display_name': f'Plant {i}',
+            'uuid': uuid,
+            'archived': False,
+            'created': (now - timedelta(seconds=random.randrange(10**8))).isoformat(),
+            'species': random.choice([None, 'Calathea', 'Fittonia', 'Pothos']),
+            'description': random.choice([None, 'Cutting from mother plant']),
+            'pot_size': random.choice([None, 4, 6, 8]),
+            'last_watered': (now - timedelta(seconds=random.randrange(10**6))).isoformat(),
+            'last_fertilized': random.choice([
+                None,
+                (now - timedelta(seconds=random.randrange(10**7))).isoformat()
+            ]),
+            'thumbnail': random.choice([
+                None,
+                default_storage.url(f'thumbnails/{uuid4().hex}_thumb.webp')
+            ]),
+            'group': {
+                'name': group['display_name'],
+                'uuid': group['uuid']
+            } if group else None
+        }
+
+    return {
+        'plants': plant_entries,
+        'groups': group_entries,
+        'show_archive': False,
+        'title': 'Plant Overview'
+    }
+
+
+def time_function(function, iterations):
+    '''Calls function N times, returns average milliseconds per call.'''
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def get_redis_memory_usage(value):
+    '''Writes value to a temporary redis key, returns bytes of redis memory
+    used (MEMORY USAGE, includes key overhead).
+    '''
+    key = cache.make_key('benchmark_overview_state_storage')
+    redis = get_redis_connection("default")
+    redis.set(key, value)
+    try:
+        return redis.memory_usage(key, samples=0)
+    finally:
+        redis.delete(key)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare redis memory use and encode/decode time of the pickle and "
+        "compact overview state storage layouts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plants', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        state = build_fake_overview_state(options['plants'], options['groups'])
+        iterations = options['iterations']
+
+        encoders = {
+            'pickle': (cache.client.encode, cache.client.decode),
+            'compact': (partial(encode_state, compress=False), decode_state),
+            'compact+zlib': (partial(encode_state, compress=True), decode_state),
+        }
+
+        self.stdout.write(
+            f"\n{options['plants']} plants, {options['groups']} groups, "
+            f"{iterations} iterations\n"
+        )
+        self.stdout.write(
+            f"{'layout':<14}{'bytes':>10}{'redis bytes':>14}"
+            f"{'encode ms':>12}{'decode ms':>12}"
+        )
+        for name, (encode, decode) in encoders.items():
+            value = encode(state)
+            if decode(value) != state:
+                self.stderr.write(f"FAILED: {name} decoded state does not match")
+                continue
+            self.stdout.write(
+                f"{name:<14}{len(value):>10}{get_redis_memory_usage(value):>14}"
+                f"{time_function(partial(encode, state), iterations):>12.2f}"
+                f"{time_function(partial(decode, value), iterations):>12.2f}"
+            )
@@ -0,0 +1,143 @@
+'''Adds denormalized last_watered_timestamp, last_fertilized_timestamp, and
+last_photo columns to Plant, creates postgres triggers that keep them updated,
+and backfills existing plants.
+
+The overview annotations previously ran 3 correlated subqueries per plant (most
+recent WaterEvent, FertilizeEvent, and Photo). Triggers keep the columns correct
+no matter how events or photos are written (views, bulk_create, queryset delete,
+cascades when a plant is deleted), so the annotations can read plain columns.
+'''
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+CREATE_TRIGGERS = """
+-- Create trigger function that sets plant column (TG_ARGV[0]) to timestamp of
+-- most-recent event in table that fired trigger (NULL if no events) --
+CREATE OR REPLACE FUNCTION update_plant_last_event_timestamp() RETURNS trigger AS $$
+DECLARE
+    plant_ids bigint[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        plant_ids := ARRAY[NEW.plant_id];
+    ELSIF TG_OP = 'DELETE' THEN
+        plant_ids := ARRAY[OLD.plant_id];
+    ELSIF NEW.timestamp IS NOT DISTINCT FROM OLD.timestamp
+            AND NEW.plant_id IS NOT DISTINCT FROM OLD.plant_id THEN
+        -- Saved without changing timestamp or plant: skip --
+        RETURN NULL;
+    ELSE
+        plant_ids := ARRAY[OLD.plant_id, NEW.plant_id];
+    END IF;
+
+    EXECUTE format(
+        'UPDATE plant_tracker_plant SET %I = ('
+        '    SELECT max(timestamp) FROM %I WHERE plant_id = plant_tracker_plant.id'
+        ') WHERE id = ANY($1)',
+        TG_ARGV[0],
+        TG_TABLE_NAME
+    ) USING plant_ids;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create trigger function that sets plant last_photo_id to most-recent photo
+-- (same order as photo_set.order_by('-timestamp'), NULL if no photos) --
+CREATE OR REPLACE FUNCTION update_plant_last_photo() RETURNS trigger AS $$
+DECLARE
+    plant_ids bigint[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        plant_ids := ARRAY[NEW.plant_id];
+    ELSIF TG_OP = 'DELETE' THEN
+        plant_ids := ARRAY[OLD.plant_id];
+    ELSIF NEW.timestamp IS NOT DISTINCT FROM OLD.timestamp
+            AND NEW.plant_id IS NOT DISTINCT FROM OLD.plant_id THEN
+        -- Saved without changing timestamp or plant: skip --
+        RETURN NULL;
+    ELSE
+        plant_ids := ARRAY[OLD.plant_id, NEW.plant_id];
+    END IF;
+
+    UPDATE plant_tracker_plant SET last_photo_id = (
+        SELECT id FROM plant_tracker_photo
+        WHERE plant_id = plant_tracker_plant.id
+        ORDER BY timestamp DESC, id DESC
+        LIMIT 1
+    ) WHERE id = ANY(plant_ids);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Update plant columns after events or photos are added, moved, or deleted --
+CREATE TRIGGER waterevent_update_plant_last_watered
+    AFTER INSERT OR DELETE OR UPDATE OF timestamp, plant_id ON plant_tracker_waterevent
+    FOR EACH ROW EXECUTE FUNCTION update_plant_last_event_timestamp('last_watered_timestamp');
+CREATE TRIGGER fertilizeevent_update_plant_last_fertilized
+    AFTER INSERT OR DELETE OR UPDATE OF timestamp, plant_id ON plant_tracker_fertilizeevent
+    FOR EACH ROW EXECUTE FUNCTION update_plant_last_event_timestamp('last_fertilized_timestamp');
+CREATE TRIGGER photo_update_plant_last_photo
+    AFTER INSERT OR DELETE OR UPDATE OF timestamp, plant_id ON plant_tracker_photo
+    FOR EACH ROW EXECUTE FUNCTION update_plant_last_photo();
+"""
+
+UNDO_TRIGGERS = """
+DROP TRIGGER IF EXISTS waterevent_update_plant_last_watered ON plant_tracker_waterevent;
+DROP TRIGGER IF EXISTS fertilizeevent_update_plant_last_fertilized ON plant_tracker_fertilizeevent;
+DROP TRIGGER IF EXISTS photo_update_plant_last_photo ON plant_tracker_photo;
+DROP FUNCTION IF EXISTS update_plant_last_event_timestamp();
+DROP FUNCTION IF EXISTS update_plant_last_photo();
+"""
+
+BACKFILL = """
+UPDATE plant_tracker_plant SET
+    last_watered_timestamp = (
+        SELECT max(timestamp) FROM plant_tracker_waterevent
+        WHERE plant_id = plant_tracker_plant.id
+    ),
+    last_fertilized_timestamp = (
+        SELECT max(timestamp) FROM plant_tracker_fertilizeevent
+        WHERE plant_id = plant_tracker_plant.id
+    ),
+    last_photo_id = (
+        SELECT id FROM plant_tracker_photo
+        WHERE plant_id = plant_tracker_plant.id
+        ORDER BY timestamp DESC, id DESC
+        LIMIT 1
+    );
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_tracker', '0045_detailschangedevent_uuid_after_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plant',
+            name='last_watered_timestamp',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='last_fertilized_timestamp',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='last_photo',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name='+',
+                to='plant_tracker.photo'
+            ),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, reverse_sql=UNDO_TRIGGERS),
+        migrations.RunSQL(BACKFILL, reverse_sql=migrations.RunSQL.noop),
+    ]
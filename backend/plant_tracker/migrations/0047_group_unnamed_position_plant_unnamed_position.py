@@ -0,0 +1,160 @@
+'''Adds unnamed_position columns to Plant and Group, creates postgres triggers
+that keep them updated, and backfills existing plants and groups.
+
+The unnamed_index annotation (used in "Unnamed plant/group <index>" names)
+previously ran a correlated subquery per row that counted every unnamed entry
+created before it (O(n²) for each overview query). Statement-level triggers
+renumber the user's unnamed entries once per statement that creates, renames,
+moves, or deletes them (holding a per-user advisory lock so concurrent writes
+can't store duplicate positions), so the annotation can read a plain column.
+'''
+
+from django.db import migrations, models
+
+
+CREATE_TRIGGERS = """
+-- Create trigger function that renumbers unnamed rows (name and TG_ARGV[0]
+-- column both NULL) owned by users affected by the statement that fired the
+-- trigger, ordered by created then id (named rows are set to NULL). Runs once
+-- per statement, bulk creates/deletes renumber each user once --
+CREATE OR REPLACE FUNCTION update_unnamed_position() RETURNS trigger AS $$
+DECLARE
+    user_ids integer[];
+    affected_user_id integer;
+BEGIN
+    -- Get users owning unnamed rows that were added, deleted, renamed, or moved
+    -- (named rows and saves that don't change any position are skipped) --
+    IF TG_OP = 'INSERT' THEN
+        EXECUTE format(
+            'SELECT array_agg(DISTINCT user_id ORDER BY user_id) FROM new_rows '
+            'WHERE name IS NULL AND %I IS NULL',
+            TG_ARGV[0]
+        ) INTO user_ids;
+    ELSIF TG_OP = 'DELETE' THEN
+        EXECUTE format(
+            'SELECT array_agg(DISTINCT user_id ORDER BY user_id) FROM old_rows '
+            'WHERE name IS NULL AND %I IS NULL',
+            TG_ARGV[0]
+        ) INTO user_ids;
+    ELSE
+        EXECUTE format(
+            'SELECT array_agg(DISTINCT changed.user_id ORDER BY changed.user_id) '
+            'FROM old_rows JOIN new_rows ON old_rows.id = new_rows.id '
+            'CROSS JOIN LATERAL (VALUES (old_rows.user_id), (new_rows.user_id)) AS changed(user_id) '
+            'WHERE (old_rows.name IS NULL AND old_rows.%1$I IS NULL) '
+            '    <> (new_rows.name IS NULL AND new_rows.%1$I IS NULL) '
+            'OR (new_rows.name IS NULL AND new_rows.%1$I IS NULL AND ('
+            '    old_rows.created IS DISTINCT FROM new_rows.created '
+            '    OR old_rows.user_id IS DISTINCT FROM new_rows.user_id'
+            '))',
+            TG_ARGV[0]
+        ) INTO user_ids;
+    END IF;
+
+    IF user_ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Lock each user's rows in this table until commit so concurrent statements
+    -- renumber one at a time (each would otherwise miss the other's uncommitted
+    -- row and store duplicate positions, or update the same rows in different
+    -- orders). Locked in user_id order so multi-user statements can't deadlock.
+    -- The UPDATE below takes a new snapshot after the lock is acquired, so it
+    -- sees rows committed by the transaction that held it --
+    FOREACH affected_user_id IN ARRAY user_ids LOOP
+        PERFORM pg_advisory_xact_lock(TG_RELID::integer, affected_user_id);
+    END LOOP;
+
+    EXECUTE format(
+        'UPDATE %1$I SET unnamed_position = numbered.position FROM ('
+        '    SELECT id, CASE WHEN name IS NULL AND %2$I IS NULL THEN row_number() OVER ('
+        '        PARTITION BY user_id, (name IS NULL AND %2$I IS NULL)'
+        '        ORDER BY created, id'
+        '    ) END AS position'
+        '    FROM %1$I WHERE user_id = ANY($1)'
+        ') AS numbered '
+        'WHERE %1$I.id = numbered.id '
+        'AND %1$I.unnamed_position IS DISTINCT FROM numbered.position',
+        TG_TABLE_NAME,
+        TG_ARGV[0]
+    ) USING user_ids;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Renumber after statements that add, rename, move, or delete plants or groups
+-- (transition tables can't be used with UPDATE OF column lists or multiple
+-- events, so each table has 3 triggers. The UPDATE in the trigger function
+-- fires the update trigger again, but only changes unnamed_position so no
+-- users are renumbered) --
+CREATE TRIGGER plant_insert_unnamed_position
+    AFTER INSERT ON plant_tracker_plant
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_unnamed_position('species');
+CREATE TRIGGER plant_update_unnamed_position
+    AFTER UPDATE ON plant_tracker_plant
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_unnamed_position('species');
+CREATE TRIGGER plant_delete_unnamed_position
+    AFTER DELETE ON plant_tracker_plant
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_unnamed_position('species');
+CREATE TRIGGER group_insert_unnamed_position
+    AFTER INSERT ON plant_tracker_group
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_unnamed_position('location');
+CREATE TRIGGER group_update_unnamed_position
+    AFTER UPDATE ON plant_tracker_group
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_unnamed_position('location');
+CREATE TRIGGER group_delete_unnamed_position
+    AFTER DELETE ON plant_tracker_group
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_unnamed_position('location');
+"""
+
+UNDO_TRIGGERS = """
+DROP TRIGGER IF EXISTS plant_insert_unnamed_position ON plant_tracker_plant;
+DROP TRIGGER IF EXISTS plant_update_unnamed_position ON plant_tracker_plant;
+DROP TRIGGER IF EXISTS plant_delete_unnamed_position ON plant_tracker_plant;
+DROP TRIGGER IF EXISTS group_insert_unnamed_position ON plant_tracker_group;
+DROP TRIGGER IF EXISTS group_update_unnamed_position ON plant_tracker_group;
+DROP TRIGGER IF EXISTS group_delete_unnamed_position ON plant_tracker_group;
+DROP FUNCTION IF EXISTS update_unnamed_position();
+"""
+
+BACKFILL = """
+UPDATE plant_tracker_plant SET unnamed_position = numbered.position FROM (
+    SELECT id, row_number() OVER (PARTITION BY user_id ORDER BY created, id) AS position
+    FROM plant_tracker_plant WHERE name IS NULL AND species IS NULL
+) AS numbered
+WHERE plant_tracker_plant.id = numbered.id;
+
+UPDATE plant_tracker_group SET unnamed_position = numbered.position FROM (
+    SELECT id, row_number() OVER (PARTITION BY user_id ORDER BY created, id) AS position
+    FROM plant_tracker_group WHERE name IS NULL AND location IS NULL
+) AS numbered
+WHERE plant_tracker_group.id = numbered.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_tracker', '0046_plant_last_watered_timestamp_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='unnamed_position',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='unnamed_position',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, reverse_sql=UNDO_TRIGGERS),
+        migrations.RunSQL(BACKFILL, reverse_sql=migrations.RunSQL.noop),
+    ]
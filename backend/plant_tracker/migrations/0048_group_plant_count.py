@@ -0,0 +1,69 @@
+'''Adds plant_count column to Group, creates postgres trigger that keeps it
+updated, and backfills existing groups.
+
+The overview, manage_group, and add to group options queries previously joined
+the plant table and counted each group's plants with GROUP BY. The trigger
+increments/decrements the column in the same transaction whenever a plant is
+created, deleted, or moved between groups (including SET_NULL when a group is
+deleted), so the count can be read as a plain column.
+'''
+
+from django.db import migrations, models
+
+
+CREATE_TRIGGERS = """
+-- Create trigger function that decrements plant_count of plant's old group and
+-- increments plant_count of plant's new group --
+CREATE OR REPLACE FUNCTION update_group_plant_count() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.group_id IS NOT DISTINCT FROM OLD.group_id THEN
+        -- Saved without changing group: skip --
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP <> 'INSERT' AND OLD.group_id IS NOT NULL THEN
+        UPDATE plant_tracker_group SET plant_count = plant_count - 1
+        WHERE id = OLD.group_id;
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.group_id IS NOT NULL THEN
+        UPDATE plant_tracker_group SET plant_count = plant_count + 1
+        WHERE id = NEW.group_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Update group plant_count after plants are added, moved, or deleted --
+CREATE TRIGGER plant_update_group_plant_count
+    AFTER INSERT OR DELETE OR UPDATE OF group_id ON plant_tracker_plant
+    FOR EACH ROW EXECUTE FUNCTION update_group_plant_count();
+"""
+
+UNDO_TRIGGERS = """
+DROP TRIGGER IF EXISTS plant_update_group_plant_count ON plant_tracker_plant;
+DROP FUNCTION IF EXISTS update_group_plant_count();
+"""
+
+BACKFILL = """
+UPDATE plant_tracker_group SET plant_count = (
+    SELECT count(*) FROM plant_tracker_plant
+    WHERE group_id = plant_tracker_group.id
+);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_tracker', '0047_group_unnamed_position_plant_unnamed_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='plant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, reverse_sql=UNDO_TRIGGERS),
+        migrations.RunSQL(BACKFILL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,127 @@
+'''Moves WaterEvent, FertilizeEvent, PruneEvent, and RepotEvent rows into a
+single plant_tracker_plantevent table partitioned by event type.
+
+Each existing table is replaced by a list partition with the same name, so the
+existing models keep reading and writing their own table (the partition) while
+the new unmanaged PlantEvent model reads all 4 types with one query and deletes
+any combination of types with one statement.
+
+All partitions share one id sequence (ids are unique across event types, used
+as PlantEvent primary key). Existing events get new ids when they are copied
+(nothing references event ids). Constraints and indexes are defined on each
+partition instead of the parent table (Django flushes test databases by
+truncating model tables, postgres refuses if the unmanaged parent table has a
+foreign key to a truncated table).
+'''
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Event type (partition key value) and table name of each partition
+PARTITIONS = (
+    ('water', 'plant_tracker_waterevent'),
+    ('fertilize', 'plant_tracker_fertilizeevent'),
+    ('prune', 'plant_tracker_pruneevent'),
+    ('repot', 'plant_tracker_repotevent'),
+)
+
+CREATE_PARENT_TABLE = """
+CREATE SEQUENCE plant_tracker_plantevent_id_seq AS bigint;
+CREATE TABLE plant_tracker_plantevent (
+    id bigint NOT NULL DEFAULT nextval('plant_tracker_plantevent_id_seq'),
+    timestamp timestamp with time zone NOT NULL,
+    plant_id bigint NOT NULL,
+    type varchar(10) NOT NULL
+) PARTITION BY LIST (type);
+ALTER SEQUENCE plant_tracker_plantevent_id_seq OWNED BY plant_tracker_plantevent.id;
+"""
+
+UNDO_PARENT_TABLE = """
+DROP TABLE plant_tracker_plantevent;
+"""
+
+CREATE_PARTITION = """
+-- Replace existing table with partition (copy events with new ids) --
+ALTER TABLE {table} RENAME TO {table}_old;
+CREATE TABLE {table} PARTITION OF plant_tracker_plantevent FOR VALUES IN ('{type}');
+ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('plant_tracker_plantevent_id_seq');
+-- Default used when existing model inserts directly into partition --
+ALTER TABLE {table} ALTER COLUMN type SET DEFAULT '{type}';
+INSERT INTO {table} (timestamp, plant_id)
+    SELECT timestamp, plant_id FROM {table}_old ORDER BY id;
+DROP TABLE {table}_old;
+
+ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id);
+ALTER TABLE {table} ADD CONSTRAINT {table}_plant_id_timestamp_uniq
+    UNIQUE (plant_id, timestamp);
+ALTER TABLE {table} ADD CONSTRAINT {table}_plant_id_fk_plant_tracker_plant_id
+    FOREIGN KEY (plant_id) REFERENCES plant_tracker_plant (id)
+    DEFERRABLE INITIALLY DEFERRED;
+"""
+
+UNDO_PARTITION = """
+-- Detach partition, give it its own id sequence again --
+ALTER TABLE plant_tracker_plantevent DETACH PARTITION {table};
+ALTER TABLE {table} DROP COLUMN type;
+CREATE SEQUENCE {table}_id_seq AS bigint OWNED BY {table}.id;
+SELECT setval('{table}_id_seq', coalesce(max(id), 0) + 1, false) FROM {table};
+ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq');
+"""
+
+# Recreate triggers from migration 0046 (dropped with old tables)
+CREATE_TRIGGERS = """
+CREATE TRIGGER waterevent_update_plant_last_watered
+    AFTER INSERT OR DELETE OR UPDATE OF timestamp, plant_id ON plant_tracker_waterevent
+    FOR EACH ROW EXECUTE FUNCTION update_plant_last_event_timestamp('last_watered_timestamp');
+CREATE TRIGGER fertilizeevent_update_plant_last_fertilized
+    AFTER INSERT OR DELETE OR UPDATE OF timestamp, plant_id ON plant_tracker_fertilizeevent
+    FOR EACH ROW EXECUTE FUNCTION update_plant_last_event_timestamp('last_fertilized_timestamp');
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_tracker', '0048_group_plant_count'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_PARENT_TABLE, reverse_sql=UNDO_PARENT_TABLE),
+        *[
+            migrations.RunSQL(
+                CREATE_PARTITION.format(type=event_type, table=table),
+                reverse_sql=UNDO_PARTITION.format(table=table)
+            )
+            for event_type, table in PARTITIONS
+        ],
+        # Noop on reverse (detached partitions keep the recreated triggers)
+        migrations.RunSQL(CREATE_TRIGGERS, reverse_sql=migrations.RunSQL.noop),
+        migrations.CreateModel(
+            name='PlantEvent',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('timestamp', models.DateTimeField()),
+                ('type', models.CharField(
+                    choices=[
+                        ('water', 'Water'),
+                        ('fertilize', 'Fertilize'),
+                        ('prune', 'Prune'),
+                        ('repot', 'Repot')
+                    ],
+                    max_length=10
+                )),
+                ('plant', models.ForeignKey(
+                    db_constraint=False,
+                    on_delete=django.db.models.deletion.DO_NOTHING,
+                    related_name='+',
+                    to='plant_tracker.plant'
+                )),
+            ],
+            options={
+                'db_table': 'plant_tracker_plantevent',
+                'ordering': ['-timestamp'],
+                'managed': False,
+            },
+        ),
+    ]
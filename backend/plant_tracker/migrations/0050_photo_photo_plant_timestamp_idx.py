@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_tracker', '0049_plantevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['plant', '-timestamp', '-id'], name='photo_plant_timestamp_idx'),
+        ),
+    ]
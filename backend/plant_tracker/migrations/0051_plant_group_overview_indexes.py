@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_tracker', '0050_photo_photo_plant_timestamp_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['user', 'archived', 'created'], name='group_user_archived_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(condition=models.Q(('location__isnull', True), ('name__isnull', True)), fields=['user', 'created'], name='group_user_unnamed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['user', 'archived', 'created'], name='plant_user_archived_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(condition=models.Q(('name__isnull', True), ('species__isnull', True)), fields=['user', 'created'], name='plant_user_unnamed_idx'),
+        ),
+    ]
@@ -0,0 +1,142 @@
+'''Adds model_type, object_id, and user_id columns to the UUID registry table,
+updates the enforce_uuid_unique trigger function to populate them, and
+backfills existing UUIDs.
+
+Resolving a scanned UUID previously ran a UNION over the plant and group
+tables. The registry already has a row for every Plant and Group UUID (see
+migration 0034), so storing which table and row it belongs to (plus owner)
+lets the type, primary key, and owner be read with one primary key lookup.
+'''
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+CREATE_TRIGGERS = """
+-- Replace trigger function: registers UUID with model type (TG_ARGV[0]),
+-- primary key, and owner of the row that fired trigger --
+CREATE OR REPLACE FUNCTION enforce_uuid_unique() RETURNS trigger AS $$
+BEGIN
+    -- If existing entry updated and UUID did not change: skip check (update
+    -- owner in registry if it changed) --
+    IF TG_OP = 'UPDATE' AND NEW.uuid IS NOT DISTINCT FROM OLD.uuid THEN
+        IF NEW.user_id IS DISTINCT FROM OLD.user_id THEN
+            UPDATE plant_tracker_uuid SET user_id = NEW.user_id
+            WHERE uuid = NEW.uuid;
+        END IF;
+        RETURN NEW;
+    END IF;
+
+    -- Confirm new UUID available (raises IntegrityError if already exists) --
+    INSERT INTO plant_tracker_uuid (uuid, model_type, object_id, user_id)
+    VALUES (NEW.uuid, TG_ARGV[0], NEW.id, NEW.user_id);
+
+    -- If existing entry updated and UUID did change: release old UUID --
+    IF TG_OP = 'UPDATE' THEN
+        DELETE FROM plant_tracker_uuid WHERE uuid = OLD.uuid;
+    END IF;
+
+    RETURN NEW;
+EXCEPTION WHEN unique_violation THEN
+    RAISE EXCEPTION 'UUID % already used by another Plant/Group', NEW.uuid
+        USING ERRCODE = '23505';
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recreate triggers with model type argument (also fire when owner changes) --
+DROP TRIGGER IF EXISTS plant_uuid_add_or_update ON plant_tracker_plant;
+DROP TRIGGER IF EXISTS group_uuid_add_or_update ON "plant_tracker_group";
+CREATE TRIGGER plant_uuid_add_or_update
+    BEFORE INSERT OR UPDATE OF uuid, user_id ON plant_tracker_plant
+    FOR EACH ROW EXECUTE FUNCTION enforce_uuid_unique('plant');
+CREATE TRIGGER group_uuid_add_or_update
+    BEFORE INSERT OR UPDATE OF uuid, user_id ON "plant_tracker_group"
+    FOR EACH ROW EXECUTE FUNCTION enforce_uuid_unique('group');
+"""
+
+UNDO_TRIGGERS = """
+-- Restore trigger function and triggers from migration 0034 --
+CREATE OR REPLACE FUNCTION enforce_uuid_unique() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.uuid IS NOT DISTINCT FROM OLD.uuid THEN
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO plant_tracker_uuid (uuid) VALUES (NEW.uuid);
+
+    IF TG_OP = 'UPDATE' THEN
+        DELETE FROM plant_tracker_uuid WHERE uuid = OLD.uuid;
+    END IF;
+
+    RETURN NEW;
+EXCEPTION WHEN unique_violation THEN
+    RAISE EXCEPTION 'UUID % already used by another Plant/Group', NEW.uuid
+        USING ERRCODE = '23505';
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS plant_uuid_add_or_update ON plant_tracker_plant;
+DROP TRIGGER IF EXISTS group_uuid_add_or_update ON "plant_tracker_group";
+CREATE TRIGGER plant_uuid_add_or_update
+    BEFORE INSERT OR UPDATE OF uuid ON plant_tracker_plant
+    FOR EACH ROW EXECUTE FUNCTION enforce_uuid_unique();
+CREATE TRIGGER group_uuid_add_or_update
+    BEFORE INSERT OR UPDATE OF uuid ON "plant_tracker_group"
+    FOR EACH ROW EXECUTE FUNCTION enforce_uuid_unique();
+"""
+
+BACKFILL = """
+UPDATE plant_tracker_uuid
+SET model_type = 'plant', object_id = plant.id, user_id = plant.user_id
+FROM plant_tracker_plant AS plant
+WHERE plant.uuid = plant_tracker_uuid.uuid;
+
+UPDATE plant_tracker_uuid
+SET model_type = 'group', object_id = grp.id, user_id = grp.user_id
+FROM "plant_tracker_group" AS grp
+WHERE grp.uuid = plant_tracker_uuid.uuid;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_tracker', '0051_plant_group_overview_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uuid',
+            name='model_type',
+            field=models.CharField(
+                blank=True,
+                choices=[('plant', 'Plant'), ('group', 'Group')],
+                editable=False,
+                max_length=5,
+                null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name='uuid',
+            name='object_id',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='uuid',
+            name='user',
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name='+',
+                to=settings.AUTH_USER_MODEL
+            ),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, reverse_sql=UNDO_TRIGGERS),
+        migrations.RunSQL(BACKFILL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -10,6 +10,7 @@ from .events import (
     FertilizeEvent,
     PruneEvent,
     RepotEvent,
+    PlantEvent,
     NoteEvent,
     DivisionEvent,
     DetailsChangedEvent,
@@ -25,6 +26,7 @@ __all__ = [
     "FertilizeEvent",
     "PruneEvent",
     "RepotEvent",
+    "PlantEvent",
     "NoteEvent",
     "DivisionEvent",
     "DetailsChangedEvent",
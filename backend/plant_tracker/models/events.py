@@ -64,6 +64,44 @@ class RepotEvent(Event):
         ordering = ['-timestamp']
 
 
+class PlantEvent(models.Model):
+    '''Read/delete model for the partitioned table containing every WaterEvent,
+    FertilizeEvent, PruneEvent, and RepotEvent (see migration 0049).
+
+    The table for each of these models is a partition of this table, type
+    column identifies which partition (model) each row belongs to. Used to get
+    all event types in 1 query and delete events of any type in 1 statement.
+    Create events with the model for each type (inserts into partition).
+    '''
+
+    class Type(models.TextChoices):
+        '''Event type stored in type column (partition key).'''
+        WATER = 'water'
+        FERTILIZE = 'fertilize'
+        PRUNE = 'prune'
+        REPOT = 'repot'
+
+    # Unique across all types (partitions share one id sequence)
+    id = models.BigIntegerField(primary_key=True)
+    plant = models.ForeignKey(
+        'Plant',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+    timestamp = models.DateTimeField()
+    type = models.CharField(max_length=10, choices=Type.choices)
+
+    class Meta:
+        # Table is created by migration 0049 (postgres partitioned table)
+        managed = False
+        db_table = 'plant_tracker_plantevent'
+        ordering = ['-timestamp']
+
+    def __str__(self):
+        return f"{self.type} - {self.timestamp.strftime(TIME_FORMAT)}"
+
+
 class NoteEvent(Event):
     '''Records timestamp and user-entered text about a specific Plant.'''
     text = models.CharField(max_length=500)
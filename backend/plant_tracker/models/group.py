@@ -4,49 +4,45 @@
 
 from django.db import models
 from django.conf import settings
-from django.db.models import Count
+from django.db.models import F
 from django.utils.functional import cached_property
 
 from .events import WaterEvent, FertilizeEvent
-from .annotations import unnamed_index_annotation
+from .trigger_fields import TriggerFieldsModel
 
 
 class GroupQueryset(models.QuerySet):
     '''Custom queryset methods for the Group model.'''
 
+    def unnamed(self):
+        '''Filters to unnamed groups (name and location are null).'''
+        return self.filter(name__isnull=True, location__isnull=True)
+
     def with_unnamed_index_annotation(self):
         '''Adds unnamed_index attribute (sequential ints) if name and location are null.'''
-        return self.annotate(**unnamed_index_annotation(
-            self.model,
-            null_fields=["name", "location"]
-        ))
-
-    def with_group_plant_count_annotation(self):
-        '''Adds plant_count attribute (number of plants in group).'''
-        return self.annotate(plant_count=Count('plant'))
+        return self.annotate(unnamed_index=F("unnamed_position"))
 
     def with_overview_annotation(self):
         '''Adds annotations covering everything shown on overview page (unnamed
-        index, number of plants in group).
+        index, number of plants in group is read from plant_count column).
         '''
         return (
             self
-                .order_by('created')
+                # Consistent order (uuid breaks ties, matches order restored by
+                # HashStateStorage)
+                .order_by('created', 'uuid')
                 # Add unnamed_index (used to build "Unnamed group <index>" names)
                 .with_unnamed_index_annotation()
-                # Add plant_count (number of plants in group)
-                .with_group_plant_count_annotation()
         )
 
     def with_manage_group_annotation(self):
-        '''Adds full annotations for manage_grouo page (avoids separate queries
-        for number of plants in group and user).
+        '''Adds full annotations for manage_grouo page (avoids separate query
+        for unnamed index, number of plants is read from plant_count column).
         '''
         return (
             self
                 # Add unnamed_index (used to build "Unnamed group <index>" names)
                 .with_unnamed_index_annotation()
-                .with_group_plant_count_annotation()
         )
 
     def get_by_uuid(self, uuid):
@@ -73,13 +69,17 @@ class GroupQueryset(models.QuerySet):
         }
 
 
-class Group(models.Model):
+class Group(TriggerFieldsModel):
     '''Tracks a group containing multiple plants, created by scanning QR code.
     Provides methods to water or fertilize all plants within group.
     '''
 
     objects = GroupQueryset.as_manager()
 
+    # Denormalized fields maintained by postgres triggers (see migrations 0047
+    # and 0048), never written by save
+    trigger_fields = ('unnamed_position', 'plant_count')
+
     # User who registered the group
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -102,6 +102,33 @@ class Group(models.Model):
     # Removes from overview page if True
     archived = models.BooleanField(default=False)
 
+    # Position of group among user's unnamed groups ordered by created and
+    # primary key (used in "Unnamed group <index>"), None if group is named
+    # Maintained by postgres trigger when groups are created, renamed, or
+    # deleted (see migration 0047), read by unnamed_index annotation
+    unnamed_position = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
+    # Number of plants in group (reverse relations from Plant.group)
+    # Maintained by postgres trigger when plants are created, deleted, or moved
+    # between groups (see migration 0048), not updated on instances that were
+    # loaded before plants were added or removed (see refresh_plant_count)
+    plant_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Overview and archived overview querysets (ordered by created)
+            models.Index(
+                fields=['user', 'archived', 'created'],
+                name='group_user_archived_idx'
+            ),
+            # Unnamed groups of a user (unnamed index fallback query)
+            models.Index(
+                fields=['user', 'created'],
+                name='group_user_unnamed_idx',
+                condition=models.Q(name__isnull=True, location__isnull=True)
+            ),
+        ]
+
     def __str__(self):
         return f"{self.get_display_name()} ({self.uuid})"
 
@@ -124,7 +151,12 @@ class Group(models.Model):
         if hasattr(self, 'unnamed_index'):
             return f'Unnamed group {self.unnamed_index}'
 
-        # Query database for unnamed index if annotation not present
+        # Otherwise use position column (set by database trigger)
+        if self.unnamed_position is not None:
+            return f'Unnamed group {self.unnamed_position}'
+
+        # Query database if column is NULL (instance was created or unnamed
+        # after it was loaded, trigger value not read yet)
         unnamed_index = Group.objects.filter(
             user_id=self.user_id,
             name__isnull=True,
@@ -167,8 +199,10 @@ class Group(models.Model):
 
     def get_number_of_plants(self):
         '''Returns number of plants with reverse relation to group.'''
-        # Use annotation if present
-        if hasattr(self, 'plant_count'):
-            return self.plant_count
-        # Query from database if no annotation
-        return self.plant_set.count()
+        return self.plant_count
+
+    def refresh_plant_count(self):
+        '''Reloads plant_count column from database (call after adding or
+        removing plants, instance still has the count from when it was loaded).
+        '''
+        self.refresh_from_db(fields=['plant_count'])
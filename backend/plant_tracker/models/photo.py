@@ -102,6 +102,15 @@ class Photo(models.Model):
     # Required relation field matching Photo to correct Plant
     plant = models.ForeignKey('Plant', on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            # Newest photos of a plant (manage_plant photo pages, last photo)
+            models.Index(
+                fields=['plant', '-timestamp', '-id'],
+                name='photo_plant_timestamp_idx'
+            ),
+        ]
+
     def __str__(self):
         name = self.plant.get_display_name()
         timestamp = self.timestamp.strftime(TIME_FORMAT)
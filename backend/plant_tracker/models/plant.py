@@ -1,5 +1,6 @@
 '''Django database models'''
 
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 from django.db import models
@@ -9,10 +10,10 @@ from django.db.models.functions import JSONObject
 from django.utils.functional import cached_property
 from django.core.files.storage import default_storage
 from django.contrib.postgres.expressions import ArraySubquery
-from django.db.models import F, Subquery, OuterRef, Exists, JSONField
+from django.db.models import F, Value, Case, When, OuterRef, Exists, JSONField
 
 from .pot_size_field import PotSizeField
-from .annotations import unnamed_index_annotation
+from .trigger_fields import TriggerFieldsModel
 
 if TYPE_CHECKING:  # pragma: no cover
     from .group import Group
@@ -35,63 +36,43 @@ DEFAULT_PHOTO_DETAILS_PLACEHOLDER = {
 class PlantQueryset(models.QuerySet):
     '''Custom queryset methods for the Plant model.'''
 
+    def unnamed(self):
+        '''Filters to unnamed plants (name and species are null).'''
+        return self.filter(name__isnull=True, species__isnull=True)
+
     def with_unnamed_index_annotation(self):
         '''Adds unnamed_index attribute (sequential ints) if name and species are null.'''
-        return self.annotate(**unnamed_index_annotation(
-            self.model,
-            null_fields=["name", "species"]
-        ))
+        return self.annotate(unnamed_index=F("unnamed_position"))
 
     def with_last_watered_time_annotation(self):
         '''Adds last_watered_time attribute (most-recent WaterEvent timestamp).'''
-        return self.annotate(
-            last_watered_time=Subquery(
-                apps.get_model("plant_tracker", "WaterEvent").objects
-                    .filter(plant_id=OuterRef("pk"))
-                    .values("timestamp")[:1]
-            )
-        )
+        return self.annotate(last_watered_time=F("last_watered_timestamp"))
 
     def with_last_fertilized_time_annotation(self):
         '''Adds last_fertilized_time attribute (most-recent WaterEvent timestamp).'''
-        return self.annotate(
-            last_fertilized_time=Subquery(
-                apps.get_model("plant_tracker", "FertilizeEvent").objects
-                    .filter(plant_id=OuterRef("pk"))
-                    .values("timestamp")[:1]
-            )
-        )
+        return self.annotate(last_fertilized_time=F("last_fertilized_timestamp"))
 
     def with_last_photo_thumbnail_annotation(self):
         '''Adds last_photo_thumbnail attribute with name of most-recent Photo entry.'''
-        return self.annotate(
-            last_photo_thumbnail=Subquery(
-            apps.get_model("plant_tracker", "Photo").objects
-                .filter(plant_id=OuterRef("pk"))
-                .order_by("-timestamp")
-                .values("thumbnail")[:1]
-            )
-        )
+        return self.annotate(last_photo_thumbnail=F("last_photo__thumbnail"))
 
     def with_last_photo_details_annotation(self):
         '''Adds last_photo_details attribute with dict containing all relevant
         attributes of most-recent Photo entry.
         '''
         return self.annotate(
-            last_photo_details=Subquery(
-            apps.get_model("plant_tracker", "Photo").objects
-                .filter(plant_id=OuterRef("pk"))
-                .order_by("-timestamp")
-                .annotate(
-                    details=JSONObject(
-                        key=F("pk"),
-                        photo=F("photo"),
-                        thumbnail=F("thumbnail"),
-                        preview=F("preview"),
-                        timestamp=F("timestamp"),
+            last_photo_details=Case(
+                When(
+                    last_photo__isnull=False,
+                    then=JSONObject(
+                        key=F("last_photo__pk"),
+                        photo=F("last_photo__photo"),
+                        thumbnail=F("last_photo__thumbnail"),
+                        preview=F("last_photo__preview"),
+                        timestamp=F("last_photo__timestamp"),
                     )
-                )
-                .values("details")[:1],
+                ),
+                default=Value(None),
                 output_field=JSONField()
             )
         )
@@ -102,8 +83,9 @@ class PlantQueryset(models.QuerySet):
         '''
         return (
             self
-                # Consistent order so unnamed plant index doesn't shift
-                .order_by('created')
+                # Consistent order so unnamed plant index doesn't shift (uuid
+                # breaks ties, matches order restored by HashStateStorage)
+                .order_by('created', 'uuid')
                 # Add unnamed_index (used to build "Unnamed plant <index>" names)
                 .with_unnamed_index_annotation()
                 # Add last_watered_time
@@ -116,9 +98,9 @@ class PlantQueryset(models.QuerySet):
                 .select_related('default_photo')
         )
 
-    def with_manage_plant_annotation(self):
-        '''Adds full annotations for manage_plant page (avoids separate queries
-        for events, photos, etc).
+    def with_manage_plant_details_annotation(self):
+        '''Adds annotations for everything on manage_plant page except event
+        history (plant details, default photo, group, parent, divisions).
         '''
         return (
             self
@@ -136,30 +118,6 @@ class PlantQueryset(models.QuerySet):
                 .select_related('group')
                 # Include parent plant + division event if plant was divided
                 .select_related('divided_from', 'divided_from_event')
-                # Add <event_type>_timetamps attributes containing lists of
-                # event timestamps (sorted chronologically at database level)
-                .annotate(
-                    water_timestamps=ArraySubquery(
-                        apps.get_model("plant_tracker", "WaterEvent").objects
-                            .filter(plant_id=OuterRef('pk'))
-                            .values_list('timestamp', flat=True)
-                    ),
-                    fertilize_timestamps=ArraySubquery(
-                        apps.get_model("plant_tracker", "FertilizeEvent").objects
-                            .filter(plant_id=OuterRef('pk'))
-                            .values_list('timestamp', flat=True)
-                    ),
-                    prune_timestamps=ArraySubquery(
-                        apps.get_model("plant_tracker", "PruneEvent").objects
-                            .filter(plant_id=OuterRef('pk'))
-                            .values_list('timestamp', flat=True)
-                    ),
-                    repot_timestamps=ArraySubquery(
-                        apps.get_model("plant_tracker", "RepotEvent").objects
-                            .filter(plant_id=OuterRef('pk'))
-                            .values_list('timestamp', flat=True)
-                    ),
-                )
                 # Annotate whether DivisionEvents exist (skips extra query if not)
                 .annotate(
                     has_divisions=Exists(
@@ -169,6 +127,31 @@ class PlantQueryset(models.QuerySet):
                 )
         )
 
+    def with_manage_plant_annotation(self):
+        '''Adds full annotations for manage_plant page (avoids separate queries
+        for events, photos, etc).
+        '''
+        return (
+            self
+                # Add plant details, default photo, group, parent, divisions
+                .with_manage_plant_details_annotation()
+                # Add event_timestamps attribute containing list of {type,
+                # timestamp} dicts for all water, fertilize, prune, and repot
+                # events (1 scan of partitioned PlantEvent table, sorted
+                # chronologically at database level)
+                .annotate(
+                    event_timestamps=ArraySubquery(
+                        apps.get_model("plant_tracker", "PlantEvent").objects
+                            .filter(plant_id=OuterRef('pk'))
+                            .order_by('-timestamp')
+                            .values(event=JSONObject(
+                                type=F('type'),
+                                timestamp=F('timestamp')
+                            ))
+                    )
+                )
+        )
+
     def get_by_uuid(self, uuid):
         '''Returns Plant model instance matching UUID, or None if not found.'''
         return self.filter(uuid=uuid).first()
@@ -181,6 +164,12 @@ class PlantQueryset(models.QuerySet):
         '''Takes UUID, returns matching Plant with full manage_plant annotations.'''
         return self.filter(uuid=uuid).with_manage_plant_annotation().first()
 
+    def get_with_manage_plant_details_annotation(self, uuid):
+        '''Takes UUID, returns matching Plant with manage_plant annotations
+        excluding event history (used when history is cached).
+        '''
+        return self.filter(uuid=uuid).with_manage_plant_details_annotation().first()
+
     def get_add_plants_to_group_modal_options(self, user):
         '''Takes user, returns dict with all of user's plants with no group
         (uuids as keys, details dicts as values). Populates options in add
@@ -194,7 +183,7 @@ class PlantQueryset(models.QuerySet):
         }
 
 
-class Plant(models.Model):
+class Plant(TriggerFieldsModel):
     '''Tracks an individual plant, created by scanning QR code.
     Stores optional description params added during registration.
     Receives database relations to all WaterEvent, FertilizeEvent, PruneEvent,
@@ -203,6 +192,15 @@ class Plant(models.Model):
 
     objects = PlantQueryset.as_manager()
 
+    # Denormalized fields maintained by postgres triggers (see migrations 0046
+    # and 0047), never written by save
+    trigger_fields = (
+        'last_watered_timestamp',
+        'last_fertilized_timestamp',
+        'last_photo',
+        'unnamed_position'
+    )
+
     # User who registered the plant
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -264,6 +262,44 @@ class Plant(models.Model):
         related_name='+'
     )
 
+    # Denormalized most-recent WaterEvent timestamp, FertilizeEvent timestamp,
+    # and Photo (read by overview annotations instead of a subquery per plant)
+    # Maintained by postgres triggers on the event and photo tables (see
+    # migration 0046), never written by django (not updated on instances that
+    # were loaded before events or photos were added or removed)
+    last_watered_timestamp = models.DateTimeField(null=True, blank=True, editable=False)
+    last_fertilized_timestamp = models.DateTimeField(null=True, blank=True, editable=False)
+    last_photo = models.ForeignKey(
+        'Photo',
+        # Trigger sets next most-recent photo when photo deleted
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+'
+    )
+
+    # Position of plant among user's unnamed plants ordered by created and
+    # primary key (used in "Unnamed plant <index>"), None if plant is named
+    # Maintained by postgres trigger when plants are created, renamed, or
+    # deleted (see migration 0047), read by unnamed_index annotation
+    unnamed_position = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Overview and archived overview querysets (ordered by created)
+            models.Index(
+                fields=['user', 'archived', 'created'],
+                name='plant_user_archived_idx'
+            ),
+            # Unnamed plants of a user (unnamed index fallback query)
+            models.Index(
+                fields=['user', 'created'],
+                name='plant_user_unnamed_idx',
+                condition=models.Q(name__isnull=True, species__isnull=True)
+            ),
+        ]
+
     def __str__(self):
         return f"{self.get_display_name()} ({self.uuid})"
 
@@ -286,7 +322,12 @@ class Plant(models.Model):
         if hasattr(self, 'unnamed_index'):
             return f'Unnamed plant {self.unnamed_index}'
 
-        # Query database for unnamed index if annotation not present
+        # Otherwise use position column (set by database trigger)
+        if self.unnamed_position is not None:
+            return f'Unnamed plant {self.unnamed_position}'
+
+        # Query database if column is NULL (instance was created or unnamed
+        # after it was loaded, trigger value not read yet)
         unnamed_index = Plant.objects.filter(
             user_id=self.user_id,
             name__isnull=True,
@@ -436,6 +477,34 @@ class Plant(models.Model):
             for event in self.detailschangedevent_set.all()
         }
 
+    def get_event_timestamps(self):
+        '''Returns dict with water, fertilize, prune, and repot keys, list of
+        event timestamp strings (most-recent first) as values.
+        '''
+        timestamps = {
+            event_type: []
+            for event_type in apps.get_model("plant_tracker", "PlantEvent").Type.values
+        }
+
+        # Use annotation if present (timestamps are JSON strings, parse and
+        # convert back to same isoformat string as other timestamps in state)
+        if hasattr(self, 'event_timestamps'):
+            for event in self.event_timestamps:
+                timestamps[event['type']].append(
+                    datetime.fromisoformat(event['timestamp']).isoformat()
+                )
+            return timestamps
+
+        # Query from database if no annotation
+        events = (
+            apps.get_model("plant_tracker", "PlantEvent").objects
+                .filter(plant_id=self.pk)
+                .values_list('type', 'timestamp')
+        )
+        for event_type, timestamp in events:
+            timestamps[event_type].append(timestamp.isoformat())
+        return timestamps
+
     def _get_most_recent_timestamp(self, queryset):
         '''Takes QuerySet containing events, returns timestamp string of
         most-recent event (or None if queryset empty).
@@ -0,0 +1,28 @@
+'''Abstract model for models with columns maintained by postgres triggers.'''
+
+from django.db import models
+
+
+class TriggerFieldsModel(models.Model):
+    '''Abstract model that never writes fields listed in trigger_fields when
+    an existing instance is saved (instance may have loaded them before the
+    trigger updated them, saving would overwrite the new value with the old).
+    '''
+
+    # Names of fields maintained by postgres triggers (set in subclasses)
+    trigger_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.trigger_fields
+            ]
+        super().save(*args, **kwargs)
@@ -1,11 +1,38 @@
 '''UUID model tracks UUIDs being used by both Plant and Group model (prevent
 duplicates). Should not be instantiated directly, done automatically by postgres
 trigger functions (see plant_tracker/migrations/0033_enforce_unique_uuid.py).
+
+Also stores the model type, primary key, and owner of the Plant or Group using
+each UUID (populated by the same triggers, see migration 0052) so a scanned
+UUID can be resolved with a single primary key lookup.
 '''
 
 from django.db import models
+from django.conf import settings
 
 
 class UUID(models.Model):
     '''Stores a UUID which is being used by a Plant or Group model.'''
     uuid = models.UUIDField(primary_key=True)
+
+    # Model using the UUID (plant or group) and its primary key
+    model_type = models.CharField(
+        max_length=5,
+        choices=[('plant', 'Plant'), ('group', 'Group')],
+        null=True,
+        blank=True,
+        editable=False
+    )
+    object_id = models.BigIntegerField(null=True, blank=True, editable=False)
+
+    # User who owns the Plant or Group
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+',
+        null=True,
+        blank=True,
+        editable=False
+    )
@@ -0,0 +1,902 @@
+'''Redis storage used for cached overview states.
+
+The overview state can be stored in three layouts, selected by the
+OVERVIEW_STATE_STORAGE setting:
+
+- pickle (default): the whole state dict is pickled and stored under a single
+  key. Every incremental update loads, modifies, and rewrites the whole state.
+- hash: the state is stored in a redis hash with a separate field for each
+  plant and group (JSON encoded). Incremental updates only read and write the
+  field that changed, and the whole state is loaded with a single HGETALL.
+- compact: same as pickle, but the state is encoded with a columnar layout that
+  stores each key name once (see compact_state.py) and optionally compressed.
+  Uses much less redis memory, but encoding and decoding is slower.
+
+All three layouts use the same key (overview_state_{user_pk}, including the
+django cache prefix): a string for pickle and compact, a hash for hash. So
+cache.delete and cache.iter_keys work the same with any layout. If
+OVERVIEW_STATE_STORAGE is changed a state written by the previous layout is
+treated as not cached (key is deleted when read, rebuilt from the database).
+The archived overview state is stored the same way under a separate key
+(archived_overview_state_{user_pk}), but is not built until first requested.
+
+All storage methods that modify an existing state return False if the user does
+not have a cached state (caller decides whether to build it), True otherwise.
+
+Incremental updates run in an optimistic WATCH/MULTI transaction, so concurrent
+updates made by different gunicorn workers (or celery) are merged instead of
+one worker overwriting the other's changes. If the transaction keeps failing
+the cached state is deleted and rebuilt from the database the next time it is
+requested (slow, but never serves a state with missing changes).
+
+The overview state endpoint response is also cached as ready-to-send JSON bytes
+under a separate key (overview_json_{user_pk}). This is deleted in the same
+transaction as every change to the state and regenerated on the next request.
+Every change publishes an invalidation for the in-process cache (see
+local_state_cache.py), which keeps the JSON bytes and ETag in each worker if
+enabled. JSON is not cached for the archived overview state.
+
+Every change to a plant or group entry in the main overview state is also
+appended to a per-user change log (overview_changes_{user_pk}, list of changed
+"plants:{uuid}" and "groups:{uuid}" fields) in the same transaction, and the
+log version (overview_changes_version_{user_pk}) is incremented once for each
+field appended. Clients that already have the state can request only the
+entries that changed since the version they received (see load_changes). Only
+the last OVERVIEW_CHANGE_LOG_LENGTH changes are kept. The log is reset when the
+state is built or deleted (version jumps to the current time in nanoseconds, so
+clients with an older version receive the full state).
+
+Rebuilding a missing overview state is single-flight: the worker that builds
+the state holds a short-lived lock (lock_overview_state_{user_pk}, SET NX with a
+random token) while it queries the database. Other requests for the same user
+serve the last deleted copy of the state (stale_overview_state_{user_pk}, kept
+for a short time by delete) or wait for the build to finish instead of building
+it again. Updates that find the state missing while it is being built add their
+operations to a placeholder list (pending_overview_state_{user_pk}) which is
+applied by the worker that holds the lock after the state is saved, so updates
+committed while the database was being queried are not lost.
+
+Manage page states are cached with a separate pickled key per plant or group,
+which expires after MANAGE_STATE_TIMEOUT (most are rarely visited, unlike the
+overview). These only contain the parts of the state that are slow to query
+(event history and photos for plants, plant details for groups), and are
+updated incrementally the same way.
+'''
+
+import json
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from redis.exceptions import WatchError, ResponseError
+
+from .local_state_cache import get_invalidation_channel
+from .compact_state import encode_state, decode_state, RAW_HEADER, COMPRESSED_HEADER
+
+# Number of times a transaction is retried if the key changes before it commits
+MAX_TRANSACTION_ATTEMPTS = 10
+
+# Seconds before cached manage page states expire (not refreshed by updates)
+MANAGE_STATE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Number of changed entries kept in each overview change log (clients with an
+# older version receive the full state)
+OVERVIEW_CHANGE_LOG_LENGTH = 1000
+
+# Seconds before overview state rebuild lock expires (released early when the
+# build finishes, only reached if the worker building the state died)
+OVERVIEW_REBUILD_LOCK_TIMEOUT = 30
+
+# Seconds between checks while waiting for another worker to rebuild state
+OVERVIEW_REBUILD_POLL_INTERVAL = 0.05
+
+# Seconds that the copy of a deleted overview state is kept (served to requests
+# that arrive while the state is being rebuilt)
+OVERVIEW_STALE_STATE_TIMEOUT = 60
+
+
+def get_overview_state_key(user_pk, archived=False):
+    '''Takes user primary key and optional archived bool, returns name of
+    cached overview state key (archived overview state key if archived=True).
+    '''
+    if archived:
+        return f'archived_overview_state_{user_pk}'
+    return f'overview_state_{user_pk}'
+
+
+def get_overview_state_stale_key(user_pk, archived=False):
+    '''Takes user primary key and optional archived bool, returns name of key
+    that stores the last deleted copy of the overview state.
+    '''
+    return f'stale_{get_overview_state_key(user_pk, archived)}'
+
+
+def get_overview_state_lock_key(user_pk, archived=False):
+    '''Takes user primary key and optional archived bool, returns name of lock
+    held while the overview state is being rebuilt.
+    '''
+    return f'lock_{get_overview_state_key(user_pk, archived)}'
+
+
+def get_overview_state_pending_key(user_pk, archived=False):
+    '''Takes user primary key and optional archived bool, returns name of list
+    of operations waiting to be applied after the state is rebuilt.
+    '''
+    return f'pending_{get_overview_state_key(user_pk, archived)}'
+
+
+def get_overview_state_json_key(user_pk):
+    '''Takes user primary key, returns name of cached overview JSON key.'''
+    return f'overview_json_{user_pk}'
+
+
+def get_overview_changes_key(user_pk):
+    '''Takes user primary key, returns name of overview change log key.'''
+    return f'overview_changes_{user_pk}'
+
+
+def get_overview_changes_version_key(user_pk):
+    '''Takes user primary key, returns name of overview change log version key.'''
+    return f'overview_changes_version_{user_pk}'
+
+
+def get_manage_plant_state_key(plant_pk):
+    '''Takes plant primary key, returns name of cached manage_plant state key.'''
+    return f'manage_plant_state_{plant_pk}'
+
+
+def get_manage_group_state_key(group_pk):
+    '''Takes group primary key, returns name of cached manage_group state key.'''
+    return f'manage_group_state_{group_pk}'
+
+
+def run_transaction(key, transaction):
+    '''Takes redis key (including cache prefix) or list of keys and transaction
+    function.
+
+    The transaction function receives a redis pipeline that is already watching
+    key (commands run immediately until pipeline.multi() is called, then they
+    are queued and run atomically when the transaction commits). Transaction is
+    retried if key is modified by another client before it commits.
+
+    Returns the transaction function return value, or None if the transaction
+    could not commit after MAX_TRANSACTION_ATTEMPTS.
+    '''
+    with get_redis_connection("default").pipeline() as pipeline:
+        for _ in range(MAX_TRANSACTION_ATTEMPTS):
+            try:
+                pipeline.watch(*([key] if isinstance(key, str) else key))
+                result = transaction(pipeline)
+                pipeline.execute()
+                return result
+            except WatchError:
+                continue
+    return None
+
+
+def is_wrong_type_error(error):
+    '''Takes redis ResponseError, returns True if it was raised by a command
+    that read a key holding a different type (eg GET on a hash).
+    '''
+    return str(error).startswith('WRONGTYPE')
+
+
+class BaseStateStorage:
+    '''Methods shared by all overview state storage layouts.
+
+    Stores the main overview state by default, or the archived overview state
+    if archived arg is True.
+    '''
+
+    def __init__(self, archived=False):
+        self.archived = archived
+
+    def _key(self, user_pk):
+        '''Returns cached overview state key name including cache prefix.'''
+        return cache.make_key(get_overview_state_key(user_pk, self.archived))
+
+    def _stale_key(self, user_pk):
+        '''Returns stale overview state key name including cache prefix.'''
+        return cache.make_key(get_overview_state_stale_key(user_pk, self.archived))
+
+    def _pending_key(self, user_pk):
+        '''Returns pending operations key name including cache prefix.'''
+        return cache.make_key(get_overview_state_pending_key(user_pk, self.archived))
+
+    def _derived_keys(self, user_pk):
+        '''Returns list of keys that must be deleted when state changes.'''
+        if self.archived:
+            return []
+        return [cache.make_key(get_overview_state_json_key(user_pk))]
+
+    def _queue_state_changed(self, pipeline, user_pk):
+        '''Takes pipeline in transaction mode (after pipeline.multi()) and user
+        primary key, queues commands that clear cached values derived from state.
+        '''
+        if self.archived:
+            return
+        pipeline.delete(*self._derived_keys(user_pk))
+        # Always publish (other workers may have local cache enabled)
+        pipeline.publish(get_invalidation_channel(), user_pk)
+
+    def _queue_log_changes(self, pipeline, user_pk, fields):
+        '''Takes pipeline in transaction mode, user primary key, and list of
+        changed entry fields. Queues commands that append fields to change log
+        and increment log version by the number of fields appended.
+        '''
+        if self.archived or not fields:
+            return
+        log_key = cache.make_key(get_overview_changes_key(user_pk))
+        version_key = cache.make_key(get_overview_changes_version_key(user_pk))
+        pipeline.rpush(log_key, *fields)
+        pipeline.ltrim(log_key, -OVERVIEW_CHANGE_LOG_LENGTH, -1)
+        pipeline.set(version_key, time.time_ns(), nx=True)
+        pipeline.incrby(version_key, len(fields))
+
+    def _queue_log_reset(self, pipeline, user_pk):
+        '''Takes pipeline and user primary key, queues commands that clear
+        change log and set log version to current time (see module docstring).
+        '''
+        if self.archived:
+            return
+        pipeline.delete(cache.make_key(get_overview_changes_key(user_pk)))
+        pipeline.set(
+            cache.make_key(get_overview_changes_version_key(user_pk)),
+            time.time_ns()
+        )
+
+    def _entry_field(self, key, uuid):
+        '''Returns field name of a plant or group entry (used in change log).'''
+        return f'{key}:{uuid}'
+
+    def _transaction(self, user_pk, transaction):
+        '''Runs transaction function with pipeline watching cached state key.
+        Deletes cached state if transaction fails (rebuilt on next request).
+        '''
+        result = run_transaction(self._key(user_pk), transaction)
+        if result is None:
+            self.delete(user_pk)
+            return True
+        return result
+
+    def _discard_other_layout(self, key, error):
+        '''Takes key name including cache prefix and ResponseError raised by a
+        command that read it. Deletes key if it holds a state written by another
+        layout before OVERVIEW_STATE_STORAGE was changed (treated as not cached,
+        rebuilt on next request). Re-raises any other error.
+        '''
+        if not is_wrong_type_error(error):
+            raise error
+        get_redis_connection("default").delete(key)
+
+    def exists(self, user_pk):
+        '''Returns True if user has a cached overview state.'''
+        return bool(get_redis_connection("default").exists(self._key(user_pk)))
+
+    def delete(self, user_pk):
+        '''Deletes cached overview state and all values derived from it.
+
+        The deleted state is moved to the stale key (expires after
+        OVERVIEW_STALE_STATE_TIMEOUT, see load_stale).
+        '''
+        pipeline = get_redis_connection("default").pipeline()
+        # Fails if state is not cached (ignored, nothing to keep)
+        pipeline.rename(self._key(user_pk), self._stale_key(user_pk))
+        pipeline.expire(self._stale_key(user_pk), OVERVIEW_STALE_STATE_TIMEOUT)
+        self._queue_state_changed(pipeline, user_pk)
+        self._queue_log_reset(pipeline, user_pk)
+        pipeline.execute(raise_on_error=False)
+
+    def load(self, user_pk):
+        '''Returns cached overview state dict, or None if not cached.'''
+        return self._load(self._key(user_pk))
+
+    def load_stale(self, user_pk):
+        '''Returns the last deleted copy of the overview state (None if it was
+        not deleted recently). May be missing changes, only served while another
+        worker is rebuilding the state.
+        '''
+        return self._load(self._stale_key(user_pk))
+
+    def _lock_key(self, user_pk):
+        '''Returns rebuild lock key name including cache prefix.'''
+        return cache.make_key(get_overview_state_lock_key(user_pk, self.archived))
+
+    def acquire_rebuild_lock(self, user_pk):
+        '''Acquires lock held while the overview state is rebuilt (expires
+        after OVERVIEW_REBUILD_LOCK_TIMEOUT). Returns token passed to
+        release_rebuild_lock, or None if another worker holds the lock.
+        '''
+        token = uuid4().hex
+        acquired = get_redis_connection("default").set(
+            self._lock_key(user_pk),
+            token,
+            nx=True,
+            ex=OVERVIEW_REBUILD_LOCK_TIMEOUT
+        )
+        return token if acquired else None
+
+    def release_rebuild_lock(self, user_pk, token):
+        '''Releases rebuild lock if it is still held by token (does nothing if
+        it expired and was acquired by another worker).
+        '''
+        key = self._lock_key(user_pk)
+
+        def transaction(pipeline):
+            if pipeline.get(key) == token.encode():
+                pipeline.multi()
+                pipeline.delete(key)
+
+        run_transaction(key, transaction)
+
+    def wait_for_rebuild(self, user_pk, timeout):
+        '''Waits until the rebuild lock is released or timeout seconds pass.
+        Returns True if released, False if still held.
+        '''
+        redis = get_redis_connection("default")
+        deadline = time.monotonic() + timeout
+        while redis.exists(self._lock_key(user_pk)):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(OVERVIEW_REBUILD_POLL_INTERVAL)
+        return True
+
+    def add_pending(self, user_pk, operations):
+        '''Takes user primary key and list of operations (see apply_batch),
+        appends them to the placeholder list applied after the state is rebuilt
+        (see pop_pending). Expires with the rebuild lock.
+        '''
+        pipeline = get_redis_connection("default").pipeline()
+        pipeline.rpush(self._pending_key(user_pk), cache.client.encode(operations))
+        pipeline.expire(self._pending_key(user_pk), OVERVIEW_REBUILD_LOCK_TIMEOUT)
+        pipeline.execute()
+
+    def pop_pending(self, user_pk):
+        '''Returns list of all operations added by add_pending (in order) and
+        clears the placeholder list.
+        '''
+        pipeline = get_redis_connection("default").pipeline()
+        pipeline.lrange(self._pending_key(user_pk), 0, -1)
+        pipeline.delete(self._pending_key(user_pk))
+        values, _ = pipeline.execute()
+        return [
+            operation
+            for value in values
+            for operation in cache.client.decode(value)
+        ]
+
+    def load_changes(self, user_pk, since):
+        '''Takes user primary key and change log version received by client.
+        Returns tuple with current log version and list of entry fields changed
+        after since version (may contain duplicates). List is None if since is
+        older than the oldest change in the log (or not a version of the
+        current log), in which case client needs the full state.
+        '''
+        version_key = cache.make_key(get_overview_changes_version_key(user_pk))
+        pipeline = get_redis_connection("default").pipeline()
+        pipeline.set(version_key, time.time_ns(), nx=True)
+        pipeline.get(version_key)
+        pipeline.lrange(cache.make_key(get_overview_changes_key(user_pk)), 0, -1)
+        _, version, fields = pipeline.execute()
+        version = int(version)
+
+        # Last field in log was added at current version, first at version
+        # minus log length plus 1
+        if not version - len(fields) <= since <= version:
+            return version, None
+        return version, [
+            field.decode() for field in fields[len(fields) - (version - since):]
+        ]
+
+    def load_json(self, user_pk):
+        '''Returns cached overview state JSON bytes, or None if not cached (or
+        if the overview state itself is not cached).
+        '''
+        pipeline = get_redis_connection("default").pipeline(transaction=False)
+        pipeline.exists(self._key(user_pk))
+        pipeline.get(cache.make_key(get_overview_state_json_key(user_pk)))
+        exists, value = pipeline.execute()
+        if not exists:
+            return None
+        return value
+
+    def cache_json(self, user_pk, serialize):
+        '''Takes user primary key and function that returns overview state JSON
+        bytes. Calls function while watching cached state, caches returned bytes
+        unless the state changed (or was not cached) before they were written
+        (never caches JSON of an outdated state). Returns JSON bytes.
+
+        Serializes a second time if state changed (function usually builds and
+        caches the state if it was missing, which counts as a change).
+        '''
+        key = self._key(user_pk)
+        with get_redis_connection("default").pipeline() as pipeline:
+            for _ in range(2):
+                pipeline.watch(key)
+                value = serialize()
+                if not pipeline.exists(key):
+                    break
+                pipeline.multi()
+                pipeline.set(cache.make_key(get_overview_state_json_key(user_pk)), value)
+                try:
+                    pipeline.execute()
+                    break
+                except WatchError:
+                    continue
+        return value
+
+
+class PickleStateStorage(BaseStateStorage):
+    '''Stores the whole overview state as a single pickled value.'''
+
+    def _encode(self, state):
+        '''Takes state dict, returns value written to redis.'''
+        return cache.client.encode(state)
+
+    def _decode(self, value):
+        '''Takes value read from redis, returns state dict (None if invalid).'''
+        # Written by compact layout before OVERVIEW_STATE_STORAGE was changed
+        if value[:1] in (RAW_HEADER, COMPRESSED_HEADER):
+            return None
+        return cache.client.decode(value)
+
+    def _load(self, key):
+        '''Takes key name including cache prefix, returns state dict or None.'''
+        try:
+            value = get_redis_connection("default").get(key)
+        except ResponseError as error:
+            self._discard_other_layout(key, error)
+            return None
+        if value is None:
+            return None
+        return self._decode(value)
+
+    def save(self, user_pk, state):
+        '''Overwrites cached overview state with state dict (never expires).'''
+        pipeline = get_redis_connection("default").pipeline()
+        pipeline.set(self._key(user_pk), self._encode(state))
+        self._queue_state_changed(pipeline, user_pk)
+        self._queue_log_reset(pipeline, user_pk)
+        pipeline.execute()
+
+    def load_entries(self, user_pk, fields):
+        '''Takes user primary key and list of entry fields, returns dict with
+        plants and groups keys containing details of each entry that exists,
+        plus all top-level keys (show_archive, title). Returns None if not cached.
+        '''
+        state = self.load(user_pk)
+        if state is None:
+            return None
+        entries = {'plants': {}, 'groups': {}}
+        for field in fields:
+            key, uuid = field.split(':', 1)
+            if uuid in state[key]:
+                entries[key][uuid] = state[key][uuid]
+        entries['show_archive'] = state['show_archive']
+        entries['title'] = state['title']
+        return entries
+
+    def _modify(self, user_pk, modifiers):
+        '''Takes user primary key and list of (field, modify) tuples where field
+        is the entry field name (None for top-level keys) and modify is a
+        function that takes state dict, modifies it in place, and returns True if
+        anything changed (False if not). Loads state, calls each function, and
+        writes state in a single transaction (only written if at least one
+        function changed state). Changed entry fields are added to change log.
+        '''
+        key = self._key(user_pk)
+
+        def transaction(pipeline):
+            try:
+                value = pipeline.get(key)
+            except ResponseError as error:
+                if not is_wrong_type_error(error):
+                    raise
+                # Written by hash layout before OVERVIEW_STATE_STORAGE was changed
+                pipeline.multi()
+                pipeline.delete(key)
+                return False
+            state = None if value is None else self._decode(value)
+            if state is None:
+                return False
+            # Call every function (don't stop at first that changed state)
+            changed = False
+            changed_fields = []
+            for field, modify in modifiers:
+                if modify(state):
+                    changed = True
+                    if field is not None:
+                        changed_fields.append(field)
+            if changed:
+                pipeline.multi()
+                pipeline.set(key, self._encode(state))
+                self._queue_state_changed(pipeline, user_pk)
+                self._queue_log_changes(pipeline, user_pk, changed_fields)
+            return True
+
+        return self._transaction(user_pk, transaction)
+
+    def _set_entry(self, key, uuid, details):
+        def modify(state):
+            state[key][uuid] = details
+            return True
+        return (self._entry_field(key, uuid), modify)
+
+    def _update_entry(self, key, uuid, update_dict):
+        def modify(state):
+            if uuid not in state[key]:
+                return False
+            state[key][uuid].update(update_dict)
+            return True
+        return (self._entry_field(key, uuid), modify)
+
+    def _delete_entry(self, key, uuid):
+        def modify(state):
+            return state[key].pop(uuid, None) is not None
+        return (self._entry_field(key, uuid), modify)
+
+    def _set_value(self, name, value):
+        def modify(state):
+            state[name] = value
+            return True
+        return (None, modify)
+
+    def set_entry(self, user_pk, key, uuid, details):
+        '''Adds or overwrites a plant (key=plants) or group (key=groups) entry.'''
+        return self._modify(user_pk, [self._set_entry(key, uuid, details)])
+
+    def update_entry(self, user_pk, key, uuid, update_dict):
+        '''Updates keys in an existing plant or group entry (does nothing if
+        the entry does not exist).
+        '''
+        return self._modify(user_pk, [self._update_entry(key, uuid, update_dict)])
+
+    def delete_entry(self, user_pk, key, uuid):
+        '''Removes a plant or group entry (does nothing if it does not exist).'''
+        return self._modify(user_pk, [self._delete_entry(key, uuid)])
+
+    def set_value(self, user_pk, name, value):
+        '''Overwrites a top-level state key (show_archive, title).'''
+        return self._modify(user_pk, [self._set_value(name, value)])
+
+    def apply_batch(self, user_pk, operations):
+        '''Takes user primary key and list of (method name, *args) tuples where
+        method name is set_entry, update_entry, delete_entry, or set_value and
+        args are the same as the method (excluding user_pk). Applies all
+        operations in order in a single transaction (state written once).
+        '''
+        return self._modify(user_pk, [
+            getattr(self, f'_{name}')(*args) for name, *args in operations
+        ])
+
+
+class HashStateStorage(BaseStateStorage):
+    '''Stores each plant and group entry as a separate field in a redis hash.
+
+    Field names are "plants:{uuid}" and "groups:{uuid}" for entries, and the
+    top-level key name (show_archive, title) for all other state keys. The
+    title field is always written when the state is built, so the hash exists
+    (state is cached) even if the user has no plants or groups.
+    '''
+
+    # Top-level keys that are not plant or group entries
+    value_keys = ('show_archive', 'title')
+
+    def _load(self, key):
+        '''Takes key name including cache prefix, returns state dict or None.'''
+        try:
+            fields = get_redis_connection("default").hgetall(key)
+        except ResponseError as error:
+            self._discard_other_layout(key, error)
+            return None
+        if not fields:
+            return None
+
+        state = {'plants': {}, 'groups': {}}
+        for field, value in fields.items():
+            field = field.decode()
+            if field in self.value_keys:
+                state[field] = json.loads(value)
+            else:
+                key, uuid = field.split(':', 1)
+                state[key][uuid] = json.loads(value)
+
+        # Hash fields are unordered, restore same order as build_overview_state
+        # (created, then uuid if created is equal)
+        for key in ('plants', 'groups'):
+            state[key] = dict(sorted(
+                state[key].items(),
+                key=lambda item: (item[1]['created'], item[0])
+            ))
+        return state
+
+    def save(self, user_pk, state):
+        '''Overwrites cached overview state with state dict (never expires).'''
+        mapping = {
+            self._entry_field(key, uuid): json.dumps(details)
+            for key in ('plants', 'groups')
+            for uuid, details in state[key].items()
+        }
+        mapping.update({
+            name: json.dumps(state[name]) for name in self.value_keys
+        })
+        pipeline = get_redis_connection("default").pipeline()
+        pipeline.delete(self._key(user_pk))
+        pipeline.hset(self._key(user_pk), mapping=mapping)
+        self._queue_state_changed(pipeline, user_pk)
+        self._queue_log_reset(pipeline, user_pk)
+        pipeline.execute()
+
+    def load_entries(self, user_pk, fields):
+        '''Takes user primary key and list of entry fields, returns dict with
+        plants and groups keys containing details of each entry that exists,
+        plus all top-level keys (show_archive, title). Returns None if not cached.
+
+        Only reads requested fields (single HMGET, does not load whole state).
+        '''
+        fields = list(dict.fromkeys(fields))
+        try:
+            values = get_redis_connection("default").hmget(
+                self._key(user_pk),
+                list(self.value_keys) + fields
+            )
+        except ResponseError as error:
+            self._discard_other_layout(self._key(user_pk), error)
+            return None
+        # Title field is always written, missing if state not cached
+        if values[self.value_keys.index('title')] is None:
+            return None
+        entries = {'plants': {}, 'groups': {}}
+        for name, value in zip(self.value_keys, values):
+            entries[name] = json.loads(value)
+        for field, value in zip(fields, values[len(self.value_keys):]):
+            if value is not None:
+                key, uuid = field.split(':', 1)
+                entries[key][uuid] = json.loads(value)
+        return entries
+
+    def _apply(self, user_pk, operations):
+        '''Takes user primary key and list of (field, update, reads) tuples where
+        update is a function that takes the current field value (decoded, None
+        if missing) and returns the new value (None deletes the field). Current
+        values are only read from redis if reads is True (otherwise None).
+
+        Reads all fields in a single HMGET, applies all updates in order, and
+        writes all changed fields in a single transaction.
+        '''
+        state_key = self._key(user_pk)
+        read_fields = list(dict.fromkeys(
+            field for field, _, reads in operations if reads
+        ))
+
+        def transaction(pipeline):
+            try:
+                if not pipeline.hlen(state_key):
+                    return False
+            except ResponseError as error:
+                if not is_wrong_type_error(error):
+                    raise
+                # Written by pickle or compact layout before
+                # OVERVIEW_STATE_STORAGE was changed
+                pipeline.multi()
+                pipeline.delete(state_key)
+                return False
+            values = {}
+            if read_fields:
+                for field, value in zip(read_fields, pipeline.hmget(state_key, read_fields)):
+                    values[field] = json.loads(value) if value is not None else None
+
+            # Apply updates in order, track fields that need to be written
+            # (update of an entry that does not exist does not change anything)
+            changed = set()
+            for field, update, reads in operations:
+                old = values.get(field)
+                values[field] = update(old)
+                if values[field] is not None or old is not None or not reads:
+                    changed.add(field)
+
+            if changed:
+                mapping = {
+                    field: json.dumps(values[field])
+                    for field in changed if values[field] is not None
+                }
+                deleted = [field for field in changed if values[field] is None]
+                pipeline.multi()
+                if mapping:
+                    pipeline.hset(state_key, mapping=mapping)
+                if deleted:
+                    pipeline.hdel(state_key, *deleted)
+                self._queue_state_changed(pipeline, user_pk)
+                self._queue_log_changes(pipeline, user_pk, [
+                    field for field in changed if field not in self.value_keys
+                ])
+            return True
+
+        return self._transaction(user_pk, transaction)
+
+    def _set_entry(self, key, uuid, details):
+        return (self._entry_field(key, uuid), lambda _: details, False)
+
+    def _update_entry(self, key, uuid, update_dict):
+        def update(details):
+            return None if details is None else {**details, **update_dict}
+        return (self._entry_field(key, uuid), update, True)
+
+    def _delete_entry(self, key, uuid):
+        return (self._entry_field(key, uuid), lambda _: None, False)
+
+    def _set_value(self, name, value):
+        return (name, lambda _: value, False)
+
+    def set_entry(self, user_pk, key, uuid, details):
+        '''Adds or overwrites a plant (key=plants) or group (key=groups) entry.'''
+        return self._apply(user_pk, [self._set_entry(key, uuid, details)])
+
+    def update_entry(self, user_pk, key, uuid, update_dict):
+        '''Updates keys in an existing plant or group entry (does nothing if
+        the entry does not exist).
+        '''
+        return self._apply(user_pk, [self._update_entry(key, uuid, update_dict)])
+
+    def delete_entry(self, user_pk, key, uuid):
+        '''Removes a plant or group entry (does nothing if it does not exist).'''
+        return self._apply(user_pk, [self._delete_entry(key, uuid)])
+
+    def set_value(self, user_pk, name, value):
+        '''Overwrites a top-level state key (show_archive, title).'''
+        return self._apply(user_pk, [self._set_value(name, value)])
+
+    def apply_batch(self, user_pk, operations):
+        '''Takes user primary key and list of (method name, *args) tuples where
+        method name is set_entry, update_entry, delete_entry, or set_value and
+        args are the same as the method (excluding user_pk). Applies all
+        operations in order in a single transaction (reads all entries that are
+        updated with one HMGET, writes all changes with one HSET and HDEL).
+        '''
+        return self._apply(user_pk, [
+            getattr(self, f'_{name}')(*args) for name, *args in operations
+        ])
+
+
+class CompactStateStorage(PickleStateStorage):
+    '''Stores the whole overview state as a single value with the compact
+    columnar encoding (see compact_state.py).
+    '''
+
+    def _encode(self, state):
+        return encode_state(state)
+
+    def _decode(self, value):
+        return decode_state(value)
+
+
+class InstanceStateStorage:
+    '''Stores pickled states of individual plants or groups (separate key for
+    each instance, expires after MANAGE_STATE_TIMEOUT).
+
+    Subclasses set get_key (function that takes primary key, returns key name)
+    and may add operations (methods named _<operation> that take state dict
+    plus args, modify state in place, and return True if anything changed).
+    '''
+
+    get_key = None
+
+    def _key(self, pk):
+        '''Returns cached state key name including cache prefix.'''
+        return cache.make_key(self.get_key(pk))
+
+    def load(self, pk):
+        '''Returns cached state dict, or None if not cached.'''
+        return cache.get(self.get_key(pk))
+
+    def exists(self, pk):
+        '''Returns True if state is cached (without loading it).'''
+        return cache.has_key(self.get_key(pk))
+
+    def save(self, pk, state):
+        '''Overwrites cached state with state dict.'''
+        cache.set(self.get_key(pk), state, MANAGE_STATE_TIMEOUT)
+
+    def delete(self, pks):
+        '''Takes list of primary keys, deletes all cached states.'''
+        if pks:
+            cache.delete_many([self.get_key(pk) for pk in pks])
+
+    def delete_all(self):
+        '''Deletes cached states of all instances.'''
+        cache.delete_pattern(self.get_key('*'))
+
+    def apply_batch(self, operations):
+        '''Takes dict with primary keys as keys and lists of (operation name,
+        *args) tuples as values. Loads all states with a single MGET, applies
+        all operations in order, and writes all changed states in a single
+        transaction (states that are not cached are skipped). Deletes all
+        states if the transaction could not commit.
+        '''
+        keys = {pk: self._key(pk) for pk, ops in operations.items() if ops}
+
+        def transaction(pipeline):
+            changed = {}
+            for pk, value in zip(keys, pipeline.mget(list(keys.values()))):
+                if value is None:
+                    continue
+                state = cache.client.decode(value)
+                # Call every operation (don't stop at first that changed state)
+                modified = False
+                for name, *args in operations[pk]:
+                    modified = getattr(self, f'_{name}')(state, *args) or modified
+                if modified:
+                    changed[keys[pk]] = state
+            if changed:
+                pipeline.multi()
+                for key, state in changed.items():
+                    pipeline.set(key, cache.client.encode(state), keepttl=True)
+            return True
+
+        if keys and run_transaction(list(keys.values()), transaction) is None:
+            self.delete(list(keys))
+
+    def _set_entry(self, state, key, name, value):
+        state[key][name] = value
+        return True
+
+    def _update_entry(self, state, key, name, update_dict):
+        if name not in state[key]:
+            return False
+        state[key][name].update(update_dict)
+        return True
+
+    def _delete_entries(self, state, key, names):
+        changed = False
+        for name in names:
+            changed = state[key].pop(name, None) is not None or changed
+        return changed
+
+
+class ManagePlantStateStorage(InstanceStateStorage):
+    '''Stores cached manage_plant states (events, notes, photos, and
+    change_events keys only, see get_state_views.get_manage_plant_state).
+    '''
+
+    get_key = staticmethod(get_manage_plant_state_key)
+
+    def _add_event(self, state, event_type, timestamp):
+        timestamps = state['events'][event_type]
+        if timestamp in timestamps:
+            return False
+        # Keep same order as database (most-recent first)
+        timestamps.append(timestamp)
+        timestamps.sort(reverse=True)
+        return True
+
+    def _delete_events(self, state, event_type, timestamps):
+        before = state['events'][event_type]
+        state['events'][event_type] = [
+            timestamp for timestamp in before if timestamp not in timestamps
+        ]
+        return len(before) != len(state['events'][event_type])
+
+
+class ManageGroupStateStorage(InstanceStateStorage):
+    '''Stores cached manage_group states (details of each plant in group and
+    display names version, see get_state_views.get_manage_group_state).
+    '''
+
+    get_key = staticmethod(get_manage_group_state_key)
+
+
+# Maps OVERVIEW_STATE_STORAGE setting values to storage classes
+storage_map = {
+    'pickle': PickleStateStorage,
+    'hash': HashStateStorage,
+    'compact': CompactStateStorage
+}
+
+
+def get_overview_state_storage(archived=False):
+    '''Returns storage instance for the configured OVERVIEW_STATE_STORAGE.
+    Stores the archived overview state instead if archived arg is True.
+    '''
+    return storage_map[settings.OVERVIEW_STATE_STORAGE](archived=archived)
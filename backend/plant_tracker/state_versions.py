@@ -0,0 +1,147 @@
+'''Version counters used to generate ETags for SPA state endpoints.
+
+Each user has an overview version, incremented whenever their cached overview
+state changes. It is also used for the plant and group options endpoints (only
+contain details shown on the overview page).
+
+Each plant and group has a version incremented whenever its manage page state
+changes. Plant and group details are also shown on other manage pages (plant
+details in the group page, group name in the plant page, parent and child names
+in divided plant pages), so bumping a plant also bumps its group and parent
+plant, and the plant ETag includes the group and parent plant versions.
+
+Each user also has a display names version, incremented when unnamed plants or
+groups are renumbered (changes names shown on many manage pages at once).
+
+Versions are bumped by mutation views after the database is updated, so a
+client can never receive an ETag for a version that is newer than the data it
+was sent with. Missing versions are initialized to the current time in
+nanoseconds instead of 0, so versions never repeat after the cache is cleared
+(prevents 304 responses for an outdated ETag the client cached earlier).
+
+Bumping the overview version also publishes an invalidation for the in-process
+overview cache (see local_state_cache.py), which keeps each ETag with its JSON.
+'''
+
+import time
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+from .local_state_cache import get_invalidation_channel
+
+
+def get_state_version_key(name, pk):
+    '''Takes version name (user, display_names, plant, group) and primary key
+    of the user, plant, or group. Returns name of cached version key.
+    '''
+    return f'{name}_state_version_{pk}'
+
+
+def get_instance_version_keys(instance):
+    '''Takes plant or group, returns list of version keys for all manage page
+    states that contain its details (own page, group page, parent plant page).
+    '''
+    keys = [get_state_version_key(instance._meta.model_name, instance.pk)]
+    if getattr(instance, 'group_id', None):
+        keys.append(get_state_version_key('group', instance.group_id))
+    if getattr(instance, 'divided_from_id', None):
+        keys.append(get_state_version_key('plant', instance.divided_from_id))
+    return keys
+
+
+def bump_state_versions(
+    user_pk,
+    instances=(),
+    overview=True,
+    display_names=False,
+    old_group_pks=()
+):
+    '''Takes user primary key and list of plants or groups that changed.
+    Increments manage page versions of each instance (and related instances).
+    Increments user overview version unless overview arg is False (use when
+    only manage page states changed). Increments user display names version if
+    display_names arg is True (unnamed plants or groups were renumbered).
+    Optional old_group_pks arg is a list of group primary keys that plants were
+    moved out of (no longer related to plant, but group page state changed).
+    '''
+    keys = set()
+    if overview:
+        keys.add(get_state_version_key('user', user_pk))
+    if display_names:
+        keys.add(get_state_version_key('display_names', user_pk))
+    for instance in instances:
+        keys.update(get_instance_version_keys(instance))
+    for group_pk in old_group_pks:
+        keys.add(get_state_version_key('group', group_pk))
+
+    pipeline = get_redis_connection("default").pipeline(transaction=False)
+    initial = time.time_ns()
+    for key in keys:
+        key = cache.make_key(key)
+        pipeline.set(key, initial, nx=True)
+        pipeline.incr(key)
+    # Remove outdated ETag from in-process caches (see local_state_cache.py)
+    if overview:
+        pipeline.publish(get_invalidation_channel(), user_pk)
+    pipeline.execute()
+
+
+def get_state_versions(*keys):
+    '''Takes one or more version key names, returns list of current versions.
+    Initializes missing versions (see module docstring).
+    '''
+    pipeline = get_redis_connection("default").pipeline(transaction=False)
+    initial = time.time_ns()
+    for key in keys:
+        key = cache.make_key(key)
+        pipeline.set(key, initial, nx=True)
+        pipeline.get(key)
+    return [int(version) for version in pipeline.execute()[1::2]]
+
+
+def get_overview_etag(user_pk):
+    '''Takes user primary key, returns ETag for overview and options states.'''
+    version = get_state_versions(get_state_version_key('user', user_pk))[0]
+    return f'{user_pk}-{version}'
+
+
+def get_display_names_version(user_pk):
+    '''Takes user primary key, returns current display names version (used to
+    detect outdated unnamed plant names in cached manage_group states).
+    '''
+    return get_state_versions(get_state_version_key('display_names', user_pk))[0]
+
+
+def get_manage_plant_etag(user_pk, plant_pk, group_pk=None, parent_pk=None):
+    '''Takes user and plant primary keys plus primary keys of plant's group and
+    parent plant (if any), returns ETag for manage_plant state.
+    '''
+    versions = get_state_versions(
+        get_state_version_key('display_names', user_pk),
+        get_state_version_key('plant', plant_pk),
+        *([get_state_version_key('group', group_pk)] if group_pk else []),
+        *([get_state_version_key('plant', parent_pk)] if parent_pk else []),
+    )
+    return '-'.join(
+        ['plant', str(plant_pk), str(group_pk), str(parent_pk)] +
+        [str(version) for version in versions]
+    )
+
+
+def get_manage_group_etag(user_pk, group_pk):
+    '''Takes user and group primary keys, returns ETag for manage_group state.'''
+    versions = get_state_versions(
+        get_state_version_key('display_names', user_pk),
+        get_state_version_key('group', group_pk)
+    )
+    return '-'.join(
+        ['group', str(group_pk)] + [str(version) for version in versions]
+    )
+
+
+def delete_all_state_versions():
+    '''Deletes all version keys (reinitialized to current time when needed).
+    Called when server starts in case database was modified offline.
+    '''
+    cache.delete_pattern('*_state_version_*')
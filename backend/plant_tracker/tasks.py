@@ -1,13 +1,33 @@
 '''Async tasks run by celery worker to update cached frontend states.'''
 
-from celery import shared_task
+from celery import shared_task, chain
 from django.conf import settings
 from django.core.cache import cache
 from django.core.mail import send_mail
 from django.contrib.auth import get_user_model
-from django.db.models import IntegerField, OuterRef, Subquery
+from django.db.models import F
 from .models import Photo
-from .get_state_views import build_overview_state, update_cached_overview_details_keys
+from .get_state_views import (
+    build_overview_state,
+    update_cached_overview_details_keys,
+    add_photos_to_cached_manage_plant_state
+)
+from .state_cache import (
+    get_overview_state_storage,
+    ManagePlantStateStorage,
+    ManageGroupStateStorage
+)
+from .state_versions import bump_state_versions, delete_all_state_versions
+from .uuid_cache import delete_all_uuid_entries
+
+# Number of users whose overview states are rebuilt by each batch task when the
+# server starts
+STARTUP_REBUILD_BATCH_SIZE = 25
+
+# Max number of batch tasks queued at the same time when the server starts
+# (each chain of batches runs one at a time, leaves celery workers free to
+# process photo uploads)
+STARTUP_REBUILD_CONCURRENCY = 2
 
 
 @shared_task
@@ -30,20 +50,87 @@ def update_cached_overview_state(user_pk):
     print(f'Rebuilt overview state for {user_pk}')
 
 
+@shared_task()
+def update_cached_overview_states(user_pks):
+    '''Takes list of user primary keys, builds and caches overview state of
+    each user in order. Deletes cached states of users that no longer exist,
+    or that could not be built (rebuilt next time they are requested).
+    '''
+    users = get_user_model().objects.in_bulk(user_pks)
+    for user_pk in user_pks:
+        if user_pk not in users:
+            get_overview_state_storage().delete(user_pk)
+            continue
+        try:
+            build_overview_state(users[user_pk])
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            get_overview_state_storage().delete(user_pk)
+            print(f'Failed to rebuild overview state for {user_pk}: {error!r}')
+    print(f'Rebuilt overview states for {len(users)} users')
+
+
+def sort_users_by_last_login(user_pks):
+    '''Takes list of user primary keys, returns sorted by last login (most
+    recent first). Users that never logged in or no longer exist are last.
+    '''
+    sorted_pks = list(
+        get_user_model().objects
+            .filter(pk__in=user_pks)
+            .order_by(F('last_login').desc(nulls_last=True), 'pk')
+            .values_list('pk', flat=True)
+    )
+    return sorted_pks + sorted(set(user_pks) - set(sorted_pks))
+
+
+def queue_overview_state_rebuilds(user_pks):
+    '''Takes list of user primary keys in the order they should be rebuilt.
+    Splits into batches of STARTUP_REBUILD_BATCH_SIZE users, queues batches in
+    STARTUP_REBUILD_CONCURRENCY chains (each chain only queues its next batch
+    after the previous one finishes, so the celery queue never fills up).
+    Batches are spread evenly between chains (first users rebuilt first).
+    '''
+    batches = [
+        user_pks[i:i + STARTUP_REBUILD_BATCH_SIZE]
+        for i in range(0, len(user_pks), STARTUP_REBUILD_BATCH_SIZE)
+    ]
+    for i in range(STARTUP_REBUILD_CONCURRENCY):
+        tasks = [
+            update_cached_overview_states.si(batch)
+            for batch in batches[i::STARTUP_REBUILD_CONCURRENCY]
+        ]
+        if tasks:
+            chain(*tasks).delay()
+
+
 @shared_task()
 def update_all_cached_states():
     '''Updates all cached overview states that have keys in redis store.
+    Deletes all cached archived overview, manage_plant, and manage_group states.
     Recreate tasks to generate thumbnails for pending photos (if any).
     Called when server starts to prevent serving outdated states.
+
+    Finds keys with SCAN (KEYS blocks redis while scanning the whole keyspace).
     '''
 
     # Find cached overview states, parse user primary key from name, rebuild
-    for key in cache.keys('overview_state_*'):
-        update_cached_overview_state.delay(key.split('_')[-1])
+    # in batches (most-recently-active users first)
+    user_pks = [
+        int(key.split('_')[-1]) for key in cache.iter_keys('overview_state_*')
+    ]
+    queue_overview_state_rebuilds(sort_users_by_last_login(user_pks))
+    # Reset all state versions (ETags) in case database was modified offline
+    delete_all_state_versions()
+    # Delete cached UUID entries in case database was modified offline
+    delete_all_uuid_entries()
+    # Delete cached archived overview and manage page states (rebuilt next
+    # time they are requested)
+    cache.delete_pattern('archived_overview_state_*')
+    ManagePlantStateStorage().delete_all()
+    ManageGroupStateStorage().delete_all()
     # Queue tasks to process any pending photos that did not complete
-    for key in cache.keys('pending_photo_upload_*'):
+    for key in cache.iter_keys('pending_photo_upload_*'):
         status = cache.get(key)
-        if status.get('status') == 'processing':  # pragma: no branch
+        if status and status.get('status') == 'processing':  # pragma: no branch
             process_photo_upload.delay(key.split('_')[-1])
 
 
@@ -57,15 +144,6 @@ def process_photo_upload(photo_pk):
         photo = Photo.objects.select_related(
             'plant',
             'plant__user'
-        ).annotate(
-            # Get primary key of most-recent photo associated with plant
-            plant_last_photo_pk=Subquery(
-                Photo.objects
-                    .filter(plant_id=OuterRef('plant_id'))
-                    .order_by('-timestamp')
-                    .values('pk')[:1],
-                output_field=IntegerField()
-            )
         ).get(pk=photo_pk)
     except Photo.DoesNotExist:
         cache.set(
@@ -97,10 +175,17 @@ def process_photo_upload(photo_pk):
         300
     )
 
+    # Update photo details in cached manage_plant state (thumbnail URLs)
+    add_photos_to_cached_manage_plant_state(photo.plant, [photo])
+
     # Update thumbnail in cached overview state if default photo is not set and
     # photo being processed is most-recent
-    if not photo.plant.default_photo_id and photo.plant_last_photo_pk == photo.pk:
+    if not photo.plant.default_photo_id and photo.plant.last_photo_id == photo.pk:
         update_cached_overview_details_keys(
             photo.plant,
             {'thumbnail': photo.thumbnail.url}
         )
+        bump_state_versions(photo.plant.user_id, [photo.plant])
+    # Otherwise only update manage_plant state version (new photo thumbnail)
+    else:
+        bump_state_versions(photo.plant.user_id, [photo.plant], overview=False)
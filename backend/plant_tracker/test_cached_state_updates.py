@@ -1,15 +1,39 @@
 # pylint: disable=missing-docstring,line-too-long,R0801,too-many-lines,too-many-public-methods,global-statement
 
+import os
+import shutil
+from datetime import timedelta
 from uuid import uuid4
+from unittest.mock import patch
 
-from django.test import TestCase
+from django.conf import settings
 from django.utils import timezone
 from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.test.client import MULTIPART_CONTENT
+from django_redis import get_redis_connection
 
 from .view_decorators import get_default_user
-from .get_state_views import build_overview_state
+from . import get_state_views
+from .get_state_views import (
+    build_overview_state,
+    build_overview_state_once,
+    get_overview_state,
+    build_manage_plant_state,
+    build_manage_group_state,
+    overview_state_batch,
+    update_cached_overview_details_keys,
+    CACHED_MANAGE_PLANT_STATE_KEYS
+)
 from .models import Group, Plant, DivisionEvent, Photo
+from . import state_cache
+from .state_cache import (
+    get_overview_state_storage,
+    PickleStateStorage,
+    CompactStateStorage,
+    ManagePlantStateStorage,
+    ManageGroupStateStorage
+)
 from .unit_test_helpers import (
     JSONClient,
     create_mock_photo,
@@ -54,6 +78,9 @@ class EndpointStateUpdateTests(TestCase):
     def load_cached_overview_state(self):
         return cache.get(f'overview_state_{self.user.pk}')
 
+    def assertCachedStateMatchesDatabase(self):
+        self.assertEqual(self.load_cached_overview_state(), build_overview_state(self.user))
+
     def test_new_plant_registered(self):
         '''The overview state should update when a new plant is registered, but
         a state should NOT be cached for the new plant.
@@ -272,12 +299,14 @@ class EndpointStateUpdateTests(TestCase):
         self.assertEqual(updated_overview_state['plants'][str(self.plant1.uuid)]['pot_size'], 4)
 
     def test_edit_plant_details_unnamed_plant(self):
-        '''The cached overview state should clear when an unnamed plant is named
-        or a named plant is unnamed (changes unnamed index of other plants).
+        '''The cached overview state should update display names of unnamed
+        plants created after a plant that is named or unnamed (index changes).
         '''
 
-        # Confirm cached overview state exists
-        self.assertIsNotNone(self.load_cached_overview_state())
+        # Confirm both plants are unnamed in cached overview state
+        state = self.load_cached_overview_state()
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['display_name'], 'Unnamed plant 1')
+        self.assertEqual(state['plants'][str(self.plant2.uuid)]['display_name'], 'Unnamed plant 2')
 
         # Name a previously unnamed plant with /edit_plant_details endpoint
         response = self.client.post('/edit_plant_details', {
@@ -289,12 +318,11 @@ class EndpointStateUpdateTests(TestCase):
         })
         self.assertEqual(response.status_code, 200)
 
-        # Confirm cached overview state was cleared
-        self.assertIsNone(self.load_cached_overview_state())
-
-        # Rebuild overview state, confirm re-cached
-        build_overview_state(self.user)
-        self.assertIsNotNone(self.load_cached_overview_state())
+        # Confirm second plant index decreased, cached state was not cleared
+        state = self.load_cached_overview_state()
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['display_name'], 'plant name')
+        self.assertEqual(state['plants'][str(self.plant2.uuid)]['display_name'], 'Unnamed plant 1')
+        self.assertCachedStateMatchesDatabase()
 
         # Remove plant name and species with /edit_plant_details endpoint
         response = self.client.post('/edit_plant_details', {
@@ -306,8 +334,11 @@ class EndpointStateUpdateTests(TestCase):
         })
         self.assertEqual(response.status_code, 200)
 
-        # Confirm cached overview state was cleared
-        self.assertIsNone(self.load_cached_overview_state())
+        # Confirm both plants have original indices
+        state = self.load_cached_overview_state()
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['display_name'], 'Unnamed plant 1')
+        self.assertEqual(state['plants'][str(self.plant2.uuid)]['display_name'], 'Unnamed plant 2')
+        self.assertCachedStateMatchesDatabase()
 
     def test_edit_group_details(self):
         '''The cached overview state should update when group details are edited.'''
@@ -339,12 +370,18 @@ class EndpointStateUpdateTests(TestCase):
         self.assertEqual(updated_overview_state['groups'][str(self.group1.uuid)]['description'], 'Back yard')
 
     def test_edit_group_details_unnamed_group(self):
-        '''The cached overview state should clear when an unnamed group is named
-        or a named group is unnamed (changes unnamed index of other groups).
+        '''The cached overview state should update display names of unnamed
+        groups created after a group that is named or unnamed (index changes),
+        including the group name in details of plants in renumbered groups.
         '''
 
-        # Confirm cached overview state exists
-        self.assertIsNotNone(self.load_cached_overview_state())
+        # Add plant to second group, rebuild cached overview state
+        self.plant1.group = self.group2
+        self.plant1.save()
+        build_overview_state(self.user)
+        state = self.load_cached_overview_state()
+        self.assertEqual(state['groups'][str(self.group2.uuid)]['display_name'], 'Unnamed group 2')
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['group']['name'], 'Unnamed group 2')
 
         # Name a previously unnamed group with /edit_group_details endpoint
         response = self.client.post('/edit_group_details', {
@@ -355,12 +392,12 @@ class EndpointStateUpdateTests(TestCase):
         })
         self.assertEqual(response.status_code, 200)
 
-        # Confirm cached overview state was cleared
-        self.assertIsNone(self.load_cached_overview_state())
-
-        # Rebuild overview state, confirm re-cached
-        build_overview_state(self.user)
-        self.assertIsNotNone(self.load_cached_overview_state())
+        # Confirm second group index decreased (also in plant details)
+        state = self.load_cached_overview_state()
+        self.assertEqual(state['groups'][str(self.group1.uuid)]['display_name'], 'group name')
+        self.assertEqual(state['groups'][str(self.group2.uuid)]['display_name'], 'Unnamed group 1')
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['group']['name'], 'Unnamed group 1')
+        self.assertCachedStateMatchesDatabase()
 
         # Remove group name and location with /edit_group_details endpoint
         response = self.client.post('/edit_group_details', {
@@ -371,8 +408,48 @@ class EndpointStateUpdateTests(TestCase):
         })
         self.assertEqual(response.status_code, 200)
 
-        # Confirm cached overview state was cleared
-        self.assertIsNone(self.load_cached_overview_state())
+        # Confirm both groups have original indices
+        state = self.load_cached_overview_state()
+        self.assertEqual(state['groups'][str(self.group1.uuid)]['display_name'], 'Unnamed group 1')
+        self.assertEqual(state['groups'][str(self.group2.uuid)]['display_name'], 'Unnamed group 2')
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['group']['name'], 'Unnamed group 2')
+        self.assertCachedStateMatchesDatabase()
+
+    def test_edit_group_details_named_group_plants(self):
+        '''The cached overview state should update the group name in details
+        of plants in a group that is named (no longer renumbered) or renamed.
+        '''
+
+        # Add plant to first group, rebuild cached overview state
+        self.plant1.group = self.group1
+        self.plant1.save()
+        build_overview_state(self.user)
+        state = self.load_cached_overview_state()
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['group']['name'], 'Unnamed group 1')
+
+        # Name unnamed group, confirm new name in plant details
+        response = self.client.post('/edit_group_details', {
+            'group_id': self.group1.uuid,
+            'name': 'group name',
+            'location': '',
+            'description': ''
+        })
+        self.assertEqual(response.status_code, 200)
+        state = self.load_cached_overview_state()
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['group']['name'], 'group name')
+        self.assertCachedStateMatchesDatabase()
+
+        # Rename named group, confirm new name in plant details
+        response = self.client.post('/edit_group_details', {
+            'group_id': self.group1.uuid,
+            'name': '',
+            'location': 'Outside',
+            'description': ''
+        })
+        self.assertEqual(response.status_code, 200)
+        state = self.load_cached_overview_state()
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['group']['name'], 'Outside group')
+        self.assertCachedStateMatchesDatabase()
 
     def test_bulk_delete_plants(self):
         '''The cached overview state should update when a plant is deleted.'''
@@ -445,8 +522,8 @@ class EndpointStateUpdateTests(TestCase):
         )
 
     def test_bulk_delete_unnamed_plants(self):
-        '''The cached overview state should clear when an unnamed plant is
-        deleted (changes unnamed index of other plants).
+        '''The cached overview state should update display names of unnamed
+        plants created after a deleted unnamed plant (index changes).
         '''
 
         # Confirm plants are in cached overview state
@@ -455,17 +532,17 @@ class EndpointStateUpdateTests(TestCase):
         self.assertTrue(plant1_uuid in self.load_cached_overview_state()['plants'])
         self.assertTrue(plant2_uuid in self.load_cached_overview_state()['plants'])
 
-        # Delete plants with /bulk_delete_plants_and_groups endpoint
+        # Delete first plant with /bulk_delete_plants_and_groups endpoint
         response = self.client.post('/bulk_delete_plants_and_groups', {
-            'uuids': [
-                plant1_uuid,
-                plant2_uuid
-            ]
+            'uuids': [plant1_uuid]
         })
         self.assertEqual(response.status_code, 200)
 
-        # Confirm cached overview state was cleared
-        self.assertIsNone(self.load_cached_overview_state())
+        # Confirm removed from cached state, second plant index decreased
+        state = self.load_cached_overview_state()
+        self.assertNotIn(plant1_uuid, state['plants'])
+        self.assertEqual(state['plants'][plant2_uuid]['display_name'], 'Unnamed plant 1')
+        self.assertCachedStateMatchesDatabase()
 
     def test_bulk_archive_plants(self):
         '''The cached overview state should update when a plant is deleted.'''
@@ -528,8 +605,8 @@ class EndpointStateUpdateTests(TestCase):
         self.assertEqual(len(updated_overview_state['groups']), 0)
 
     def test_bulk_delete_unnamed_groups(self):
-        '''The cached overview state should clear when an unnamed group is
-        deleted (changes unnamed index of other groups).
+        '''The cached overview state should update display names of unnamed
+        groups created after a deleted unnamed group (index changes).
         '''
 
         # Confirm groups are in cached overview state
@@ -538,17 +615,43 @@ class EndpointStateUpdateTests(TestCase):
         self.assertTrue(group1_uuid in self.load_cached_overview_state()['groups'])
         self.assertTrue(group2_uuid in self.load_cached_overview_state()['groups'])
 
-        # Delete groups with /bulk_delete_plants_and_groups endpoint
+        # Delete first group and plant with /bulk_delete_plants_and_groups
         response = self.client.post('/bulk_delete_plants_and_groups', {
-            'uuids': [
-                group1_uuid,
-                group2_uuid
-            ]
+            'uuids': [group1_uuid, str(self.plant1.uuid)]
         })
         self.assertEqual(response.status_code, 200)
 
-        # Confirm cached overview state was cleared
-        self.assertIsNone(self.load_cached_overview_state())
+        # Confirm removed from cached state, second group and plant index decreased
+        state = self.load_cached_overview_state()
+        self.assertNotIn(group1_uuid, state['groups'])
+        self.assertEqual(state['groups'][group2_uuid]['display_name'], 'Unnamed group 1')
+        self.assertEqual(state['plants'][str(self.plant2.uuid)]['display_name'], 'Unnamed plant 1')
+        self.assertCachedStateMatchesDatabase()
+
+    def test_bulk_delete_unnamed_group_with_plants(self):
+        '''The cached overview state should remove the group from details of
+        plants in a deleted group (and renumber plants in later groups).
+        '''
+
+        # Add a plant to each group, rebuild cached overview state
+        self.plant1.group = self.group1
+        self.plant1.save()
+        self.plant2.group = self.group2
+        self.plant2.save()
+        build_overview_state(self.user)
+
+        # Delete first group with /bulk_delete_plants_and_groups
+        response = self.client.post('/bulk_delete_plants_and_groups', {
+            'uuids': [str(self.group1.uuid)]
+        })
+        self.assertEqual(response.status_code, 200)
+
+        # Confirm plant in deleted group has no group, plant in second group
+        # has new group name
+        state = self.load_cached_overview_state()
+        self.assertIsNone(state['plants'][str(self.plant1.uuid)]['group'])
+        self.assertEqual(state['plants'][str(self.plant2.uuid)]['group']['name'], 'Unnamed group 1')
+        self.assertCachedStateMatchesDatabase()
 
     def test_bulk_archive_groups(self):
         '''The cached overview state should update and the cached group state
@@ -1037,3 +1140,1235 @@ class EndpointStateUpdateTests(TestCase):
             self.load_cached_overview_state()['plants'][str(self.plant1.uuid)]['thumbnail'],
             '/media/user_1/thumbnails/older_photo_thumb.webp'
         )
+
+
+@override_settings(OVERVIEW_STATE_STORAGE='hash')
+class HashStorageEndpointStateUpdateTests(EndpointStateUpdateTests):
+    '''Runs all endpoint state update tests with the hash storage layout.'''
+
+    def setUp(self):
+        super().setUp()
+        # Delete mock photos written by parent class tests (prevents django
+        # adding random suffix to filenames that already exist)
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+
+    def load_cached_overview_state(self):
+        return get_overview_state_storage().load(self.user.pk)
+
+
+@override_settings(OVERVIEW_STATE_STORAGE='compact')
+class CompactStorageEndpointStateUpdateTests(EndpointStateUpdateTests):
+    '''Runs all endpoint state update tests with the compact storage layout.'''
+
+    def setUp(self):
+        super().setUp()
+        # Delete mock photos written by other test classes (prevents django
+        # adding random suffix to filenames that already exist)
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+
+    def load_cached_overview_state(self):
+        return get_overview_state_storage().load(self.user.pk)
+
+
+@override_settings(OVERVIEW_STATE_STORAGE='hash')
+class HashStateStorageTests(TestCase):
+    '''Tests for the redis hash overview state storage layout.'''
+
+    def setUp(self):
+        # Clear entire cache before each test
+        cache.clear()
+
+        self.user = get_default_user()
+        self.plant1 = Plant.objects.create(user=self.user, uuid=uuid4(), name='plant1')
+        self.plant2 = Plant.objects.create(user=self.user, uuid=uuid4(), name='plant2')
+        self.group1 = Group.objects.create(user=self.user, uuid=uuid4(), name='group1')
+        self.storage = get_overview_state_storage()
+        self.redis = get_redis_connection("default")
+        self.key = cache.make_key(f'overview_state_{self.user.pk}')
+
+    def test_build_overview_state_writes_one_field_per_entry(self):
+        # Build state, confirm stored as hash with 1 field per plant/group
+        state = build_overview_state(self.user)
+        self.assertEqual(self.redis.type(self.key), b'hash')
+        self.assertEqual(
+            {field.decode() for field in self.redis.hkeys(self.key)},
+            {
+                f'plants:{self.plant1.uuid}',
+                f'plants:{self.plant2.uuid}',
+                f'groups:{self.group1.uuid}',
+                'show_archive',
+                'title'
+            }
+        )
+
+        # Confirm loaded state is identical to built state (same order)
+        loaded = self.storage.load(self.user.pk)
+        self.assertEqual(loaded, state)
+        self.assertEqual(list(loaded['plants']), list(state['plants']))
+
+    def test_update_entry_only_changes_one_field(self):
+        build_overview_state(self.user)
+        plant2_field = f'plants:{self.plant2.uuid}'
+        plant2_before = self.redis.hget(self.key, plant2_field)
+
+        # Update plant1 name, confirm only plant1 field changed
+        self.assertTrue(self.storage.update_entry(
+            self.user.pk,
+            'plants',
+            str(self.plant1.uuid),
+            {'name': 'new name'}
+        ))
+        state = self.storage.load(self.user.pk)
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['name'], 'new name')
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['display_name'], 'plant1')
+        self.assertEqual(self.redis.hget(self.key, plant2_field), plant2_before)
+
+        # Update entry that does not exist, confirm not added to state
+        self.assertTrue(self.storage.update_entry(
+            self.user.pk,
+            'plants',
+            str(uuid4()),
+            {'name': 'new name'}
+        ))
+        self.assertEqual(len(self.storage.load(self.user.pk)['plants']), 2)
+
+    def test_storage_methods_return_false_if_not_cached(self):
+        # Confirm no cached state
+        self.assertIsNone(self.storage.load(self.user.pk))
+
+        # Confirm all methods return False and do not create partial hash
+        uuid = str(self.plant1.uuid)
+        self.assertFalse(self.storage.set_entry(self.user.pk, 'plants', uuid, {}))
+        self.assertFalse(self.storage.update_entry(self.user.pk, 'plants', uuid, {}))
+        self.assertFalse(self.storage.delete_entry(self.user.pk, 'plants', uuid))
+        self.assertFalse(self.storage.set_value(self.user.pk, 'title', 'Plants'))
+        self.assertFalse(self.redis.exists(self.key))
+
+    def test_empty_state_is_cached(self):
+        # Delete all plants and groups, build state
+        Plant.objects.all().delete()
+        Group.objects.all().delete()
+        build_overview_state(self.user)
+
+        # Confirm empty state was cached (not treated as cache miss)
+        self.assertEqual(
+            self.storage.load(self.user.pk),
+            {
+                'plants': {},
+                'groups': {},
+                'show_archive': False,
+                'title': 'Plant Overview'
+            }
+        )
+
+    def test_delete_cached_overview_state(self):
+        # Build state, delete with cache API, confirm hash was deleted
+        build_overview_state(self.user)
+        cache.delete(f'overview_state_{self.user.pk}')
+        self.assertIsNone(self.storage.load(self.user.pk))
+        self.assertFalse(self.redis.exists(self.key))
+
+    def test_entries_with_same_created_time_keep_order(self):
+        # Give both plants the same created time, build state
+        created = timezone.now()
+        Plant.objects.filter(user=self.user).update(created=created)
+        state = build_overview_state(self.user)
+
+        # Confirm built and loaded states have same order (uuid breaks ties)
+        self.assertEqual(
+            list(state['plants']),
+            sorted([str(self.plant1.uuid), str(self.plant2.uuid)])
+        )
+        self.assertEqual(list(self.storage.load(self.user.pk)['plants']), list(state['plants']))
+
+    def test_state_written_by_other_layout_is_not_cached(self):
+        # Build state with pickle layout (OVERVIEW_STATE_STORAGE was changed)
+        with override_settings(OVERVIEW_STATE_STORAGE='pickle'):
+            state = build_overview_state(self.user)
+        self.assertEqual(self.redis.type(self.key), b'string')
+
+        # Confirm treated as not cached, key deleted instead of raising error
+        self.assertIsNone(self.storage.load(self.user.pk))
+        self.assertFalse(self.redis.exists(self.key))
+        PickleStateStorage().save(self.user.pk, state)
+        self.assertIsNone(self.storage.load_entries(self.user.pk, [f'plants:{self.plant1.uuid}']))
+        self.assertFalse(self.redis.exists(self.key))
+        PickleStateStorage().save(self.user.pk, state)
+        self.assertFalse(self.storage.set_entry(self.user.pk, 'plants', str(uuid4()), {}))
+        self.assertFalse(self.redis.exists(self.key))
+
+        # Request overview, confirm state rebuilt with hash layout
+        response = JSONClient().get('/get_overview_state')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.redis.type(self.key), b'hash')
+
+        # Confirm pickle and compact layouts treat hash as not cached
+        for storage in (PickleStateStorage(), CompactStateStorage()):
+            build_overview_state(self.user)
+            self.assertIsNone(storage.load(self.user.pk))
+            self.assertFalse(self.redis.exists(self.key))
+            build_overview_state(self.user)
+            self.assertFalse(storage.update_entry(
+                self.user.pk, 'plants', str(self.plant1.uuid), {'name': 'new'}
+            ))
+            self.assertFalse(self.redis.exists(self.key))
+
+    def test_pickle_layout_ignores_compact_state(self):
+        # Build state with compact layout, confirm pickle layout treats it as
+        # not cached (can't be unpickled)
+        with override_settings(OVERVIEW_STATE_STORAGE='compact'):
+            build_overview_state(self.user)
+        self.assertIsNone(PickleStateStorage().load(self.user.pk))
+
+
+class ConcurrentStateUpdateTests(TestCase):
+    '''Tests that confirm concurrent updates to the same cached overview state
+    (eg from different gunicorn workers) are merged instead of overwritten.
+    '''
+
+    def setUp(self):
+        # Clear entire cache before each test
+        cache.clear()
+
+        self.user = get_default_user()
+        self.plant1 = Plant.objects.create(user=self.user, uuid=uuid4())
+        self.plant2 = Plant.objects.create(user=self.user, uuid=uuid4())
+        build_overview_state(self.user)
+        self.storage = get_overview_state_storage()
+
+    def simulate_concurrent_update(self, concurrent_update, attempts=1):
+        '''Returns context manager that runs concurrent_update function inside
+        the first N transactions (after transaction reads state, before it
+        commits). Simulates another worker writing between read and write.
+        '''
+        original = state_cache.run_transaction
+        calls = []
+
+        def run_transaction(key, transaction):
+            def wrapped_transaction(pipeline):
+                result = transaction(pipeline)
+                if len(calls) < attempts:
+                    calls.append(1)
+                    # Run concurrent update with real function (not wrapped)
+                    with patch.object(state_cache, 'run_transaction', original):
+                        concurrent_update()
+                return result
+            return original(key, wrapped_transaction)
+
+        return patch.object(state_cache, 'run_transaction', run_transaction)
+
+    def test_concurrent_updates_to_different_entries(self):
+        # Update plant1 while another worker updates plant2
+        with self.simulate_concurrent_update(lambda: self.storage.update_entry(
+            self.user.pk, 'plants', str(self.plant2.uuid), {'last_watered': 'now'}
+        )):
+            self.storage.update_entry(
+                self.user.pk, 'plants', str(self.plant1.uuid), {'last_fertilized': 'now'}
+            )
+
+        # Confirm both changes are present in cached state
+        state = self.storage.load(self.user.pk)
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['last_fertilized'], 'now')
+        self.assertEqual(state['plants'][str(self.plant2.uuid)]['last_watered'], 'now')
+
+    def test_concurrent_updates_to_same_entry(self):
+        # Update plant1 last_watered while another worker updates thumbnail
+        with self.simulate_concurrent_update(lambda: self.storage.update_entry(
+            self.user.pk, 'plants', str(self.plant1.uuid), {'thumbnail': 'photo.webp'}
+        )):
+            self.storage.update_entry(
+                self.user.pk, 'plants', str(self.plant1.uuid), {'last_watered': 'now'}
+            )
+
+        # Confirm both changes are present in cached state
+        state = self.storage.load(self.user.pk)
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['last_watered'], 'now')
+        self.assertEqual(state['plants'][str(self.plant1.uuid)]['thumbnail'], 'photo.webp')
+
+    def test_concurrent_remove_and_add(self):
+        # Remove plant1 while another worker adds a new entry
+        new_uuid = str(uuid4())
+        with self.simulate_concurrent_update(lambda: self.storage.set_entry(
+            self.user.pk, 'plants', new_uuid, {'uuid': new_uuid, 'created': 'now'}
+        )):
+            self.storage.delete_entry(self.user.pk, 'plants', str(self.plant1.uuid))
+
+        # Confirm plant1 was removed and new plant was added
+        state = self.storage.load(self.user.pk)
+        self.assertNotIn(str(self.plant1.uuid), state['plants'])
+        self.assertIn(new_uuid, state['plants'])
+
+    def test_state_deleted_if_transaction_never_commits(self):
+        # Simulate another worker writing during every attempt
+        with self.simulate_concurrent_update(
+            lambda: self.storage.set_value(self.user.pk, 'show_archive', True),
+            attempts=state_cache.MAX_TRANSACTION_ATTEMPTS
+        ):
+            self.assertTrue(self.storage.update_entry(
+                self.user.pk, 'plants', str(self.plant1.uuid), {'last_watered': 'now'}
+            ))
+
+        # Confirm cached state was deleted (will be rebuilt from database)
+        self.assertIsNone(self.storage.load(self.user.pk))
+
+
+@override_settings(OVERVIEW_STATE_STORAGE='hash')
+class HashStorageConcurrentStateUpdateTests(ConcurrentStateUpdateTests):
+    '''Runs all concurrent update tests with the hash storage layout.'''
+
+
+@override_settings(OVERVIEW_STATE_STORAGE='compact')
+class CompactStorageConcurrentStateUpdateTests(ConcurrentStateUpdateTests):
+    '''Runs all concurrent update tests with the compact storage layout.'''
+
+
+class CachedOverviewStateJsonTests(TestCase):
+    '''Tests that confirm the overview state endpoint serves cached JSON bytes
+    and that they are invalidated whenever the cached state changes.
+    '''
+
+    def setUp(self):
+        # Clear entire cache before each test
+        cache.clear()
+
+        self.user = get_default_user()
+        self.plant = Plant.objects.create(user=self.user, uuid=uuid4())
+        self.storage = get_overview_state_storage()
+        self.redis = get_redis_connection("default")
+        self.json_key = cache.make_key(f'overview_json_{self.user.pk}')
+
+    def test_json_cached_on_first_request(self):
+        # Confirm no JSON cached yet
+        self.assertFalse(self.redis.exists(self.json_key))
+
+        # Request overview state, confirm JSON bytes were cached
+        response = self.client.get('/get_overview_state')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(self.redis.get(self.json_key), response.content)
+
+        # Confirm response contains same state as cached state
+        self.assertEqual(response.json(), self.storage.load(self.user.pk))
+
+        # Request again, confirm cached bytes are returned without loading state
+        with patch.object(type(self.storage), 'load') as mock_load:
+            response = self.client.get('/get_overview_state')
+            mock_load.assert_not_called()
+        self.assertEqual(response.content, self.redis.get(self.json_key))
+
+    def test_json_deleted_when_state_updated(self):
+        # Request overview state, confirm JSON bytes were cached
+        self.client.get('/get_overview_state')
+        self.assertTrue(self.redis.exists(self.json_key))
+
+        # Update cached state, confirm JSON bytes were deleted
+        self.storage.update_entry(
+            self.user.pk, 'plants', str(self.plant.uuid), {'last_watered': 'now'}
+        )
+        self.assertFalse(self.redis.exists(self.json_key))
+
+        # Request again, confirm response contains updated state
+        response = self.client.get('/get_overview_state')
+        self.assertEqual(
+            response.json()['plants'][str(self.plant.uuid)]['last_watered'],
+            'now'
+        )
+
+    def test_json_ignored_if_state_not_cached(self):
+        # Request overview state, then delete cached state with cache API
+        self.client.get('/get_overview_state')
+        cache.delete(f'overview_state_{self.user.pk}')
+
+        # Confirm cached JSON is not returned (may be outdated)
+        self.assertIsNone(self.storage.load_json(self.user.pk))
+
+    def test_outdated_json_not_cached(self):
+        # Simulate another worker updating state while JSON is serialized
+        build_overview_state(self.user)
+        def serialize():
+            self.storage.update_entry(
+                self.user.pk, 'plants', str(self.plant.uuid), {'last_watered': 'now'}
+            )
+            return b'{"outdated": true}'
+        self.assertEqual(
+            self.storage.cache_json(self.user.pk, serialize),
+            b'{"outdated": true}'
+        )
+
+        # Confirm outdated JSON was not cached
+        self.assertFalse(self.redis.exists(self.json_key))
+
+
+@override_settings(OVERVIEW_STATE_STORAGE='hash')
+class HashStorageCachedOverviewStateJsonTests(CachedOverviewStateJsonTests):
+    '''Runs all cached JSON tests with the hash storage layout.'''
+
+
+class OverviewStateBatchTests(TestCase):
+    '''Tests that confirm cached overview state updates made inside an
+    overview_state_batch block are written in a single transaction.
+    '''
+
+    def setUp(self):
+        # Set default content_type for post requests (avoid long lines)
+        self.client = JSONClient()
+
+        # Clear entire cache before each test
+        cache.clear()
+
+        self.user = get_default_user()
+        self.plants = [
+            Plant.objects.create(user=self.user, uuid=uuid4())
+            for _ in range(5)
+        ]
+        self.group = Group.objects.create(user=self.user, uuid=uuid4())
+        build_overview_state(self.user)
+        self.storage = get_overview_state_storage()
+
+    def count_transactions(self):
+        '''Returns context manager that patches run_transaction to count calls,
+        and the list that each call is appended to.
+        '''
+        original = state_cache.run_transaction
+        calls = []
+
+        def run_transaction(key, transaction):
+            calls.append(key)
+            return original(key, transaction)
+
+        return patch.object(state_cache, 'run_transaction', run_transaction), calls
+
+    def test_bulk_add_plant_events_single_transaction(self):
+        # Water all plants, count cached state transactions
+        patched, calls = self.count_transactions()
+        with patched:
+            response = self.client.post('/bulk_add_plant_events', {
+                'plants': [str(plant.uuid) for plant in self.plants],
+                'event_type': 'water',
+                'timestamp': '2024-02-06T03:06:26.000Z'
+            })
+        self.assertEqual(response.status_code, 200)
+
+        # Confirm all plants were updated in a single transaction
+        self.assertEqual(len(calls), 1)
+        state = self.storage.load(self.user.pk)
+        for plant in self.plants:
+            self.assertEqual(
+                state['plants'][str(plant.uuid)]['last_watered'],
+                '2024-02-06T03:06:26+00:00'
+            )
+
+    def test_bulk_add_plants_to_group_single_transaction(self):
+        # Add all plants to group, count cached state transactions
+        patched, calls = self.count_transactions()
+        with patched:
+            response = self.client.post('/bulk_add_plants_to_group', {
+                'group_id': str(self.group.uuid),
+                'plants': [str(plant.uuid) for plant in self.plants]
+            })
+        self.assertEqual(response.status_code, 200)
+
+        # Confirm all plants and group were updated in a single transaction
+        self.assertEqual(len(calls), 1)
+        state = self.storage.load(self.user.pk)
+        self.assertEqual(state['groups'][str(self.group.uuid)]['plants'], 5)
+        for plant in self.plants:
+            self.assertEqual(
+                state['plants'][str(plant.uuid)]['group']['uuid'],
+                str(self.group.uuid)
+            )
+
+    def test_bulk_archive_single_transaction(self):
+        # Archive all plants, count cached state transactions
+        patched, calls = self.count_transactions()
+        with patched:
+            response = self.client.post('/bulk_archive_plants_and_groups', {
+                'uuids': [str(plant.uuid) for plant in self.plants],
+                'archived': True
+            })
+        self.assertEqual(response.status_code, 200)
+
+        # Confirm all plants removed and show_archive set in single transaction
+        self.assertEqual(len(calls), 1)
+        state = self.storage.load(self.user.pk)
+        self.assertEqual(state['plants'], {})
+        self.assertTrue(state['show_archive'])
+
+    def test_batch_builds_state_if_not_cached(self):
+        # Delete cached state, update plant inside batch block
+        cache.delete(f'overview_state_{self.user.pk}')
+        with overview_state_batch():
+            update_cached_overview_details_keys(self.plants[0], {'last_watered': 'now'})
+            # Confirm nothing was written until block exits
+            self.assertIsNone(self.storage.load(self.user.pk))
+
+        # Confirm state was built and update was applied
+        state = self.storage.load(self.user.pk)
+        self.assertEqual(len(state['plants']), 5)
+        self.assertEqual(state['plants'][str(self.plants[0].uuid)]['last_watered'], 'now')
+
+    def test_batch_deletes_state_if_exception_raised(self):
+        # Update plant inside batch block, then raise exception
+        with self.assertRaises(ValueError):
+            with overview_state_batch():
+                update_cached_overview_details_keys(self.plants[0], {'last_watered': 'now'})
+                raise ValueError
+
+        # Confirm update was not applied and cached state was deleted
+        self.assertIsNone(self.storage.load(self.user.pk))
+
+    def test_apply_batch_operations_applied_in_order(self):
+        # Add new entry, update it, then delete an existing entry
+        new_uuid = str(uuid4())
+        self.storage.apply_batch(self.user.pk, [
+            ('set_entry', 'plants', new_uuid, {'uuid': new_uuid, 'created': 'now'}),
+            ('update_entry', 'plants', new_uuid, {'name': 'new'}),
+            ('delete_entry', 'plants', str(self.plants[0].uuid)),
+            ('set_value', 'title', 'new title')
+        ])
+
+        # Confirm all operations were applied
+        state = self.storage.load(self.user.pk)
+        self.assertEqual(state['plants'][new_uuid], {'uuid': new_uuid, 'created': 'now', 'name': 'new'})
+        self.assertNotIn(str(self.plants[0].uuid), state['plants'])
+        self.assertEqual(state['title'], 'new title')
+
+    def test_apply_batch_update_missing_entry(self):
+        # Cache overview state JSON, update entry that does not exist
+        self.client.get('/get_overview_state')
+        self.assertIsNotNone(self.storage.load_json(self.user.pk))
+        self.storage.apply_batch(self.user.pk, [
+            ('update_entry', 'plants', str(uuid4()), {'name': 'new'})
+        ])
+
+        # Confirm nothing was written (cached JSON was not deleted)
+        self.assertIsNotNone(self.storage.load_json(self.user.pk))
+        self.assertEqual(len(self.storage.load(self.user.pk)['plants']), 5)
+
+
+@override_settings(OVERVIEW_STATE_STORAGE='hash')
+class HashStorageOverviewStateBatchTests(OverviewStateBatchTests):
+    '''Runs all batch tests with the hash storage layout.'''
+
+
+class OverviewStateRebuildTests(TestCase):
+    '''Tests that confirm a missing overview state is only built by one worker
+    at a time (other workers serve stale copy, wait, or leave a placeholder).
+    '''
+
+    def setUp(self):
+        # Clear entire cache before each test
+        cache.clear()
+
+        self.user = get_default_user()
+        self.plant = Plant.objects.create(user=self.user, uuid=uuid4())
+        build_overview_state(self.user)
+        self.storage = get_overview_state_storage()
+
+    def simulate_other_worker_building(self):
+        '''Acquires rebuild lock (same as another worker building state).'''
+        token = self.storage.acquire_rebuild_lock(self.user.pk)
+        self.assertIsNotNone(token)
+        return token
+
+    def test_lock_released_after_build(self):
+        # Delete cached state, request it (rebuilds)
+        self.storage.delete(self.user.pk)
+        state = get_overview_state(self.user)
+        self.assertEqual(state, self.storage.load(self.user.pk))
+
+        # Confirm lock was released (can be acquired again)
+        self.assertIsNotNone(self.storage.acquire_rebuild_lock(self.user.pk))
+
+    def test_stale_state_served_while_other_worker_builds(self):
+        # Delete cached state (moved to stale key), simulate other worker
+        # building state
+        stale = self.storage.load(self.user.pk)
+        self.storage.delete(self.user.pk)
+        self.assertIsNone(self.storage.load(self.user.pk))
+        self.simulate_other_worker_building()
+
+        # Request state, confirm stale copy was returned without building
+        with patch('plant_tracker.get_state_views.build_overview_state') as mock_build:
+            self.assertEqual(get_overview_state(self.user), stale)
+        mock_build.assert_not_called()
+
+    def test_stale_state_response_has_no_current_etag(self):
+        self.client = JSONClient()
+
+        # Request state, save ETag
+        response = self.client.get('/get_overview_state')
+        etag = response.headers['ETag']
+
+        # Delete cached state (moved to stale key), simulate other worker
+        # building state, water plant (bumps overview version)
+        self.storage.delete(self.user.pk)
+        self.simulate_other_worker_building()
+        response = self.client.post('/add_plant_event', {
+            'plant_id': str(self.plant.uuid),
+            'event_type': 'water',
+            'timestamp': '2024-02-06T03:06:26.000Z'
+        })
+        self.assertEqual(response.status_code, 200)
+
+        # Request state with old ETag, confirm stale copy was returned without
+        # an ETag (client must not store pre-mutation state under new ETag)
+        response = self.client.get('/get_overview_state', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['plants'][str(self.plant.uuid)]['last_watered'])
+        self.assertNotIn('ETag', response.headers)
+        self.assertIn('no-store', response.headers['Cache-Control'])
+
+    def test_waits_for_other_worker_to_build(self):
+        # Delete state without stale copy, simulate other worker building
+        cache.delete(f'overview_state_{self.user.pk}')
+        token = self.simulate_other_worker_building()
+
+        # Simulate other worker finishing while this worker waits
+        def wait_for_rebuild(user_pk, timeout):
+            build_overview_state(self.user)
+            self.storage.release_rebuild_lock(user_pk, token)
+            return True
+
+        # Confirm returns state built by other worker (did not build again)
+        with patch.object(self.storage.__class__, 'wait_for_rebuild', side_effect=wait_for_rebuild), \
+             patch('plant_tracker.get_state_views.build_overview_state') as mock_build:
+            state = build_overview_state_once(self.user)
+        mock_build.assert_not_called()
+        self.assertEqual(state, self.storage.load(self.user.pk))
+
+    def test_builds_if_other_worker_takes_too_long(self):
+        # Delete state without stale copy, simulate other worker building
+        cache.delete(f'overview_state_{self.user.pk}')
+        self.simulate_other_worker_building()
+
+        # Confirm state is built after waiting (other worker never finished)
+        with patch.object(get_state_views, 'OVERVIEW_REBUILD_WAIT', 0.1):
+            state = build_overview_state_once(self.user)
+        self.assertEqual(list(state['plants']), [str(self.plant.uuid)])
+        self.assertEqual(state, self.storage.load(self.user.pk))
+
+    def test_update_leaves_placeholder_while_other_worker_builds(self):
+        # Delete state, simulate other worker building
+        cache.delete(f'overview_state_{self.user.pk}')
+        token = self.simulate_other_worker_building()
+
+        # Update plant, confirm state was not built (placeholder added instead)
+        with patch('plant_tracker.get_state_views.build_overview_state') as mock_build:
+            update_cached_overview_details_keys(self.plant, {'last_watered': 'now'})
+        mock_build.assert_not_called()
+        self.assertIsNone(self.storage.load(self.user.pk))
+
+        # Simulate other worker finishing build (queried database before
+        # update was written), confirm placeholder update was applied
+        get_state_views._build_overview_state_locked(self.user, token)
+        state = self.storage.load(self.user.pk)
+        self.assertEqual(state['plants'][str(self.plant.uuid)]['last_watered'], 'now')
+        self.assertEqual(self.storage.pop_pending(self.user.pk), [])
+
+    def test_release_lock_acquired_by_other_worker(self):
+        # Simulate lock expiring and being acquired by another worker
+        token = self.simulate_other_worker_building()
+        cache.delete(f'lock_overview_state_{self.user.pk}')
+        other_token = self.simulate_other_worker_building()
+
+        # Confirm releasing with old token does not release other worker's lock
+        self.storage.release_rebuild_lock(self.user.pk, token)
+        self.assertIsNone(self.storage.acquire_rebuild_lock(self.user.pk))
+        self.storage.release_rebuild_lock(self.user.pk, other_token)
+        self.assertIsNotNone(self.storage.acquire_rebuild_lock(self.user.pk))
+
+
+@override_settings(OVERVIEW_STATE_STORAGE='hash')
+class HashStorageOverviewStateRebuildTests(OverviewStateRebuildTests):
+    '''Runs all rebuild tests with the hash storage layout.'''
+
+
+class CachedManagePlantStateTests(TestCase):
+    '''Tests that confirm each endpoint that modifies event history, notes,
+    photos, or DetailsChangedEvents updates the cached manage_plant state so it
+    matches a state built from the database.
+    '''
+
+    def setUp(self):
+        # Set default content_type for post requests (avoid long lines)
+        self.client = JSONClient()
+
+        # Clear entire cache before each test
+        cache.clear()
+
+        self.user = get_default_user()
+        self.plant = Plant.objects.create(user=self.user, uuid=uuid4())
+        self.group = Group.objects.create(user=self.user, uuid=uuid4(), name='Group')
+        self.storage = ManagePlantStateStorage()
+
+        # Request manage_plant state (caches event history)
+        self.client.get_json(f'/get_manage_state/{self.plant.uuid}')
+        self.assertIsNotNone(self.storage.load(self.plant.pk))
+
+    def assertCachedStateMatchesDatabase(self):
+        state = build_manage_plant_state(
+            Plant.objects.get_with_manage_plant_annotation(self.plant.uuid)
+        )
+        self.assertEqual(
+            self.storage.load(self.plant.pk),
+            {key: state[key] for key in CACHED_MANAGE_PLANT_STATE_KEYS}
+        )
+
+    def test_cached_state_returned_by_endpoint(self):
+        # Add event to cached state, confirm returned by /get_manage_state
+        self.storage.apply_batch({self.plant.pk: [
+            ('add_event', 'water', '2024-02-06T03:06:26+00:00')
+        ]})
+        response = self.client.get_json(f'/get_manage_state/{self.plant.uuid}')
+        self.assertEqual(
+            response.json()['state']['events']['water'],
+            ['2024-02-06T03:06:26+00:00']
+        )
+
+    def test_add_and_delete_plant_events(self):
+        # Create 2 events out of order, confirm cached state matches database
+        for timestamp in ('2024-02-06T03:06:26.000Z', '2024-03-06T03:06:26.000Z'):
+            response = self.client.post('/add_plant_event', {
+                'plant_id': self.plant.uuid,
+                'event_type': 'water',
+                'timestamp': timestamp
+            })
+            self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+        # Delete first event, confirm cached state matches database
+        response = self.client.post('/delete_plant_events', {
+            'plant_id': self.plant.uuid,
+            'events': {'water': ['2024-02-06T03:06:26+00:00']}
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+    def test_bulk_add_plant_events(self):
+        response = self.client.post('/bulk_add_plant_events', {
+            'plants': [str(self.plant.uuid)],
+            'event_type': 'fertilize',
+            'timestamp': '2024-02-06T03:06:26.000Z'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+    def test_add_edit_and_delete_plant_notes(self):
+        # Timestamp is not UTC, cached key should match database (UTC)
+        response = self.client.post('/add_plant_note', {
+            'plant_id': str(self.plant.uuid),
+            'timestamp': '2024-02-06T03:06:26-08:00',
+            'note_text': 'Some leaves turning yellow'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+        response = self.client.post('/edit_plant_note', {
+            'plant_id': str(self.plant.uuid),
+            'timestamp': '2024-02-06T11:06:26+00:00',
+            'note_text': 'Leaves fell off'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+        response = self.client.post('/delete_plant_notes', {
+            'plant_id': str(self.plant.uuid),
+            'timestamps': ['2024-02-06T11:06:26+00:00']
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+    def test_repot_plant(self):
+        response = self.client.post('/repot_plant', {
+            'plant_id': str(self.plant.uuid),
+            'timestamp': '2024-02-06T03:06:26.000Z',
+            'new_pot_size': 6
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+    def test_edit_plant_details_and_group(self):
+        response = self.client.post('/edit_plant_details', {
+            'plant_id': str(self.plant.uuid),
+            'name': 'Edited',
+            'species': 'Fittonia',
+            'description': '',
+            'pot_size': 4
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+        response = self.client.post('/add_plant_to_group', {
+            'plant_id': str(self.plant.uuid),
+            'group_id': str(self.group.uuid)
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+        # Rename group, confirm cached state containing old name was deleted
+        response = self.client.post('/edit_group_details', {
+            'group_id': str(self.group.uuid),
+            'name': 'Renamed',
+            'location': '',
+            'description': ''
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(self.storage.load(self.plant.pk))
+
+    def test_add_and_delete_plant_photos(self):
+        response = self.client.post(
+            '/add_plant_photos',
+            data={
+                'plant_id': str(self.plant.uuid),
+                'photo_0': create_mock_photo('2024:03:22 10:52:03', 'new_photo.jpg')
+            },
+            content_type=MULTIPART_CONTENT
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertCachedStateMatchesDatabase()
+
+        response = self.client.post('/delete_plant_photos', {
+            'plant_id': str(self.plant.uuid),
+            'photos': [Photo.objects.first().pk]
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+    def test_bulk_delete_plants(self):
+        response = self.client.post('/bulk_delete_plants_and_groups', {
+            'uuids': [str(self.plant.uuid)]
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(self.storage.load(self.plant.pk))
+
+
+class CachedManageGroupStateTests(TestCase):
+    '''Tests that confirm endpoints that modify plant details or group
+    membership update the cached manage_group state so it matches a state built
+    from the database.
+    '''
+
+    def setUp(self):
+        # Set default content_type for post requests (avoid long lines)
+        self.client = JSONClient()
+
+        # Clear entire cache before each test
+        cache.clear()
+
+        self.user = get_default_user()
+        self.group = Group.objects.create(user=self.user, uuid=uuid4(), name='Group')
+        self.plant1 = Plant.objects.create(user=self.user, uuid=uuid4(), group=self.group)
+        self.plant2 = Plant.objects.create(user=self.user, uuid=uuid4(), name='Plant 2')
+        self.storage = ManageGroupStateStorage()
+
+        # Request manage_group state (caches plant details)
+        self.client.get_json(f'/get_manage_state/{self.group.uuid}')
+        self.assertIsNotNone(self.storage.load(self.group.pk))
+
+    def get_manage_group_state(self):
+        return self.client.get_json(f'/get_manage_state/{self.group.uuid}').json()['state']
+
+    def assertCachedStateMatchesDatabase(self):
+        self.assertIsNotNone(self.storage.load(self.group.pk))
+        self.assertEqual(
+            self.get_manage_group_state(),
+            build_manage_group_state(
+                Group.objects.get_with_manage_group_annotation(self.group.uuid)
+            )
+        )
+
+    def test_add_plant_event(self):
+        response = self.client.post('/add_plant_event', {
+            'plant_id': self.plant1.uuid,
+            'event_type': 'water',
+            'timestamp': '2024-02-06T03:06:26.000Z'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.storage.load(self.group.pk)['plants'][str(self.plant1.uuid)]['last_watered'],
+            '2024-02-06T03:06:26+00:00'
+        )
+        self.assertCachedStateMatchesDatabase()
+
+    def test_bulk_add_plant_events(self):
+        response = self.client.post('/bulk_add_plant_events', {
+            'plants': [str(self.plant1.uuid), str(self.plant2.uuid)],
+            'event_type': 'fertilize',
+            'timestamp': '2024-02-06T03:06:26.000Z'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+    def test_edit_plant_details(self):
+        response = self.client.post('/edit_plant_details', {
+            'plant_id': str(self.plant1.uuid),
+            'name': 'Edited',
+            'species': 'Fittonia',
+            'description': '',
+            'pot_size': 4
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+    def test_unnamed_plant_renumbered(self):
+        # Move plant2 before plant1, remove name (plant1 becomes unnamed plant 2)
+        Plant.objects.filter(pk=self.plant2.pk).update(
+            created=self.plant1.created - timedelta(days=1)
+        )
+        response = self.client.post('/edit_plant_details', {
+            'plant_id': str(self.plant2.uuid),
+            'name': '',
+            'species': '',
+            'description': '',
+            'pot_size': ''
+        })
+        self.assertEqual(response.status_code, 200)
+
+        # Confirm outdated cached state was not used
+        self.assertEqual(
+            self.get_manage_group_state()['plants'][str(self.plant1.uuid)]['display_name'],
+            'Unnamed plant 2'
+        )
+        self.assertCachedStateMatchesDatabase()
+
+    def test_edit_group_details(self):
+        response = self.client.post('/edit_group_details', {
+            'group_id': str(self.group.uuid),
+            'name': 'Renamed',
+            'location': '',
+            'description': ''
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+    def test_add_and_remove_plants(self):
+        response = self.client.post('/add_plant_to_group', {
+            'plant_id': str(self.plant2.uuid),
+            'group_id': str(self.group.uuid)
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+        response = self.client.post('/remove_plant_from_group', {
+            'plant_id': str(self.plant1.uuid)
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+        response = self.client.post('/bulk_add_plants_to_group', {
+            'group_id': str(self.group.uuid),
+            'plants': [str(self.plant1.uuid)]
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+        response = self.client.post('/bulk_remove_plants_from_group', {
+            'group_id': str(self.group.uuid),
+            'plants': [str(self.plant1.uuid), str(self.plant2.uuid)]
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+    def test_plant_moved_to_other_group(self):
+        other_group = Group.objects.create(user=self.user, uuid=uuid4(), name='Other')
+        response = self.client.post('/bulk_add_plants_to_group', {
+            'group_id': str(other_group.uuid),
+            'plants': [str(self.plant1.uuid)]
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.storage.load(self.group.pk)['plants'], {})
+        self.assertCachedStateMatchesDatabase()
+
+    def test_plant_uuid_changed(self):
+        response = self.client.post('/change_uuid', {
+            'uuid': str(self.plant1.uuid),
+            'new_id': str(uuid4())
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+    def test_bulk_archive_and_delete_plants(self):
+        response = self.client.post('/bulk_archive_plants_and_groups', {
+            'uuids': [str(self.plant1.uuid)],
+            'archived': True
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+        response = self.client.post('/bulk_delete_plants_and_groups', {
+            'uuids': [str(self.plant1.uuid)]
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+    def test_bulk_delete_group(self):
+        response = self.client.post('/bulk_delete_plants_and_groups', {
+            'uuids': [str(self.group.uuid)]
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(self.storage.load(self.group.pk))
+
+
+class CachedArchivedOverviewStateTests(TestCase):
+    '''Tests that confirm endpoints update the cached archived overview state
+    so it matches a state built from the database.
+    '''
+
+    def setUp(self):
+        # Set default content_type for post requests (avoid long lines)
+        self.client = JSONClient()
+
+        # Clear entire cache before each test
+        cache.clear()
+
+        self.user = get_default_user()
+        self.plant1 = Plant.objects.create(user=self.user, uuid=uuid4(), name='Plant 1', archived=True)
+        self.plant2 = Plant.objects.create(user=self.user, uuid=uuid4(), name='Plant 2')
+        self.group = Group.objects.create(user=self.user, uuid=uuid4(), name='Group', archived=True)
+        self.storage = get_overview_state_storage(archived=True)
+
+        # Request archived overview state (caches state)
+        response = self.client.get('/get_archived_overview_state')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(self.storage.load(self.user.pk))
+
+    def assertCachedStateMatchesDatabase(self):
+        cached_state = self.storage.load(self.user.pk)
+        self.storage.delete(self.user.pk)
+        self.assertEqual(cached_state, build_overview_state(self.user, archived=True))
+
+    def test_cached_state_returned_by_endpoint(self):
+        self.storage.set_value(self.user.pk, 'title', 'cached')
+        response = self.client.get('/get_archived_overview_state')
+        self.assertEqual(response.json()['title'], 'cached')
+
+    def test_archive_and_unarchive_plants(self):
+        response = self.client.post('/bulk_archive_plants_and_groups', {
+            'uuids': [str(self.plant2.uuid)],
+            'archived': True
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(str(self.plant2.uuid), self.storage.load(self.user.pk)['plants'])
+        self.assertCachedStateMatchesDatabase()
+
+        # Rebuild, un-archive plant, confirm removed from cached state
+        self.client.get('/get_archived_overview_state')
+        response = self.client.post('/bulk_archive_plants_and_groups', {
+            'uuids': [str(self.plant1.uuid), str(self.plant2.uuid)],
+            'archived': False
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.storage.load(self.user.pk)['plants'], {})
+        self.assertCachedStateMatchesDatabase()
+
+    def test_archived_plant_details_updated(self):
+        response = self.client.post('/add_plant_event', {
+            'plant_id': self.plant1.uuid,
+            'event_type': 'water',
+            'timestamp': '2024-02-06T03:06:26.000Z'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.storage.load(self.user.pk)['plants'][str(self.plant1.uuid)]['last_watered'],
+            '2024-02-06T03:06:26+00:00'
+        )
+        self.assertCachedStateMatchesDatabase()
+
+    def test_archived_plant_added_to_archived_group(self):
+        response = self.client.post('/add_plant_to_group', {
+            'plant_id': str(self.plant1.uuid),
+            'group_id': str(self.group.uuid)
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertCachedStateMatchesDatabase()
+
+    def test_delete_archived_entries(self):
+        response = self.client.post('/bulk_delete_plants_and_groups', {
+            'uuids': [str(self.plant1.uuid)]
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(str(self.plant1.uuid), self.storage.load(self.user.pk)['plants'])
+        self.assertCachedStateMatchesDatabase()
+
+        # Delete last archived entry, confirm cached state was deleted
+        self.client.get('/get_archived_overview_state')
+        response = self.client.post('/bulk_delete_plants_and_groups', {
+            'uuids': [str(self.group.uuid)]
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(self.storage.load(self.user.pk))
+        response = self.client.get('/get_archived_overview_state')
+        self.assertEqual(response.status_code, 302)
+
+    def test_main_overview_state_not_affected(self):
+        # Confirm archived state does not replace main overview state
+        self.assertIsNone(get_overview_state_storage().load(self.user.pk))
+        response = self.client.get('/get_overview_state')
+        self.assertEqual(
+            list(response.json()['plants'].keys()),
+            [str(self.plant2.uuid)]
+        )
+
+
+class OverviewStateChangesTests(TestCase):
+    '''Tests for the overview change log and get_overview_state_changes endpoint.'''
+
+    def setUp(self):
+        # Set default content_type for post requests (avoid long lines)
+        self.client = JSONClient()
+
+        # Clear entire cache before each test
+        cache.clear()
+
+        self.user = get_default_user()
+        self.plant1 = Plant.objects.create(user=self.user, uuid=uuid4(), name='Plant 1')
+        self.plant2 = Plant.objects.create(user=self.user, uuid=uuid4(), name='Plant 2')
+        self.group = Group.objects.create(user=self.user, uuid=uuid4(), name='Group')
+        self.storage = get_overview_state_storage()
+
+    def get_changes(self, since=None):
+        if since is None:
+            response = self.client.get('/get_overview_state_changes')
+        else:
+            response = self.client.get(f'/get_overview_state_changes?since={since}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_full_state_returned_if_no_version(self):
+        # Request without since param, confirm full state is returned (built
+        # and cached since not cached yet)
+        response = self.get_changes()
+        self.assertTrue(response['full'])
+        self.assertEqual(response['state'], self.storage.load(self.user.pk))
+        self.assertEqual(
+            list(response['state']['plants']),
+            [str(self.plant1.uuid), str(self.plant2.uuid)]
+        )
+
+        # Request again with returned version, confirm no changes
+        changes = self.get_changes(response['version'])
+        self.assertEqual(changes, {
+            'version': response['version'],
+            'full': False,
+            'plants': {},
+            'groups': {},
+            'removed': {'plants': [], 'groups': []},
+            'show_archive': False,
+            'title': 'Plant Overview'
+        })
+
+    def test_changed_added_and_removed_entries(self):
+        version = self.get_changes()['version']
+
+        # Edit plant1, delete plant2, register new group
+        response = self.client.post('/edit_plant_details', {
+            'plant_id': self.plant1.uuid,
+            'name': 'new name',
+            'species': None,
+            'description': None,
+            'pot_size': None
+        })
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/bulk_delete_plants_and_groups', {
+            'uuids': [str(self.plant2.uuid)]
+        })
+        self.assertEqual(response.status_code, 200)
+        new_uuid = uuid4()
+        response = self.client.post('/register_group', {
+            'uuid': str(new_uuid),
+            'name': 'New group',
+            'location': '',
+            'description': ''
+        })
+        self.assertEqual(response.status_code, 200)
+
+        # Confirm only changed entries returned, deleted plant in removed
+        changes = self.get_changes(version)
+        self.assertFalse(changes['full'])
+        self.assertGreater(changes['version'], version)
+        state = self.storage.load(self.user.pk)
+        self.assertEqual(changes['plants'], {
+            str(self.plant1.uuid): state['plants'][str(self.plant1.uuid)]
+        })
+        self.assertEqual(changes['plants'][str(self.plant1.uuid)]['name'], 'new name')
+        self.assertEqual(changes['groups'], {
+            str(new_uuid): state['groups'][str(new_uuid)]
+        })
+        self.assertEqual(changes['removed'], {
+            'plants': [str(self.plant2.uuid)],
+            'groups': []
+        })
+
+        # Request with new version, confirm no changes
+        later = self.get_changes(changes['version'])
+        self.assertEqual(later['version'], changes['version'])
+        self.assertEqual(later['plants'], {})
+        self.assertEqual(later['removed'], {'plants': [], 'groups': []})
+
+    def test_full_state_returned_if_log_truncated(self):
+        version = self.get_changes()['version']
+
+        # Make more changes than the log holds
+        with patch.object(state_cache, 'OVERVIEW_CHANGE_LOG_LENGTH', 2):
+            for plant in (self.plant1, self.plant2, self.plant1):
+                update_cached_overview_details_keys(plant, {'description': 'new'})
+
+            # Confirm full state returned for original version, changes
+            # returned for version after first change (still in log)
+            response = self.get_changes(version)
+            self.assertTrue(response['full'])
+            self.assertEqual(response['version'], version + 3)
+            response = self.get_changes(version + 1)
+            self.assertFalse(response['full'])
+            self.assertEqual(
+                set(response['plants']),
+                {str(self.plant1.uuid), str(self.plant2.uuid)}
+            )
+
+    def test_full_state_returned_if_state_rebuilt(self):
+        version = self.get_changes()['version']
+
+        # Delete cached state, confirm full state returned with newer version
+        self.storage.delete(self.user.pk)
+        response = self.get_changes(version)
+        self.assertTrue(response['full'])
+        self.assertGreater(response['version'], version)
+        self.assertEqual(response['state'], self.storage.load(self.user.pk))
+
+        # Confirm version from another log is not accepted
+        response = self.get_changes(response['version'] + 10)
+        self.assertTrue(response['full'])
+
+    def test_archived_changes_not_logged(self):
+        version = self.get_changes()['version']
+
+        # Archive plant, confirm removed from overview
+        response = self.client.post('/bulk_archive_plants_and_groups', {
+            'uuids': [str(self.plant1.uuid)],
+            'archived': True
+        })
+        self.assertEqual(response.status_code, 200)
+        changes = self.get_changes(version)
+        self.assertEqual(changes['removed']['plants'], [str(self.plant1.uuid)])
+        self.assertTrue(changes['show_archive'])
+
+        # Update archived plant, confirm not returned as overview change
+        self.client.get('/get_archived_overview_state')
+        update_cached_overview_details_keys(
+            Plant.objects.get(pk=self.plant1.pk),
+            {'description': 'new'}
+        )
+        self.assertEqual(self.get_changes(changes['version'])['version'], changes['version'])
+
+    def test_invalid_version(self):
+        response = self.client.get('/get_overview_state_changes?since=abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'since must be an integer'})
+
+
+@override_settings(OVERVIEW_STATE_STORAGE='hash')
+class HashStorageOverviewStateChangesTests(OverviewStateChangesTests):
+    '''Runs all overview change log tests with the hash storage layout.'''
@@ -0,0 +1,151 @@
+# pylint: disable=missing-docstring,line-too-long,R0801
+
+import pickle
+from uuid import uuid4
+
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+from .models import Plant, Group, Photo
+from .view_decorators import get_default_user
+from .get_state_views import build_overview_state
+from .state_cache import get_overview_state_storage, CompactStateStorage
+from .compact_state import encode_state, decode_state, RAW_HEADER, COMPRESSED_HEADER
+from .unit_test_helpers import (
+    create_mock_photo,
+    enable_isolated_media_root,
+    cleanup_isolated_media_root,
+)
+from .management.commands.benchmark_overview_state_storage import build_fake_overview_state
+
+OVERRIDE = None
+MODULE_MEDIA_ROOT = None
+
+
+def setUpModule():
+    global OVERRIDE, MODULE_MEDIA_ROOT  # pylint: disable=global-statement
+    OVERRIDE, MODULE_MEDIA_ROOT = enable_isolated_media_root()
+
+
+def tearDownModule():
+    # Delete mock photo directory after tests
+    cleanup_isolated_media_root(OVERRIDE, MODULE_MEDIA_ROOT)
+
+
+class CompactStateEncodingTests(TestCase):
+    '''Tests that confirm compact encoding restores the exact same state.'''
+
+    def assertRoundTrip(self, state, compress=False):
+        decoded = decode_state(encode_state(state, compress=compress))
+        self.assertEqual(decoded, state)
+        # Confirm entry and key order is also preserved
+        for key in ('plants', 'groups'):
+            self.assertEqual(list(decoded[key]), list(state[key]))
+            for uuid, details in state[key].items():
+                self.assertEqual(list(decoded[key][uuid]), list(details))
+
+    def test_round_trip(self):
+        state = build_fake_overview_state(100, 10)
+        self.assertRoundTrip(state)
+        self.assertRoundTrip(state, compress=True)
+
+    def test_round_trip_empty_state(self):
+        self.assertRoundTrip({
+            'plants': {},
+            'groups': {},
+            'show_archive': False,
+            'title': 'Plant Overview'
+        })
+
+    def test_values_that_cannot_be_shrunk_are_unchanged(self):
+        state = build_fake_overview_state(3, 0)
+        plants = list(state['plants'].values())
+        # Timestamps with non-UTC offset, 'Z' suffix, and invalid string
+        plants[0]['created'] = '2024-02-06T03:06:26-08:00'
+        plants[1]['created'] = '2024-02-06T03:06:26Z'
+        plants[2]['last_watered'] = 'now'
+        # Thumbnail URL that is not relative to media URL
+        plants[0]['thumbnail'] = 'https://example.com/photo.webp'
+        self.assertRoundTrip(state)
+
+    def test_entries_with_different_keys(self):
+        # Add entry that does not have get_details keys
+        state = build_fake_overview_state(3, 1)
+        uuid = str(uuid4())
+        state['plants'][uuid] = {'uuid': uuid, 'created': 'now'}
+        self.assertRoundTrip(state)
+
+    def test_smaller_than_pickle(self):
+        state = build_fake_overview_state(100, 10)
+        compact = encode_state(state, compress=False)
+        compressed = encode_state(state, compress=True)
+        self.assertTrue(compact.startswith(RAW_HEADER))
+        self.assertTrue(compressed.startswith(COMPRESSED_HEADER))
+        self.assertLess(len(compact), len(pickle.dumps(state)))
+        self.assertLess(len(compressed), len(compact))
+
+    def test_decode_value_with_unknown_format(self):
+        # Confirm state pickled by pickle layout is treated as not cached
+        self.assertIsNone(decode_state(cache.client.encode({'plants': {}})))
+
+
+@override_settings(OVERVIEW_STATE_STORAGE='compact')
+class CompactStateStorageTests(TestCase):
+    '''Tests for the compact overview state storage layout.'''
+
+    def setUp(self):
+        # Clear entire cache before each test
+        cache.clear()
+
+        self.user = get_default_user()
+        self.group = Group.objects.create(user=self.user, uuid=uuid4(), name='group')
+        self.plant1 = Plant.objects.create(user=self.user, uuid=uuid4(), group=self.group)
+        self.plant2 = Plant.objects.create(user=self.user, uuid=uuid4())
+        photo = Photo.objects.create(
+            photo=create_mock_photo('2024:02:21 10:52:03'),
+            plant=self.plant2
+        )
+        photo.finalize_upload()
+        self.plant2.default_photo = photo
+        self.plant2.save()
+        self.storage = get_overview_state_storage()
+        self.key = cache.make_key(f'overview_state_{self.user.pk}')
+
+    def test_build_overview_state(self):
+        # Build state, confirm stored with compact encoding
+        state = build_overview_state(self.user)
+        self.assertIsInstance(self.storage, CompactStateStorage)
+        value = get_redis_connection("default").get(self.key)
+        self.assertTrue(value.startswith(RAW_HEADER))
+
+        # Confirm loaded state is identical to built state
+        self.assertEqual(self.storage.load(self.user.pk), state)
+        self.assertIsNotNone(state['plants'][str(self.plant2.uuid)]['thumbnail'])
+
+    @override_settings(OVERVIEW_STATE_COMPRESSION=True)
+    def test_build_overview_state_compressed(self):
+        state = build_overview_state(self.user)
+        value = get_redis_connection("default").get(self.key)
+        self.assertTrue(value.startswith(COMPRESSED_HEADER))
+        self.assertEqual(self.storage.load(self.user.pk), state)
+
+    def test_update_entry(self):
+        build_overview_state(self.user)
+        self.assertTrue(self.storage.update_entry(
+            self.user.pk,
+            'plants',
+            str(self.plant1.uuid),
+            {'last_watered': '2024-02-06T03:06:26+00:00'}
+        ))
+        state = self.storage.load(self.user.pk)
+        self.assertEqual(
+            state['plants'][str(self.plant1.uuid)]['last_watered'],
+            '2024-02-06T03:06:26+00:00'
+        )
+
+    def test_value_written_by_other_layout_treated_as_not_cached(self):
+        # Simulate state cached by pickle layout before setting changed
+        cache.set(f'overview_state_{self.user.pk}', {'plants': {}, 'groups': {}}, None)
+        self.assertIsNone(self.storage.load(self.user.pk))
+        self.assertFalse(self.storage.set_value(self.user.pk, 'title', 'Plants'))
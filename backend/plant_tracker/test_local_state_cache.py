@@ -0,0 +1,179 @@
+# pylint: disable=missing-docstring,line-too-long,R0801,protected-access
+
+import time
+from uuid import uuid4
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+from .models import Plant
+from .view_decorators import get_default_user
+from .state_cache import get_overview_state_storage
+from .state_versions import bump_state_versions
+from .local_state_cache import (
+    LocalStateCache,
+    get_local_state_cache,
+    get_invalidation_channel
+)
+
+
+class LocalStateCacheTests(TestCase):
+    '''Test LocalStateCache LRU, TTL, and invalidation behavior.'''
+
+    def setUp(self):
+        self.local_cache = LocalStateCache(max_size=2, ttl=60)
+        # Don't start listener thread, simulate subscribe confirmation message
+        self.local_cache._listener = True
+        self.local_cache.handle_message({'type': 'subscribe', 'data': 1})
+
+    def test_least_recently_used_evicted(self):
+        # Fill cache, read first entry (most recently used)
+        self.local_cache.set(1, b'one', self.local_cache.epoch)
+        self.local_cache.set(2, b'two', self.local_cache.epoch)
+        self.assertEqual(self.local_cache.get(1), b'one')
+
+        # Add third entry, confirm second entry was evicted
+        self.local_cache.set(3, b'three', self.local_cache.epoch)
+        self.assertEqual(self.local_cache.get(1), b'one')
+        self.assertIsNone(self.local_cache.get(2))
+        self.assertEqual(self.local_cache.get(3), b'three')
+
+    def test_expired_entries_not_returned(self):
+        self.local_cache.set(1, b'one', self.local_cache.epoch)
+        with patch('plant_tracker.local_state_cache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(self.local_cache.get(1))
+
+    def test_invalidation_message(self):
+        # Cache entry, simulate invalidation message, confirm removed
+        self.local_cache.set(1, b'one', self.local_cache.epoch)
+        self.local_cache.handle_message({'type': 'message', 'data': b'1'})
+        self.assertIsNone(self.local_cache.get(1))
+
+    def test_value_not_stored_if_invalidated_while_loading(self):
+        # Read epoch, simulate invalidation before loaded value is stored
+        epoch = self.local_cache.epoch
+        self.local_cache.invalidate(1)
+        self.local_cache.set(1, b'outdated', epoch)
+        self.assertIsNone(self.local_cache.get(1))
+
+    def test_not_used_until_subscribed(self):
+        local_cache = LocalStateCache(max_size=2, ttl=60)
+        local_cache._listener = True
+        local_cache.set(1, b'one', local_cache.epoch)
+        self.assertIsNone(local_cache.get(1))
+
+
+@override_settings(OVERVIEW_STATE_LOCAL_CACHE_SIZE=10)
+class LocalStateCacheEndpointTests(TestCase):
+    '''Test overview state endpoint with local cache enabled.'''
+
+    def setUp(self):
+        # Clear entire cache before each test
+        cache.clear()
+
+        self.user = get_default_user()
+        self.plant = Plant.objects.create(user=self.user, uuid=uuid4())
+        self.local_cache = get_local_state_cache()
+        self.local_cache.clear()
+
+        # Wait for listener thread to subscribe to invalidation channel
+        self.local_cache.get(self.user.pk)
+        self.wait_for(lambda: self.local_cache.subscribed)
+
+        # Wait for invalidations published by previous tests to be processed
+        self.wait_for_invalidations()
+        self.local_cache.clear()
+
+    def wait_for(self, condition):
+        '''Waits up to 1 second for condition function to return True.'''
+        for _ in range(100):
+            if condition():
+                return
+            time.sleep(0.01)
+        self.fail('condition not met')
+
+    def wait_for_invalidations(self):
+        '''Waits for listener thread to process all published invalidations
+        (messages are processed in order, so waits for a sentinel message).
+        '''
+        invalidated = []
+        with patch.object(self.local_cache, 'invalidate', side_effect=invalidated.append):
+            get_redis_connection("default").publish(get_invalidation_channel(), -1)
+            self.wait_for(lambda: -1 in invalidated)
+
+    def test_repeat_requests_served_from_memory(self):
+        # Request state twice (first caches JSON in redis, second in memory)
+        self.client.get('/get_overview_state')
+        self.wait_for_invalidations()
+        self.client.get('/get_overview_state')
+        self.assertIsNotNone(self.local_cache.get(self.user.pk))
+
+        # Confirm next request does not query redis (state or ETag version)
+        etag = self.local_cache.get(self.user.pk)[0]
+        with patch('plant_tracker.state_cache.get_redis_connection') as mock_redis, \
+             patch('plant_tracker.state_versions.get_redis_connection') as mock_versions:
+            response = self.client.get('/get_overview_state')
+            mock_redis.assert_not_called()
+            mock_versions.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(str(self.plant.uuid), response.json()['plants'])
+        self.assertEqual(response.headers['ETag'], f'"{etag}"')
+
+        # Confirm conditional request is also served from memory
+        with patch('plant_tracker.state_versions.get_redis_connection') as mock_versions:
+            response = self.client.get(
+                '/get_overview_state',
+                HTTP_IF_NONE_MATCH=response.headers['ETag']
+            )
+            mock_versions.assert_not_called()
+        self.assertEqual(response.status_code, 304)
+
+    def test_cached_state_update_invalidates_memory(self):
+        # Request state twice (first caches JSON in redis, second in memory)
+        self.client.get('/get_overview_state')
+        self.wait_for_invalidations()
+        self.client.get('/get_overview_state')
+        self.assertIsNotNone(self.local_cache.get(self.user.pk))
+
+        # Update cached state, confirm removed from memory
+        get_overview_state_storage().update_entry(
+            self.user.pk, 'plants', str(self.plant.uuid), {'last_watered': 'now'}
+        )
+        self.wait_for(lambda: self.local_cache.get(self.user.pk) is None)
+
+        # Confirm next request returns updated state
+        response = self.client.get('/get_overview_state')
+        self.assertEqual(response.json()['plants'][str(self.plant.uuid)]['last_watered'], 'now')
+
+    def test_version_bump_invalidates_memory(self):
+        # Request state twice (first caches JSON in redis, second in memory)
+        self.client.get('/get_overview_state')
+        self.wait_for_invalidations()
+        etag = self.client.get('/get_overview_state').headers['ETag']
+        self.assertIsNotNone(self.local_cache.get(self.user.pk))
+
+        # Bump overview version, confirm removed from memory
+        bump_state_versions(self.user.pk)
+        self.wait_for(lambda: self.local_cache.get(self.user.pk) is None)
+
+        # Confirm next request returns new ETag
+        response = self.client.get('/get_overview_state', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_writer_with_local_cache_disabled_invalidates_memory(self):
+        # Request state twice (first caches JSON in redis, second in memory)
+        self.client.get('/get_overview_state')
+        self.wait_for_invalidations()
+        self.client.get('/get_overview_state')
+        self.assertIsNotNone(self.local_cache.get(self.user.pk))
+
+        # Update cached state with local cache disabled (simulate worker with
+        # different settings), confirm still removed from memory
+        with override_settings(OVERVIEW_STATE_LOCAL_CACHE_SIZE=0):
+            get_overview_state_storage().update_entry(
+                self.user.pk, 'plants', str(self.plant.uuid), {'last_watered': 'now'}
+            )
+        self.wait_for(lambda: self.local_cache.get(self.user.pk) is None)
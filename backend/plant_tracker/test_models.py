@@ -1,6 +1,8 @@
 # pylint: disable=missing-docstring,line-too-long,global-statement
 
 import os
+import time
+import threading
 from uuid import uuid4
 from concurrent.futures import ThreadPoolExecutor, wait
 
@@ -9,6 +11,7 @@ from django.utils import timezone
 from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from django.test import TestCase, TransactionTestCase
+from django.db.models import Q
 from django.db import transaction, connection, IntegrityError
 
 from .view_decorators import get_default_user
@@ -20,6 +23,7 @@ from .models import (
     FertilizeEvent,
     PruneEvent,
     RepotEvent,
+    PlantEvent,
     Photo,
     NoteEvent
 )
@@ -281,6 +285,421 @@ class PlantModelTests(TestCase):
         self.assertFalse(os.path.exists(photo2_path))
 
 
+class PlantTriggerFieldTests(TestCase):
+    '''Tests that confirm postgres triggers keep the denormalized Plant
+    last_watered_timestamp, last_fertilized_timestamp, and last_photo columns
+    up to date however events and photos are written.
+    '''
+
+    def setUp(self):
+        self.plant = Plant.objects.create(uuid=uuid4(), user=get_default_user())
+        self.timestamp = timezone.now()
+
+    def assertLastWatered(self, timestamp):
+        self.plant.refresh_from_db()
+        self.assertEqual(self.plant.last_watered_timestamp, timestamp)
+
+    def test_last_watered_timestamp(self):
+        # Confirm None when no events exist
+        self.assertLastWatered(None)
+
+        # Create event, confirm column updated
+        newest = WaterEvent.objects.create(plant=self.plant, timestamp=self.timestamp)
+        self.assertLastWatered(self.timestamp)
+
+        # Bulk create older events, confirm column did not change
+        WaterEvent.objects.bulk_create([
+            WaterEvent(plant=self.plant, timestamp=self.timestamp - timezone.timedelta(days=days))
+            for days in (1, 2)
+        ])
+        self.assertLastWatered(self.timestamp)
+
+        # Move newest event to older timestamp, confirm column updated
+        newest.timestamp = self.timestamp - timezone.timedelta(days=3)
+        newest.save()
+        self.assertLastWatered(self.timestamp - timezone.timedelta(days=1))
+
+        # Delete newest remaining event with queryset, confirm column updated
+        WaterEvent.objects.filter(timestamp=self.timestamp - timezone.timedelta(days=1)).delete()
+        self.assertLastWatered(self.timestamp - timezone.timedelta(days=2))
+
+        # Delete all events, confirm column reset to None
+        WaterEvent.objects.all().delete()
+        self.assertLastWatered(None)
+
+    def test_last_fertilized_timestamp(self):
+        # Create events, confirm column contains most-recent timestamp
+        FertilizeEvent.objects.create(plant=self.plant, timestamp=self.timestamp)
+        FertilizeEvent.objects.create(plant=self.plant, timestamp=self.timestamp - timezone.timedelta(days=1))
+        WaterEvent.objects.create(plant=self.plant, timestamp=self.timestamp + timezone.timedelta(days=1))
+        self.plant.refresh_from_db()
+        self.assertEqual(self.plant.last_fertilized_timestamp, self.timestamp)
+
+        # Delete newest event, confirm column updated
+        FertilizeEvent.objects.get(timestamp=self.timestamp).delete()
+        self.plant.refresh_from_db()
+        self.assertEqual(self.plant.last_fertilized_timestamp, self.timestamp - timezone.timedelta(days=1))
+
+    def test_last_photo(self):
+        # Create 2 photos (older photo created second)
+        photo1 = Photo.objects.create(
+            photo=create_mock_photo('2024:03:22 10:52:03', 'IMG1.jpg'),
+            plant=self.plant
+        )
+        photo2 = Photo.objects.create(
+            photo=create_mock_photo('2024:02:21 10:52:03', 'IMG2.jpg'),
+            plant=self.plant
+        )
+
+        # Confirm last_photo is most-recent photo (not most recently created)
+        self.plant.refresh_from_db()
+        self.assertEqual(self.plant.last_photo, photo1)
+
+        # Delete most-recent photo, confirm last_photo updated
+        photo1.delete()
+        self.plant.refresh_from_db()
+        self.assertEqual(self.plant.last_photo, photo2)
+
+        # Delete remaining photo, confirm last_photo reset to None
+        photo2.delete()
+        self.plant.refresh_from_db()
+        self.assertIsNone(self.plant.last_photo)
+
+    def test_save_does_not_overwrite_trigger_fields(self):
+        # Load plant, create event and photo after it was loaded
+        plant = Plant.objects.get(pk=self.plant.pk)
+        WaterEvent.objects.create(plant=self.plant, timestamp=self.timestamp)
+        photo = Photo.objects.create(photo=create_mock_photo(), plant=self.plant)
+
+        # Save outdated instance, confirm trigger fields were not overwritten
+        plant.name = 'new name'
+        plant.save()
+        self.plant.refresh_from_db()
+        self.assertEqual(self.plant.name, 'new name')
+        self.assertEqual(self.plant.last_watered_timestamp, self.timestamp)
+        self.assertEqual(self.plant.last_photo, photo)
+
+    def test_overview_annotation_reads_trigger_fields(self):
+        # Create events and photo
+        WaterEvent.objects.create(plant=self.plant, timestamp=self.timestamp)
+        FertilizeEvent.objects.create(plant=self.plant, timestamp=self.timestamp)
+        photo = Photo.objects.create(photo=create_mock_photo(), plant=self.plant)
+        photo.finalize_upload()
+
+        # Confirm annotated details match details queried without annotations
+        annotated = Plant.objects.with_overview_annotation().get(pk=self.plant.pk)
+        self.assertEqual(annotated.get_details(), self.plant.get_details())
+        self.assertEqual(annotated.get_details()['thumbnail'], photo.thumbnail.url)
+
+        # Confirm manage_plant annotation returns same default photo details
+        annotated = Plant.objects.with_manage_plant_details_annotation().get(pk=self.plant.pk)
+        self.assertEqual(
+            annotated.get_default_photo_details()['key'],
+            self.plant.get_default_photo_details()['key']
+        )
+
+
+class UnnamedPositionTriggerTests(TestCase):
+    '''Tests that confirm postgres triggers keep the Plant and Group
+    unnamed_position columns equal to the sequential index of each unnamed
+    entry (used by unnamed_index annotation).
+    '''
+
+    def setUp(self):
+        self.user = get_default_user()
+
+    def assertPositions(self, model, expected):
+        '''Takes model and list of (instance, position) tuples, confirms each
+        instance has expected unnamed_position and unnamed_index annotation.
+        '''
+        for instance, position in expected:
+            instance.refresh_from_db()
+            self.assertEqual(instance.unnamed_position, position)
+            annotated = model.objects.with_unnamed_index_annotation().get(pk=instance.pk)
+            self.assertEqual(annotated.unnamed_index, position)
+
+    def test_plant_unnamed_position(self):
+        # Create 3 unnamed plants and 1 named plant, confirm sequential positions
+        plants = [Plant.objects.create(uuid=uuid4(), user=self.user) for _ in range(3)]
+        named = Plant.objects.create(uuid=uuid4(), user=self.user, name='plant')
+        self.assertPositions(Plant, [(plants[0], 1), (plants[1], 2), (plants[2], 3), (named, None)])
+
+        # Add species to first plant, confirm others renumbered
+        plants[0].species = 'Calathea'
+        plants[0].save()
+        self.assertPositions(Plant, [(plants[0], None), (plants[1], 1), (plants[2], 2)])
+
+        # Remove name from named plant, confirm it gets next position
+        named.name = None
+        named.save()
+        self.assertPositions(Plant, [(plants[1], 1), (plants[2], 2), (named, 3)])
+
+        # Delete middle plant, confirm later plants renumbered
+        plants[1].delete()
+        self.assertPositions(Plant, [(plants[2], 1), (named, 2)])
+
+        # Bulk create unnamed plants, confirm numbered after existing plants
+        created = Plant.objects.bulk_create([
+            Plant(uuid=uuid4(), user=self.user) for _ in range(2)
+        ])
+        self.assertPositions(Plant, [(plants[2], 1), (named, 2), (created[0], 3), (created[1], 4)])
+
+        # Confirm plants owned by other user have separate sequence
+        other_user = get_user_model().objects.create_user(username='other', password='12345')
+        other = Plant.objects.create(uuid=uuid4(), user=other_user)
+        self.assertPositions(Plant, [(other, 1), (created[1], 4)])
+
+    def test_group_unnamed_position(self):
+        # Create 3 unnamed groups, confirm sequential positions
+        groups = [Group.objects.create(uuid=uuid4(), user=self.user) for _ in range(3)]
+        self.assertPositions(Group, [(groups[0], 1), (groups[1], 2), (groups[2], 3)])
+
+        # Add location to first group, confirm others renumbered
+        groups[0].location = 'Middle shelf'
+        groups[0].save()
+        self.assertPositions(Group, [(groups[0], None), (groups[1], 1), (groups[2], 2)])
+
+        # Delete groups with queryset, confirm remaining group renumbered
+        Group.objects.filter(pk=groups[1].pk).delete()
+        self.assertPositions(Group, [(groups[2], 1)])
+
+    def test_multi_row_statements(self):
+        # Create 3 unnamed plants for default user and 2 for other user
+        other_user = get_user_model().objects.create_user(username='other', password='12345')
+        plants = [Plant.objects.create(uuid=uuid4(), user=self.user) for _ in range(3)]
+        others = [Plant.objects.create(uuid=uuid4(), user=other_user) for _ in range(2)]
+
+        # Name first plant of each user in 1 statement, confirm both renumbered
+        Plant.objects.filter(pk__in=[plants[0].pk, others[0].pk]).update(name='plant')
+        self.assertPositions(Plant, [
+            (plants[0], None), (plants[1], 1), (plants[2], 2),
+            (others[0], None), (others[1], 1)
+        ])
+
+        # Move last plant to other user, confirm numbered after other user's plant
+        Plant.objects.filter(pk=plants[2].pk).update(user=other_user)
+        self.assertPositions(Plant, [(plants[1], 1), (others[1], 1), (plants[2], 2)])
+
+        # Delete plants owned by both users in 1 statement, confirm renumbered
+        Plant.objects.filter(pk__in=[plants[1].pk, others[1].pk]).delete()
+        self.assertPositions(Plant, [(plants[2], 1)])
+
+        # Update unrelated column, confirm positions unchanged
+        Plant.objects.filter(user=other_user).update(description='new')
+        self.assertPositions(Plant, [(others[0], None), (plants[2], 1)])
+
+    def test_annotation_matches_display_name_query(self):
+        # Create mix of named and unnamed plants
+        for i in range(6):
+            Plant.objects.create(uuid=uuid4(), user=self.user, name='plant' if i % 3 == 0 else None)
+
+        # Confirm annotated display names match names read from column and
+        # names queried when column is NULL (instance loaded before trigger ran)
+        for plant in Plant.objects.with_unnamed_index_annotation():
+            loaded = Plant.objects.get(pk=plant.pk)
+            self.assertEqual(plant.get_display_name(), loaded.get_display_name())
+            loaded.unnamed_position = None
+            self.assertEqual(plant.get_display_name(), loaded.get_display_name())
+
+    def test_display_name_reads_unnamed_position(self):
+        # Load unnamed plant and group, confirm display names read from column
+        # without querying
+        plant = Plant.objects.get(pk=Plant.objects.create(uuid=uuid4(), user=self.user).pk)
+        group = Group.objects.get(pk=Group.objects.create(uuid=uuid4(), user=self.user).pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(plant.get_display_name(), 'Unnamed plant 1')
+            self.assertEqual(group.get_display_name(), 'Unnamed group 1')
+
+    def test_save_does_not_overwrite_unnamed_position(self):
+        # Load unnamed group (position 1), create older unnamed group after it
+        # was loaded (moves first group to position 2)
+        group = Group.objects.create(uuid=uuid4(), user=self.user)
+        outdated = Group.objects.get(pk=group.pk)
+        self.assertEqual(outdated.unnamed_position, 1)
+        older = Group.objects.create(uuid=uuid4(), user=self.user)
+        Group.objects.filter(pk=older.pk).update(created=timezone.now() - timezone.timedelta(days=1))
+
+        # Save outdated instance, confirm position was not overwritten
+        outdated.description = 'new description'
+        outdated.save()
+        self.assertPositions(Group, [(older, 1), (group, 2)])
+
+
+class UnnamedPositionConcurrencyTests(TransactionTestCase):
+    '''Tests to confirm concurrent transactions can't store duplicate
+    unnamed_position values (trigger holds per-user advisory lock).
+    '''
+
+    def setUp(self):
+        # Recreate default user (deleted by TransactionTestCase)
+        self.user, _ = get_user_model().objects.get_or_create(
+            username=settings.DEFAULT_USERNAME
+        )
+
+    def test_concurrent_unnamed_plants_race_condition(self):
+        first_created = threading.Event()
+
+        def worker_first():
+            try:
+                with transaction.atomic():
+                    plant = Plant.objects.create(uuid=uuid4(), user=self.user)
+                    # Keep transaction open while second plant is created
+                    first_created.set()
+                    time.sleep(0.5)
+                return plant
+            finally:
+                connection.close()
+
+        def worker_second():
+            try:
+                first_created.wait(timeout=5)
+                with transaction.atomic():
+                    return Plant.objects.create(uuid=uuid4(), user=self.user)
+            finally:
+                connection.close()
+
+        # Create 2 unnamed plants in simultaneous transactions
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = [pool.submit(worker_first), pool.submit(worker_second)]
+            wait(results)
+
+        # Confirm second transaction waited for first, plants have different
+        # sequential positions
+        first, second = (result.result() for result in results)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.unnamed_position, second.unnamed_position), (1, 2))
+
+
+class GroupPlantCountTriggerTests(TestCase):
+    '''Tests that confirm postgres trigger keeps Group plant_count column equal
+    to the number of plants in the group.
+    '''
+
+    def setUp(self):
+        self.user = get_default_user()
+        self.group1 = Group.objects.create(uuid=uuid4(), user=self.user)
+        self.group2 = Group.objects.create(uuid=uuid4(), user=self.user)
+
+    def assertPlantCounts(self, count1, count2):
+        self.group1.refresh_plant_count()
+        self.group2.refresh_plant_count()
+        self.assertEqual(self.group1.plant_count, count1)
+        self.assertEqual(self.group2.plant_count, count2)
+        self.assertEqual(self.group1.plant_count, self.group1.plant_set.count())
+        self.assertEqual(self.group2.plant_count, self.group2.plant_set.count())
+
+    def test_plant_count(self):
+        # Confirm new groups have no plants
+        self.assertPlantCounts(0, 0)
+
+        # Create plants in group1, confirm count updated
+        plant = Plant.objects.create(uuid=uuid4(), user=self.user, group=self.group1)
+        Plant.objects.bulk_create([
+            Plant(uuid=uuid4(), user=self.user, group=self.group1)
+            for _ in range(2)
+        ])
+        self.assertPlantCounts(3, 0)
+
+        # Move plant to group2, confirm both counts updated
+        plant.group = self.group2
+        plant.save(update_fields=['group'])
+        self.assertPlantCounts(2, 1)
+
+        # Save plant without changing group, confirm counts did not change
+        plant.name = 'plant'
+        plant.save()
+        self.assertPlantCounts(2, 1)
+
+        # Move all plants to group2 with bulk_update, confirm counts updated
+        plants = list(Plant.objects.all())
+        for plant in plants:
+            plant.group = self.group2
+        Plant.objects.bulk_update(plants, ['group'])
+        self.assertPlantCounts(0, 3)
+
+        # Delete plant with queryset, confirm count updated
+        Plant.objects.filter(pk=plants[0].pk).delete()
+        self.assertPlantCounts(0, 2)
+
+        # Remove plants from group, confirm count updated
+        Plant.objects.update(group=None)
+        self.assertPlantCounts(0, 0)
+
+    def test_delete_group(self):
+        # Delete group containing plants, confirm plants removed from group
+        plant = Plant.objects.create(uuid=uuid4(), user=self.user, group=self.group1)
+        self.group1.delete()
+        plant.refresh_from_db()
+        self.assertIsNone(plant.group)
+
+        # Add plant to other group, confirm count is correct
+        plant.group = self.group2
+        plant.save()
+        self.group2.refresh_plant_count()
+        self.assertEqual(self.group2.get_number_of_plants(), 1)
+
+    def test_save_does_not_overwrite_plant_count(self):
+        # Load group, add plant after it was loaded
+        group = Group.objects.get(pk=self.group1.pk)
+        Plant.objects.create(uuid=uuid4(), user=self.user, group=self.group1)
+
+        # Save outdated instance, confirm plant_count was not overwritten
+        group.name = 'new name'
+        group.save()
+        self.assertPlantCounts(1, 0)
+
+
+class UUIDRegistryTriggerTests(TestCase):
+    '''Tests that confirm postgres trigger stores model type, primary key, and
+    owner of each Plant and Group in the UUID registry.
+    '''
+
+    def setUp(self):
+        self.user = get_default_user()
+        self.other_user = get_user_model().objects.create_user(
+            username='other',
+            password='12345',
+            email='other@other.com'
+        )
+
+    def assertRegistryEntry(self, instance, model_type):
+        entry = UUID.objects.get(uuid=instance.uuid)
+        self.assertEqual(entry.model_type, model_type)
+        self.assertEqual(entry.object_id, instance.pk)
+        self.assertEqual(entry.user_id, instance.user_id)
+
+    def test_registry_entries(self):
+        # Create plant and group, confirm registry entries contain details
+        plant = Plant.objects.create(uuid=uuid4(), user=self.user)
+        group = Group.objects.create(uuid=uuid4(), user=self.user)
+        self.assertRegistryEntry(plant, 'plant')
+        self.assertRegistryEntry(group, 'group')
+
+        # Create plants with bulk_create, confirm registry entries created
+        plants = Plant.objects.bulk_create([
+            Plant(uuid=uuid4(), user=self.user) for _ in range(2)
+        ])
+        for bulk_plant in plants:
+            self.assertRegistryEntry(bulk_plant, 'plant')
+
+        # Change plant UUID, confirm new entry created and old entry removed
+        old_uuid = plant.uuid
+        plant.uuid = uuid4()
+        plant.save(update_fields=['uuid'])
+        self.assertRegistryEntry(plant, 'plant')
+        self.assertFalse(UUID.objects.filter(uuid=old_uuid).exists())
+
+        # Change group owner, confirm registry entry updated
+        group.user = self.other_user
+        group.save()
+        self.assertRegistryEntry(group, 'group')
+
+        # Delete plant, confirm registry entry removed
+        plant.delete()
+        self.assertFalse(UUID.objects.filter(uuid=plant.uuid).exists())
+
+
 class GroupModelTests(TestCase):
     def setUp(self):
         # Clear entire cache before each test
@@ -630,6 +1049,95 @@ class EventModelTests(TestCase):
         self.assertEqual(NoteEvent.objects.count(), 1)
 
 
+class PlantEventTests(TestCase):
+    '''Tests for the partitioned table containing water, fertilize, prune, and
+    repot events (PlantEvent model, each event model's table is a partition).
+    '''
+
+    def setUp(self):
+        self.plant = Plant.objects.create(uuid=uuid4(), user=get_default_user())
+        self.timestamp = timezone.now()
+
+    def create_one_of_each(self, timestamp):
+        return [
+            model.objects.create(plant=self.plant, timestamp=timestamp)
+            for model in (WaterEvent, FertilizeEvent, PruneEvent, RepotEvent)
+        ]
+
+    def test_contains_all_event_types(self):
+        # Create 1 event of each type with same timestamp
+        events = self.create_one_of_each(self.timestamp)
+
+        # Confirm PlantEvent contains all events with correct type
+        self.assertEqual(
+            sorted(PlantEvent.objects.filter(plant=self.plant).values_list('type', flat=True)),
+            ['fertilize', 'prune', 'repot', 'water']
+        )
+
+        # Confirm ids are unique across types and match event model ids
+        self.assertEqual(
+            sorted(PlantEvent.objects.values_list('id', flat=True)),
+            sorted(event.pk for event in events)
+        )
+        self.assertEqual(
+            PlantEvent.objects.get(type='water').pk,
+            WaterEvent.objects.get().pk
+        )
+
+    def test_delete_multiple_types(self):
+        # Create 2 events of each type
+        self.create_one_of_each(self.timestamp)
+        self.create_one_of_each(self.timestamp - timezone.timedelta(days=1))
+
+        # Delete newest water and prune events with 1 query
+        with self.assertNumQueries(1):
+            PlantEvent.objects.filter(
+                Q(type='water') | Q(type='prune'),
+                plant=self.plant,
+                timestamp=self.timestamp
+            ).delete()
+
+        # Confirm deleted from event model tables, other types not deleted
+        self.assertEqual(WaterEvent.objects.count(), 1)
+        self.assertEqual(PruneEvent.objects.count(), 1)
+        self.assertEqual(FertilizeEvent.objects.count(), 2)
+        self.assertEqual(RepotEvent.objects.count(), 2)
+
+        # Confirm last_watered_timestamp trigger ran on water events partition
+        self.plant.refresh_from_db()
+        self.assertEqual(
+            self.plant.last_watered_timestamp,
+            self.timestamp - timezone.timedelta(days=1)
+        )
+
+    def test_get_event_timestamps(self):
+        # Create events with and without microseconds
+        older = self.timestamp.replace(microsecond=0) - timezone.timedelta(days=1)
+        self.create_one_of_each(self.timestamp)
+        WaterEvent.objects.create(plant=self.plant, timestamp=older)
+
+        # Confirm returns most-recent first, same strings as isoformat
+        expected = {
+            'water': [self.timestamp.isoformat(), older.isoformat()],
+            'fertilize': [self.timestamp.isoformat()],
+            'prune': [self.timestamp.isoformat()],
+            'repot': [self.timestamp.isoformat()],
+        }
+        self.assertEqual(self.plant.get_event_timestamps(), expected)
+
+        # Confirm annotation returns same timestamps
+        annotated = Plant.objects.get_with_manage_plant_annotation(self.plant.uuid)
+        self.assertEqual(annotated.get_event_timestamps(), expected)
+
+        # Confirm all keys are present when plant has no events
+        PlantEvent.objects.filter(plant=self.plant).delete()
+        annotated = Plant.objects.get_with_manage_plant_annotation(self.plant.uuid)
+        self.assertEqual(
+            annotated.get_event_timestamps(),
+            {'water': [], 'fertilize': [], 'prune': [], 'repot': []}
+        )
+
+
 class UniqueUUIDTests(TransactionTestCase):
     '''Tests to confirm the same UUID cannot be used for a Plant and Group.'''
 
@@ -0,0 +1,150 @@
+'''Tests to confirm the hot querysets are served by indexes.
+
+Each test captures the SELECT queries made by a real code path and runs EXPLAIN
+on them with sequential scans disabled. The planner still chooses a sequential
+scan when no usable index exists, so a plan containing "Seq Scan" means a query
+lost its index coverage (eg a filter or ordering changed, index was dropped).
+'''
+
+# pylint: disable=missing-docstring,R0801,global-statement
+
+from uuid import uuid4
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from django.db import connection
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
+
+from .view_decorators import get_default_user, find_model_type
+from .get_state_views import (
+    build_overview_state,
+    build_manage_plant_state,
+    has_archived_entries,
+    find_manage_state_instance,
+    get_plant_history_dict,
+    get_plant_photos_page_dict
+)
+from .models import (
+    Group,
+    Plant,
+    Photo,
+    WaterEvent,
+    FertilizeEvent,
+    NoteEvent,
+    log_changed_details
+)
+from .unit_test_helpers import (
+    create_mock_photo,
+    enable_isolated_media_root,
+    cleanup_isolated_media_root,
+)
+
+
+OVERRIDE = None
+MODULE_MEDIA_ROOT = None
+
+
+def setUpModule():
+    global OVERRIDE, MODULE_MEDIA_ROOT
+    OVERRIDE, MODULE_MEDIA_ROOT = enable_isolated_media_root()
+
+
+def tearDownModule():
+    # Delete mock photo directory after tests
+    cleanup_isolated_media_root(OVERRIDE, MODULE_MEDIA_ROOT)
+
+
+class QueryPlanTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        # Create named, unnamed, and archived plants and groups with events,
+        # photos, and notes
+        self.user = get_default_user()
+        self.group = Group.objects.create(uuid=uuid4(), user=self.user)
+        Group.objects.create(uuid=uuid4(), user=self.user, name='Named', archived=True)
+        self.plant = Plant.objects.create(uuid=uuid4(), user=self.user, group=self.group)
+        Plant.objects.create(uuid=uuid4(), user=self.user, name='Named')
+        Plant.objects.create(uuid=uuid4(), user=self.user, archived=True)
+        now = timezone.now()
+        for day in range(5):
+            timestamp = now - timedelta(days=day)
+            WaterEvent.objects.create(plant=self.plant, timestamp=timestamp)
+            FertilizeEvent.objects.create(plant=self.plant, timestamp=timestamp)
+            NoteEvent.objects.create(plant=self.plant, timestamp=timestamp, text='note')
+        for _ in range(3):
+            Photo.objects.create(photo=create_mock_photo(), plant=self.plant)
+
+    def get_query_plans(self, func):
+        '''Takes function, calls it and returns list of (sql, plan) tuples for
+        each SELECT query it made (plans queried with sequential scans disabled).
+        '''
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        queries = [
+            query['sql'] for query in ctx.captured_queries
+            if query['sql'].lstrip('(').startswith('SELECT')
+        ]
+        self.assertTrue(queries)
+
+        plans = []
+        with connection.cursor() as cursor:
+            # Reverted when the test transaction is rolled back
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            for sql in queries:
+                cursor.execute(f'EXPLAIN {sql}')
+                plans.append((sql, '\n'.join(row[0] for row in cursor.fetchall())))
+        return plans
+
+    def assertNoSeqScans(self, func):
+        '''Takes function, fails if any query it makes has a sequential scan.'''
+        for sql, plan in self.get_query_plans(func):
+            if 'Seq Scan' in plan:
+                raise self.failureException(
+                    f"Query uses sequential scan:\n{sql}\n\nPlan:\n{plan}"
+                )
+
+    def test_overview_state(self):
+        # Plants and groups ordered by created, archived check, title
+        self.assertNoSeqScans(lambda: build_overview_state(self.user))
+        self.assertNoSeqScans(lambda: build_overview_state(self.user, archived=True))
+
+    def test_has_archived_entries(self):
+        self.assertNoSeqScans(lambda: has_archived_entries(self.user.pk))
+
+    def test_manage_plant_state(self):
+        # Event history, photos, notes, change events, group
+        self.assertNoSeqScans(lambda: build_manage_plant_state(
+            Plant.objects.get_with_manage_plant_annotation(self.plant.uuid)
+        ))
+
+    def test_unnamed_index_fallback(self):
+        # Counts unnamed plants/groups created before instance (no annotation,
+        # unnamed_position not loaded yet)
+        self.plant.unnamed_position = None
+        self.group.unnamed_position = None
+        self.assertNoSeqScans(self.plant.get_display_name)
+        self.assertNoSeqScans(self.group.get_display_name)
+
+    def test_log_changed_details(self):
+        # Finds existing DetailsChangedEvents on same day for each plant
+        log_changed_details([self.plant], {'name': 'first'})
+        self.assertNoSeqScans(
+            lambda: log_changed_details([self.plant], {'name': 'second'})
+        )
+
+    def test_find_model_type(self):
+        self.assertNoSeqScans(lambda: find_model_type(self.plant.uuid))
+        self.assertNoSeqScans(lambda: find_manage_state_instance(self.group.uuid))
+
+    def test_plant_history_and_photo_pages(self):
+        start = timezone.now() - timedelta(days=3)
+        self.assertNoSeqScans(
+            lambda: get_plant_history_dict(self.plant.pk, start, timezone.now())
+        )
+        page = get_plant_photos_page_dict(self.plant.pk, limit=1)
+        self.assertNoSeqScans(
+            lambda: get_plant_photos_page_dict(self.plant.pk, page['next_cursor'], 1)
+        )
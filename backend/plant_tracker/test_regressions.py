@@ -2028,10 +2028,12 @@ class CachedStateRegressionTests(TestCase):
         )
 
         # Create new WaterEvent with timestamp in between existing 2
-        WaterEvent.objects.create(
-            plant=plant,
-            timestamp=datetime.fromisoformat('2024-02-06T03:06:26.000Z')
-        )
+        response = JSONClient().post('/add_plant_event', {
+            'plant_id': plant.uuid,
+            'event_type': 'water',
+            'timestamp': '2024-02-06T03:06:26.000Z'
+        })
+        self.assertEqual(response.status_code, 200)
 
         # Request manage plant state, confirm new event is sorted chronologically
         response = self.client.get(
@@ -214,12 +214,62 @@ class SqlQueriesPerPageTests(TestCase):
             response = self.client.get('/get_overview_state')
             self.assertEqual(response.status_code, 200)
 
+    def test_get_overview_state_page(self):
+        '''Requesting the first page of overview plants should make 3 queries
+        (4 if >=1 Plant on the page is in a Group). Each following page should
+        make 2 queries (3 if >=1 Plant is in a Group). Cached state is not used.
+        '''
+
+        # Request first page of plants with no plants in groups, confirm 3 queries
+        with self.assertNumQueries(3):
+            response = self.client.get('/get_overview_state_page?key=plants&limit=1')
+            self.assertEqual(response.status_code, 200)
+        cursor = response.json()['next_cursor']
+
+        # Request next page, confirm 2 queries
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/get_overview_state_page?key=plants&limit=1&cursor={cursor}')
+            self.assertEqual(response.status_code, 200)
+
+        # Add all plants to group, request first page again, confirm 4 queries
+        Plant.objects.update(group=Group.objects.first())
+        with self.assertNumQueries(4):
+            response = self.client.get('/get_overview_state_page?key=plants')
+            self.assertEqual(response.status_code, 200)
+
+        # Request first page of groups, confirm 3 queries
+        with self.assertNumQueries(3):
+            response = self.client.get('/get_overview_state_page?key=groups')
+            self.assertEqual(response.status_code, 200)
+
+    def test_stream_overview_state(self):
+        '''Streaming the overview state should make 4 queries when no Plants
+        are in Groups, 5 queries when >=1 Plant is in a Group (1 prefetch query
+        per chunk of plants). Cached state is not used.
+        '''
+
+        # Stream state with no plants in groups, confirm 4 queries
+        with self.assertNumQueries(4):
+            response = self.client.get('/stream_overview_state')
+            self.assertEqual(response.status_code, 200)
+            b''.join(response.streaming_content)
+
+        # Add plant to group, stream again, confirm 5 queries
+        plant = Plant.objects.first()
+        plant.group = Group.objects.first()
+        plant.save()
+        with self.assertNumQueries(5):
+            response = self.client.get('/stream_overview_state')
+            self.assertEqual(response.status_code, 200)
+            b''.join(response.streaming_content)
+
     def test_archived_overview_page(self):
         '''Loading the archived overview should make 1 database query.
 
         Requesting the archived overview state should make:
-        - 4 queries when no archived Plants are in Groups
-        - 5 queries when >=1 archived Plant is in a Group
+        - 4 queries when no archived Plants are in Groups (and no cached state exists)
+        - 5 queries when >=1 archived Plant is in a Group (and no cached state exists)
+        - 1 query if a cached state exists
         '''
 
         # Archive 1 plant and 1 group
@@ -243,17 +293,24 @@ class SqlQueriesPerPageTests(TestCase):
         # Add plant to group, request state again, confirm 5 queries
         plant.group = group
         plant.save()
+        cache.clear()
         with self.assertNumQueries(5):
             response = self.client.get('/get_archived_overview_state')
             self.assertEqual(response.status_code, 200)
 
+        # Load again (cached state now exists), confirm 1 query
+        with self.assertNumQueries(1):
+            response = self.client.get('/get_archived_overview_state')
+            self.assertEqual(response.status_code, 200)
+
     def test_manage_plant_page(self):
         '''Loading a manage_plant page should make 1 database query.
 
-        Requesting the manage plant state should make 6 queries regardless of
-        whether plant is named (no extra query for unnamed index), has photos
-        (no extra query for last photo when annotation is None) or has parent
-        (no extra query for parent details).
+        Requesting the manage plant state should make 6 queries when no cached
+        state exists regardless of whether plant is named (no extra query for
+        unnamed index), has photos (no extra query for last photo when annotation
+        is None) or has parent (no extra query for parent details). Should make
+        3 queries if a cached state exists (no photos, notes, or change_events).
         '''
         plant = Plant.objects.first()
 
@@ -272,6 +329,7 @@ class SqlQueriesPerPageTests(TestCase):
         # Set name, request again (name, no photos), confirm still 6 queries
         plant.name = 'has name'
         plant.save()
+        cache.clear()
         with self.assertNumQueries(6):
             response = self.client.get(
                 f'/get_manage_state/{plant.uuid}',
@@ -282,6 +340,7 @@ class SqlQueriesPerPageTests(TestCase):
         # Add photo, confirm still 6 queries (no most-recent query, has annotation)
         photo = Photo.objects.create(photo=create_mock_photo(), plant=plant)
         photo.finalize_upload()
+        cache.clear()
         with self.assertNumQueries(6):
             response = self.client.get(
                 f'/get_manage_state/{plant.uuid}',
@@ -292,6 +351,7 @@ class SqlQueriesPerPageTests(TestCase):
         # Set default, confirm 6 queries (no most-recent query, has annotation)
         plant.default_photo = photo
         plant.save()
+        cache.clear()
         with self.assertNumQueries(6):
             response = self.client.get(
                 f'/get_manage_state/{plant.uuid}',
@@ -304,17 +364,20 @@ class SqlQueriesPerPageTests(TestCase):
         plant.group = group
         plant.save()
 
-        # Request again, confirm makes 7 queries (+1 to get unnamed group name)
-        with self.assertNumQueries(7):
+        # Request again, confirm still 6 queries (unnamed group name read from
+        # unnamed_position column, no extra query)
+        cache.clear()
+        with self.assertNumQueries(6):
             response = self.client.get(
                 f'/get_manage_state/{plant.uuid}',
                 HTTP_ACCEPT='application/json'
             )
             self.assertEqual(response.status_code, 200)
 
-        # Name group, request again, confirm makes 6 queries
+        # Name group, request again, confirm still 6 queries
         group.name = 'Test group'
         group.save()
+        cache.clear()
         with self.assertNumQueries(6):
             response = self.client.get(
                 f'/get_manage_state/{plant.uuid}',
@@ -332,6 +395,7 @@ class SqlQueriesPerPageTests(TestCase):
         )
 
         # Request child plant state, confirm 6 queries (no extra for parent)
+        cache.clear()
         with self.assertNumQueries(6):
             response = self.client.get(
                 f'/get_manage_state/{child.uuid}',
@@ -339,6 +403,15 @@ class SqlQueriesPerPageTests(TestCase):
             )
             self.assertEqual(response.status_code, 200)
 
+        # Request child plant state again (cached state now exists), confirm
+        # 3 queries (photos, notes, and change_events loaded from cache)
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                f'/get_manage_state/{child.uuid}',
+                HTTP_ACCEPT='application/json'
+            )
+            self.assertEqual(response.status_code, 200)
+
     def test_manage_plant_state_with_division_events(self):
         '''Requesting the manage plant state for a plant with DivisionEvents
         should make 8 queries regardless of the number of DivisionEvents or
@@ -379,6 +452,7 @@ class SqlQueriesPerPageTests(TestCase):
             )
 
         # Request parent plant state again, confirm still 8 queries
+        cache.clear()
         with self.assertNumQueries(8):
             response = self.client.get(
                 f'/get_manage_state/{plant.uuid}',
@@ -389,8 +463,10 @@ class SqlQueriesPerPageTests(TestCase):
     def test_manage_group_page(self):
         '''Loading a manage_group page should make 1 database query.
 
-        Requesting the manage group state should make 4 queries regardless of
-        whether group is named (no extra query for unnamed index).
+        Requesting the manage group state should make 4 queries when no cached
+        state exists regardless of whether group is named (no extra query for
+        unnamed index). Should make 3 queries if a cached state exists (plant
+        details loaded from cache).
         '''
         group = Group.objects.first()
         with self.assertNumQueries(1):
@@ -408,6 +484,7 @@ class SqlQueriesPerPageTests(TestCase):
         # Set name, request state again, confirm still 4 queries
         group.name = 'has name'
         group.save()
+        cache.clear()
         with self.assertNumQueries(4):
             response = self.client.get(
                 f'/get_manage_state/{group.uuid}',
@@ -415,6 +492,14 @@ class SqlQueriesPerPageTests(TestCase):
             )
             self.assertEqual(response.status_code, 200)
 
+        # Request again (cached state now exists), confirm 3 queries
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                f'/get_manage_state/{group.uuid}',
+                HTTP_ACCEPT='application/json'
+            )
+            self.assertEqual(response.status_code, 200)
+
     def test_registration_page(self):
         '''Requesting the registration page should make 1 database query.
 
@@ -431,6 +516,50 @@ class SqlQueriesPerPageTests(TestCase):
             )
             self.assertEqual(response.status_code, 200)
 
+    def test_get_plant_history_endpoint(self):
+        '''/get_plant_history should make 4 database queries regardless of the
+        number of events and notes in the requested range (user, uuid lookup,
+        1 query for all event types, 1 query for notes).
+        '''
+        plant = Plant.objects.first()
+        for day in range(1, 6):
+            timestamp = datetime.fromisoformat(f'2024-02-0{day}T12:00:00+00:00')
+            WaterEvent.objects.create(plant=plant, timestamp=timestamp)
+            PruneEvent.objects.create(plant=plant, timestamp=timestamp)
+            NoteEvent.objects.create(plant=plant, timestamp=timestamp, text='note')
+
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                f'/get_plant_history/{plant.uuid}?start=2024-01-01T00:00:00',
+                HTTP_ACCEPT='application/json'
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['events']['water']), 5)
+
+    def test_get_plant_photos_endpoint(self):
+        '''/get_plant_photos should make 3 database queries regardless of the
+        number of photos (user, uuid lookup, 1 keyset query for the page).
+        '''
+        plant = Plant.objects.first()
+        for _ in range(5):
+            Photo.objects.create(photo=create_mock_photo(), plant=plant)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                f'/get_plant_photos/{plant.uuid}?limit=2',
+                HTTP_ACCEPT='application/json'
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['photos']), 2)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                f'/get_plant_photos/{plant.uuid}?cursor={response.json()["next_cursor"]}',
+                HTTP_ACCEPT='application/json'
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['photos']), 3)
+
     def test_get_plant_species_options_endpoint(self):
         '''/get_plant_species_options should make 2 database queries.'''
         with self.assertNumQueries(2):
@@ -509,9 +638,11 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
             self.assertEqual(response.status_code, 200)
 
     def test_change_uuid_endpoint_group(self):
-        '''/change_uuid should make 4 database queries when target is Group.'''
+        '''/change_uuid should make 5 database queries when target is Group
+        (includes query for plants with DetailsChangedEvents containing group).
+        '''
         group = Group.objects.create(uuid=uuid4(), user=get_default_user())
-        with self.assertNumQueries(4):
+        with self.assertNumQueries(5):
             response = self.client.post('/change_uuid', {
                 'uuid': str(group.uuid),
                 'new_id': str(uuid4())
@@ -519,9 +650,12 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
             self.assertEqual(response.status_code, 200)
 
     def test_edit_plant_details_endpoint(self):
-        '''/edit_plant_details should make 5 database queries.'''
+        '''/edit_plant_details should make 6 database queries when an unnamed
+        plant is named (includes query for unnamed plants created after it,
+        unnamed plant names change).
+        '''
         plant = Plant.objects.create(uuid=uuid4(), user=get_default_user())
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(6):
             response = self.client.post('/edit_plant_details', {
                 'plant_id': plant.uuid,
                 'name': 'test plant',
@@ -532,9 +666,12 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
             self.assertEqual(response.status_code, 200)
 
     def test_edit_group_details_endpoint(self):
-        '''/edit_group_details should make 3 database queries.'''
+        '''/edit_group_details should make 5 database queries when an unnamed
+        group is named (includes query for unnamed groups created after it and
+        query for plants with DetailsChangedEvents containing renumbered groups).
+        '''
         group = Group.objects.create(uuid=uuid4(), user=get_default_user())
-        with self.assertNumQueries(3):
+        with self.assertNumQueries(5):
             response = self.client.post('/edit_group_details', {
                 'group_id': group.uuid,
                 'name': 'test group    ',
@@ -572,24 +709,24 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
             self.assertEqual(response.status_code, 200)
 
     def test_bulk_delete_plants_and_groups_endpoint_1_group(self):
-        '''/bulk_delete_plants_and_groups should make 9 database queries when
+        '''/bulk_delete_plants_and_groups should make 10 database queries when
         deleting a single Group instance.
         '''
         group = Group.objects.create(uuid=uuid4(), user=get_default_user(), name='Group 1')
-        with self.assertNumQueries(9):
+        with self.assertNumQueries(10):
             response = self.client.post('/bulk_delete_plants_and_groups', {
                 'uuids': [str(group.uuid)]
             })
             self.assertEqual(response.status_code, 200)
 
     def test_bulk_delete_plants_and_groups_endpoint_3_groups(self):
-        '''/bulk_delete_plants_and_groups should make 9 database queries when
+        '''/bulk_delete_plants_and_groups should make 10 database queries when
         deleting 3 Group instances.
         '''
         group1 = Group.objects.create(uuid=uuid4(), user=get_default_user(), name='Group 1')
         group2 = Group.objects.create(uuid=uuid4(), user=get_default_user(), name='Group 2')
         group3 = Group.objects.create(uuid=uuid4(), user=get_default_user(), name='Group 3')
-        with self.assertNumQueries(9):
+        with self.assertNumQueries(10):
             response = self.client.post('/bulk_delete_plants_and_groups', {
                 'uuids': [
                     str(group1.uuid),
@@ -600,7 +737,7 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
             self.assertEqual(response.status_code, 200)
 
     def test_bulk_delete_plants_and_groups_endpoint_3_plants_3_groups(self):
-        '''/bulk_delete_plants_and_groups should make 20 database queries when
+        '''/bulk_delete_plants_and_groups should make 21 database queries when
         deleting 3 plant instances and 3 Group instances.
         '''
         plant1 = Plant.objects.create(uuid=uuid4(), user=get_default_user(), name='Plant 1')
@@ -609,7 +746,7 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
         group1 = Group.objects.create(uuid=uuid4(), user=get_default_user(), name='Group 1')
         group2 = Group.objects.create(uuid=uuid4(), user=get_default_user(), name='Group 2')
         group3 = Group.objects.create(uuid=uuid4(), user=get_default_user(), name='Group 3')
-        with self.assertNumQueries(20):
+        with self.assertNumQueries(21):
             response = self.client.post('/bulk_delete_plants_and_groups', {
                 'uuids': [
                     str(plant1.uuid),
@@ -623,9 +760,10 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
             self.assertEqual(response.status_code, 200)
 
     def test_bulk_delete_plants_and_groups_endpoint_plant_in_group(self):
-        '''/bulk_delete_plants_and_groups should make 21 database queries when
+        '''/bulk_delete_plants_and_groups should make 23 database queries when
         deleting 3 plant instances and 3 Group instances when 2 plants are in
-        a group (extra UPDATE query for related group object).
+        a group (extra UPDATE query for related group object, extra query for
+        plants in deleted group to remove group from their cached details).
         '''
         user = get_default_user()
         group1 = Group.objects.create(uuid=uuid4(), user=user, name='Group 1')
@@ -634,7 +772,7 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
         plant1 = Plant.objects.create(uuid=uuid4(), user=user, name='Plant 1')
         plant2 = Plant.objects.create(uuid=uuid4(), user=user, group=group1, name='Plant 2')
         plant3 = Plant.objects.create(uuid=uuid4(), user=user, group=group1, name='Plant 3')
-        with self.assertNumQueries(21):
+        with self.assertNumQueries(23):
             response = self.client.post('/bulk_delete_plants_and_groups', {
                 'uuids': [
                     str(plant1.uuid),
@@ -1074,8 +1212,9 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
             self.assertEqual(response.status_code, 200)
 
     def test_delete_plant_events_endpoint_all_event_types(self):
-        '''/delete_plant_events should make 12 database queries when deleting
-        any number of all 4 event types.
+        '''/delete_plant_events should make 6 database queries when deleting
+        any number of all 4 event types (all types are selected and deleted
+        with 1 query each).
         '''
         plant = Plant.objects.create(uuid=uuid4(), user=get_default_user())
         timestamp1 = '2024-04-19T00:13:37+00:00'
@@ -1092,8 +1231,8 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
                 timestamp3
             ))
 
-        # Confirm 12 queries when deleting 1 of each
-        with self.assertNumQueries(12):
+        # Confirm 6 queries when deleting 1 of each
+        with self.assertNumQueries(6):
             response = self.client.post('/delete_plant_events', {
                 'plant_id': plant.uuid,
                 'events': {
@@ -1105,8 +1244,8 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
             })
             self.assertEqual(response.status_code, 200)
 
-        # Confirm 12 queries when deletng 2 of each
-        with self.assertNumQueries(12):
+        # Confirm 6 queries when deletng 2 of each
+        with self.assertNumQueries(6):
             response = self.client.post('/delete_plant_events', {
                 'plant_id': plant.uuid,
                 'events': {
@@ -1171,8 +1310,9 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
             self.assertEqual(response.status_code, 200)
 
     def test_add_plant_to_group_endpoint(self):
-        '''/add_plant_to_group should make 7 database queries if Group is named,
-        8 queries if Group is unnamed (must get unnamed index).'''
+        '''/add_plant_to_group should make 7 database queries regardless of
+        whether Group is named (unnamed index read from unnamed_position column).
+        '''
         user = get_default_user()
         plant = Plant.objects.create(uuid=uuid4(), user=user)
         group = Group.objects.create(uuid=uuid4(), user=user, name='Outside')
@@ -1187,7 +1327,7 @@ class SqlQueriesPerViewTests(AssertNumQueriesMixin, TestCase):
         group.save()
         plant.group = None
         plant.save()
-        with self.assertNumQueries(8):
+        with self.assertNumQueries(7):
             response = self.client.post('/add_plant_to_group', {
                 'plant_id': plant.uuid,
                 'group_id': group.uuid
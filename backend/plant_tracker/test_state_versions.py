@@ -0,0 +1,219 @@
+# pylint: disable=missing-docstring,line-too-long,R0801
+
+from uuid import uuid4
+
+from django.test import TestCase
+from django.utils import timezone
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+
+from .models import Plant, Group, DivisionEvent
+from .view_decorators import get_default_user
+from .unit_test_helpers import JSONClient
+from .state_versions import (
+    bump_state_versions,
+    get_overview_etag,
+    delete_all_state_versions
+)
+
+
+class StateVersionTests(TestCase):
+    '''Test state version helper functions.'''
+
+    def setUp(self):
+        # Clear entire cache before each test
+        cache.clear()
+        self.user = get_default_user()
+
+    def test_bump_state_versions(self):
+        # Confirm overview ETag changes after bumping user version
+        etag = get_overview_etag(self.user.pk)
+        self.assertEqual(get_overview_etag(self.user.pk), etag)
+        bump_state_versions(self.user.pk)
+        self.assertNotEqual(get_overview_etag(self.user.pk), etag)
+
+        # Confirm overview ETag does not change if overview arg is False
+        etag = get_overview_etag(self.user.pk)
+        bump_state_versions(self.user.pk, overview=False)
+        self.assertEqual(get_overview_etag(self.user.pk), etag)
+
+    def test_versions_do_not_repeat_after_cache_cleared(self):
+        # Get ETag, bump version, then delete all versions
+        etag = get_overview_etag(self.user.pk)
+        bump_state_versions(self.user.pk)
+        delete_all_state_versions()
+
+        # Confirm new ETag does not match either previous ETag
+        self.assertNotEqual(get_overview_etag(self.user.pk), etag)
+        bump_state_versions(self.user.pk)
+        self.assertNotEqual(get_overview_etag(self.user.pk), etag)
+
+
+class ConditionalStateEndpointTests(TestCase):
+    '''Test that SPA state endpoints return 304 when state has not changed.'''
+
+    def setUp(self):
+        # Clear entire cache before each test
+        cache.clear()
+
+        # Set default content_type for post requests (avoid long lines)
+        self.client = JSONClient()
+
+        self.user = get_default_user()
+        self.group = Group.objects.create(user=self.user, uuid=uuid4(), name='group')
+        self.plant = Plant.objects.create(user=self.user, uuid=uuid4(), name='plant', group=self.group)
+
+    def get_etag(self, url):
+        '''Requests url, confirms 200 response with ETag, returns ETag.'''
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        return response['ETag']
+
+    def assert_not_modified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def assert_modified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_overview_state(self):
+        # Get ETag, confirm 304 if requested again with same ETag
+        etag = self.get_etag('/get_overview_state')
+        self.assert_not_modified('/get_overview_state', etag)
+
+        # Add note (not shown on overview), confirm still 304
+        self.client.post('/add_plant_note', {
+            'plant_id': str(self.plant.uuid),
+            'timestamp': '2024-02-06T03:06:26.000Z',
+            'note_text': 'note'
+        })
+        self.assert_not_modified('/get_overview_state', etag)
+
+        # Water plant, confirm 200 with new state
+        self.client.post('/add_plant_event', {
+            'plant_id': str(self.plant.uuid),
+            'event_type': 'water',
+            'timestamp': timezone.now().isoformat()
+        })
+        self.assert_modified('/get_overview_state', etag)
+
+    def test_options_states(self):
+        for url in ['/get_plant_options', '/get_add_to_group_options']:
+            # Get ETag, confirm 304 if requested again with same ETag
+            etag = self.get_etag(url)
+            self.assert_not_modified(url, etag)
+
+            # Register new group, confirm 200 with new state
+            self.client.post('/register_group', {
+                'name': 'new group',
+                'location': '',
+                'description': '',
+                'uuid': str(uuid4())
+            })
+            self.assert_modified(url, etag)
+
+    def test_manage_plant_state(self):
+        # Get ETag, confirm 304 if requested again with same ETag
+        url = f'/get_manage_state/{self.plant.uuid}'
+        etag = self.get_etag(url)
+        self.assert_not_modified(url, etag)
+
+        # Add note, confirm 200 with new state
+        self.client.post('/add_plant_note', {
+            'plant_id': str(self.plant.uuid),
+            'timestamp': '2024-02-06T03:06:26.000Z',
+            'note_text': 'note'
+        })
+        self.assert_modified(url, etag)
+
+    def test_manage_plant_state_group_renamed(self):
+        # Get plant ETag, rename group (shown in plant details)
+        url = f'/get_manage_state/{self.plant.uuid}'
+        etag = self.get_etag(url)
+        self.client.post('/edit_group_details', {
+            'group_id': str(self.group.uuid),
+            'name': 'new name',
+            'location': '',
+            'description': ''
+        })
+
+        # Confirm 200 with new group name
+        self.assert_modified(url, etag)
+
+    def test_manage_plant_state_parent_renamed(self):
+        # Create child plant divided from plant, get child ETag
+        event = DivisionEvent.objects.create(plant=self.plant, timestamp=timezone.now())
+        child = Plant.objects.create(
+            user=self.user,
+            uuid=uuid4(),
+            divided_from=self.plant,
+            divided_from_event=event
+        )
+        url = f'/get_manage_state/{child.uuid}'
+        etag = self.get_etag(url)
+
+        # Rename parent plant, confirm child returns 200 with new parent name
+        self.client.post('/edit_plant_details', {
+            'plant_id': str(self.plant.uuid),
+            'name': 'new name',
+            'species': '',
+            'description': '',
+            'pot_size': ''
+        })
+        self.assert_modified(url, etag)
+
+    def test_manage_group_state(self):
+        # Get ETag, confirm 304 if requested again with same ETag
+        url = f'/get_manage_state/{self.group.uuid}'
+        etag = self.get_etag(url)
+        self.assert_not_modified(url, etag)
+
+        # Water plant in group, confirm 200 with new state
+        self.client.post('/add_plant_event', {
+            'plant_id': str(self.plant.uuid),
+            'event_type': 'water',
+            'timestamp': timezone.now().isoformat()
+        })
+        self.assert_modified(url, etag)
+
+    def test_manage_group_state_plant_removed(self):
+        # Get group ETag, remove plant from group
+        url = f'/get_manage_state/{self.group.uuid}'
+        etag = self.get_etag(url)
+        self.client.post('/remove_plant_from_group', {
+            'plant_id': str(self.plant.uuid)
+        })
+
+        # Confirm 200 with plant removed
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['state']['plants'], {})
+
+    def test_manage_state_unnamed_plants_renumbered(self):
+        # Create unnamed plant in group, get group ETag
+        Plant.objects.create(user=self.user, uuid=uuid4(), group=self.group)
+        url = f'/get_manage_state/{self.group.uuid}'
+        etag = self.get_etag(url)
+
+        # Remove name from plant not in group (unnamed plant numbers may change)
+        other = Plant.objects.create(user=self.user, uuid=uuid4(), name='other')
+        self.client.post('/edit_plant_details', {
+            'plant_id': str(other.uuid),
+            'name': '',
+            'species': '',
+            'description': '',
+            'pot_size': ''
+        })
+        self.assert_modified(url, etag)
+
+    def test_manage_state_other_user(self):
+        # Confirm 403 (no ETag) if plant is owned by a different user
+        other_user = get_user_model().objects.create_user(username='unittest', password='12345')
+        plant = Plant.objects.create(user=other_user, uuid=uuid4())
+        response = self.client.get(f'/get_manage_state/{plant.uuid}')
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn('ETag', response)
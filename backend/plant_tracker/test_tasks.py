@@ -6,6 +6,8 @@ from unittest.mock import patch
 
 from django.test import TestCase
 from django.core.cache import cache
+from django.utils import timezone
+from django.contrib.auth import get_user_model
 
 from .models import Plant, Photo
 from .view_decorators import get_default_user
@@ -16,7 +18,9 @@ from .unit_test_helpers import (
 )
 from .tasks import (
     update_cached_overview_state,
+    update_cached_overview_states,
     update_all_cached_states,
+    sort_users_by_last_login,
     process_photo_upload
 )
 
@@ -41,6 +45,22 @@ class HelperFunctionTests(TestCase):
         # Clear entire cache before each test
         cache.clear()
 
+    def test_sort_users_by_last_login(self):
+        # Create users that logged in at different times + never logged in
+        user_model = get_user_model()
+        now = timezone.now()
+        never = user_model.objects.create_user(username='never', password='pass')
+        old = user_model.objects.create_user(username='old', password='pass')
+        new = user_model.objects.create_user(username='new', password='pass')
+        user_model.objects.filter(pk=old.pk).update(last_login=now - timezone.timedelta(days=30))
+        user_model.objects.filter(pk=new.pk).update(last_login=now)
+
+        # Confirm most recent first, never logged in and nonexistent users last
+        self.assertEqual(
+            sort_users_by_last_login([9999, never.pk, old.pk, new.pk]),
+            [new.pk, old.pk, never.pk, 9999]
+        )
+
 
 class TaskTests(TestCase):
     '''Test task functions'''
@@ -71,6 +91,56 @@ class TaskTests(TestCase):
         # Confirm cached overview state was rebuilt (no longer dummy strings)
         self.assertIsInstance(cache.get(f'overview_state_{default_user.pk}'), dict)
 
+    def test_update_all_cached_states_batches(self):
+        # Create users that logged in at different times, cache dummy states
+        user_model = get_user_model()
+        now = timezone.now()
+        users = [
+            user_model.objects.create_user(
+                username=f'user{i}',
+                password='pass',
+                last_login=now - timezone.timedelta(days=i)
+            )
+            for i in range(5)
+        ]
+        for user in users:
+            cache.set(f'overview_state_{user.pk}', 'foo')
+        # Cache dummy state for user that no longer exists
+        cache.set('overview_state_9999', 'foo')
+
+        # Call update_all_cached_states with 2 users per batch, 2 chains
+        with patch('plant_tracker.tasks.STARTUP_REBUILD_BATCH_SIZE', 2), \
+             patch('plant_tracker.tasks.STARTUP_REBUILD_CONCURRENCY', 2), \
+             patch('plant_tracker.tasks.update_cached_overview_states.run',
+                   wraps=update_cached_overview_states.run) as mock_task:
+            update_all_cached_states()
+
+        # Confirm users were split into batches, most recent login first
+        # (batches alternate between chains, nonexistent user is last)
+        self.assertEqual(
+            [call.args[0] for call in mock_task.call_args_list],
+            [
+                [users[0].pk, users[1].pk],
+                [users[4].pk, 9999],
+                [users[2].pk, users[3].pk],
+            ]
+        )
+
+        # Confirm all states were rebuilt, nonexistent user state was deleted
+        for user in users:
+            self.assertIsInstance(cache.get(f'overview_state_{user.pk}'), dict)
+        self.assertIsNone(cache.get('overview_state_9999'))
+
+    def test_update_cached_overview_states_error(self):
+        # Cache dummy state, simulate error while building state
+        user = get_default_user()
+        cache.set(f'overview_state_{user.pk}', 'foo')
+        with patch('plant_tracker.tasks.build_overview_state', side_effect=ValueError):
+            update_cached_overview_states.delay([user.pk])
+
+        # Confirm cached state was deleted (rebuilt next time requested)
+        self.assertIsNone(cache.get(f'overview_state_{user.pk}'))
+
     def test_update_all_cached_states_pending_photo_uploads(self):
         # Simulate pending photo upload that didn't complete before server stopped
         plant = Plant.objects.create(uuid=uuid4(), user=get_default_user())
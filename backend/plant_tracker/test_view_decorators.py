@@ -5,9 +5,12 @@ from uuid import uuid4
 
 from django.test import TestCase
 from django.http import HttpResponse
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
 from django.test.client import RequestFactory
 
-from .models import Plant
+from .models import Plant, Group
+from .uuid_cache import get_cached_uuid_entry
 from .view_decorators import (
     requires_json_post,
     get_default_user,
@@ -366,3 +369,132 @@ class UnusedBranchCoverageTests(TestCase):
         self.assertFalse(hasattr(plant, 'last_watered_time'))
         self.assertFalse(hasattr(plant, 'last_fertilized_time'))
         self.assertFalse(hasattr(plant, 'last_photo_thumbnail'))
+
+
+class UUIDCacheTests(TestCase):
+    '''Tests that confirm decorators use the UUID lookup cache (see
+    uuid_cache.py) to reject foreign or missing UUIDs without querying and
+    that views delete outdated entries.
+    '''
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_default_user()
+        self.other_user = get_user_model().objects.create_user(
+            username='other',
+            password='12345',
+            email='other@other.com'
+        )
+        self.plant = Plant.objects.create(uuid=uuid4(), user=self.user)
+        self.group = Group.objects.create(uuid=uuid4(), user=self.user)
+
+        # Mock view functions that return instance passed by decorator
+        self.get_plant = get_plant_from_post_body()(
+            lambda plant, **kwargs: plant
+        )
+        self.get_group = get_group_from_post_body()(
+            lambda group, **kwargs: group
+        )
+        self.get_instance = get_qr_instance_from_post_body()(
+            lambda instance, **kwargs: instance
+        )
+
+    def test_loads_cached_plant_and_group(self):
+        # Request plant and group, confirm entries cached
+        self.assertEqual(self.get_plant(data={'plant_id': str(self.plant.uuid)}), self.plant)
+        self.assertEqual(self.get_group(data={'group_id': str(self.group.uuid)}), self.group)
+        self.assertEqual(
+            get_cached_uuid_entry(str(self.plant.uuid)),
+            {'model_type': 'plant', 'pk': self.plant.pk, 'user_id': self.user.pk}
+        )
+        self.assertEqual(
+            get_cached_uuid_entry(str(self.group.uuid)),
+            {'model_type': 'group', 'pk': self.group.pk, 'user_id': self.user.pk}
+        )
+
+        # Request again, confirm loaded with 1 query
+        with self.assertNumQueries(1):
+            plant = self.get_plant(data={'plant_id': str(self.plant.uuid)}, user=self.user)
+        self.assertEqual(plant, self.plant)
+
+        # Request group UUID as plant, confirm 404 without querying
+        with self.assertNumQueries(0):
+            response = self.get_plant(data={'plant_id': str(self.group.uuid)})
+        self.assertEqual(response.status_code, 404)
+
+    def test_rejects_other_users_instance_without_query(self):
+        # Request plant as other user, confirm rejected
+        response = self.get_plant(
+            data={'plant_id': str(self.plant.uuid)},
+            user=self.other_user
+        )
+        self.assertEqual(response.status_code, 403)
+
+        # Request again (entry now cached), confirm rejected without querying
+        with self.assertNumQueries(0):
+            response = self.get_plant(
+                data={'plant_id': str(self.plant.uuid)},
+                user=self.other_user
+            )
+            self.assertEqual(response.status_code, 403)
+            response = self.get_instance(
+                data={'uuid': str(self.plant.uuid)},
+                user=self.other_user
+            )
+            self.assertEqual(response.status_code, 403)
+
+    def test_missing_uuid_cached(self):
+        # Request missing UUID, confirm 404 and cached as missing
+        uuid = str(uuid4())
+        self.assertEqual(self.get_instance(data={'uuid': uuid}).status_code, 404)
+        self.assertIsNone(get_cached_uuid_entry(uuid)['model_type'])
+
+        # Request again, confirm 404 without querying
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_instance(data={'uuid': uuid}).status_code, 404)
+
+        # Register plant with UUID, confirm entry deleted and plant found
+        response = JSONClient().post('/register_plant', {
+            'uuid': uuid,
+            'name': 'test plant',
+            'species': None,
+            'description': None,
+            'pot_size': '4'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(get_cached_uuid_entry(uuid))
+        self.assertIsInstance(self.get_instance(data={'uuid': uuid}), Plant)
+
+    def test_change_uuid_and_delete_invalidate_entries(self):
+        # Cache plant entry, change UUID with /change_uuid endpoint
+        old_uuid = str(self.plant.uuid)
+        new_uuid = str(uuid4())
+        self.get_plant(data={'plant_id': old_uuid})
+        response = JSONClient().post('/change_uuid', {
+            'uuid': old_uuid,
+            'new_id': new_uuid
+        })
+        self.assertEqual(response.status_code, 200)
+
+        # Confirm old UUID not found, new UUID returns plant
+        self.assertEqual(self.get_plant(data={'plant_id': old_uuid}).status_code, 404)
+        self.assertEqual(self.get_plant(data={'plant_id': new_uuid}), self.plant)
+
+        # Delete plant with bulk delete endpoint, confirm entry deleted
+        response = JSONClient().post('/bulk_delete_plants_and_groups', {
+            'uuids': [new_uuid]
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(get_cached_uuid_entry(new_uuid))
+        self.assertEqual(self.get_plant(data={'plant_id': new_uuid}).status_code, 404)
+
+    def test_outdated_entry(self):
+        # Cache plant entry, change UUID outside views (entry now outdated)
+        old_uuid = str(self.plant.uuid)
+        self.get_plant(data={'plant_id': old_uuid})
+        self.plant.uuid = uuid4()
+        self.plant.save()
+
+        # Confirm old UUID not found, outdated entry deleted
+        self.assertEqual(self.get_plant(data={'plant_id': old_uuid}).status_code, 404)
+        self.assertIsNone(get_cached_uuid_entry(old_uuid))
@@ -6,7 +6,7 @@ import json
 import base64
 from uuid import uuid4
 from unittest.mock import patch
-from datetime import datetime, timezone as datetime_tz
+from datetime import datetime, timedelta, timezone as datetime_tz
 
 from django.conf import settings
 from django.test import TestCase
@@ -197,6 +197,92 @@ class OverviewTests(TestCase):
             }
         )
 
+    def test_get_overview_state_page(self):
+        # Create 5 plants and 3 groups (1 plant in group)
+        default_user = get_default_user()
+        groups = [Group.objects.create(uuid=uuid4(), user=default_user) for _ in range(3)]
+        plants = [Plant.objects.create(uuid=uuid4(), user=default_user) for _ in range(5)]
+        plants[0].group = groups[1]
+        plants[0].save()
+        expected = self.client.get('/get_overview_state').json()
+
+        # Request plants 2 at a time, confirm first page contains title
+        response = self.client.get('/get_overview_state_page?key=plants&limit=2')
+        self.assertEqual(response.status_code, 200)
+        page = response.json()
+        self.assertEqual(page['key'], 'plants')
+        self.assertEqual(page['show_archive'], False)
+        self.assertEqual(page['title'], 'Plant Overview')
+        entries = page['entries']
+
+        # Request remaining pages with returned cursor until last page
+        pages = 1
+        while page['next_cursor']:
+            response = self.client.get(
+                f'/get_overview_state_page?key=plants&limit=2&cursor={page["next_cursor"]}'
+            )
+            page = response.json()
+            self.assertNotIn('title', page)
+            entries.update(page['entries'])
+            pages += 1
+
+        # Confirm received all plants in same order as overview state
+        self.assertEqual(pages, 3)
+        self.assertEqual(entries, expected['plants'])
+        self.assertEqual(list(entries), list(expected['plants']))
+
+        # Request all groups in 1 page, confirm same as overview state
+        response = self.client.get('/get_overview_state_page?key=groups')
+        self.assertEqual(response.json()['entries'], expected['groups'])
+        self.assertIsNone(response.json()['next_cursor'])
+
+    def test_get_overview_state_page_invalid_params(self):
+        # Confirm returns error if key, limit, or cursor are invalid
+        for params, error in [
+            ('key=photos', 'key must be plants or groups'),
+            ('limit=ten', 'limit must be an integer'),
+            ('limit=0', 'limit must be between 1 and 2000'),
+            ('limit=2001', 'limit must be between 1 and 2000'),
+            ('cursor=foo', 'invalid cursor'),
+            ('cursor=99999999999999999999_1', 'invalid cursor'),
+        ]:
+            response = self.client.get(f'/get_overview_state_page?{params}')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {'error': error})
+
+    def test_stream_overview_state(self):
+        # Create 5 plants and 3 groups (1 plant in group)
+        default_user = get_default_user()
+        groups = [Group.objects.create(uuid=uuid4(), user=default_user) for _ in range(3)]
+        plants = [Plant.objects.create(uuid=uuid4(), user=default_user) for _ in range(5)]
+        plants[0].group = groups[1]
+        plants[0].save()
+        Plant.objects.create(uuid=uuid4(), user=default_user, archived=True)
+        expected = self.client.get('/get_overview_state').json()
+
+        # Request streamed state (2 entries per chunk), confirm same as state
+        # returned by /get_overview_state (including order)
+        with patch('plant_tracker.get_state_views.OVERVIEW_STREAM_CHUNK_SIZE', 2):
+            response = self.client.get('/stream_overview_state')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            state = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(state, expected)
+        self.assertEqual(list(state['plants']), list(expected['plants']))
+        self.assertTrue(state['show_archive'])
+
+    def test_stream_overview_state_no_database_entries(self):
+        response = self.client.get('/stream_overview_state')
+        self.assertEqual(
+            json.loads(b''.join(response.streaming_content)),
+            {
+                'plants': {},
+                'groups': {},
+                'show_archive': False,
+                'title': 'Plant Overview'
+            }
+        )
+
     def test_get_qr_codes(self):
         # Mock URL_PREFIX env var
         settings.URL_PREFIX = 'https://mysite.com/manage/'
@@ -1127,6 +1213,230 @@ class ManagePageTests(TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.json(), {'Error': 'Requires valid UUID'})
 
+    def test_manage_plant_history_window(self):
+        # Create water events and notes 10 days ago and 2 years ago
+        recent = timezone.now().replace(microsecond=0) - timedelta(days=10)
+        old = recent - timedelta(days=730)
+        WaterEvent.objects.create(plant=self.plant1, timestamp=recent)
+        WaterEvent.objects.create(plant=self.plant1, timestamp=old)
+        NoteEvent.objects.create(plant=self.plant1, timestamp=recent, text='recent')
+        NoteEvent.objects.create(plant=self.plant1, timestamp=old, text='old')
+
+        # Request state with 365 day history window
+        response = self.client.get_json(
+            f'/get_manage_state/{self.plant1.uuid}?history_days=365'
+        )
+        self.assertEqual(response.status_code, 200)
+        state = response.json()['state']
+
+        # Confirm only contains event and note from last 365 days
+        self.assertEqual(state['events']['water'], [recent.isoformat()])
+        self.assertEqual(state['notes'], {recent.isoformat(): 'recent'})
+
+        # Confirm history key contains start of window and per-year counts
+        self.assertTrue(state['history']['start'] < recent.isoformat())
+        self.assertTrue(state['history']['start'] > old.isoformat())
+        self.assertEqual(
+            state['history']['counts'][str(old.year)],
+            {'water': 1, 'fertilize': 0, 'prune': 0, 'repot': 0, 'notes': 1}
+        )
+        self.assertEqual(
+            state['history']['counts'][str(recent.year)],
+            {'water': 1, 'fertilize': 0, 'prune': 0, 'repot': 0, 'notes': 1}
+        )
+
+        # Request state without history_days, confirm contains full history
+        response = self.client.get_json(f'/get_manage_state/{self.plant1.uuid}')
+        state = response.json()['state']
+        self.assertEqual(
+            state['events']['water'],
+            [recent.isoformat(), old.isoformat()]
+        )
+        self.assertEqual(len(state['notes']), 2)
+        self.assertNotIn('history', state)
+
+    def test_manage_plant_history_window_invalid(self):
+        # Request state with non-integer history_days, confirm error
+        response = self.client.get_json(
+            f'/get_manage_state/{self.plant1.uuid}?history_days=year'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'history_days must be an integer'})
+
+        # Request state with negative history_days, confirm error
+        response = self.client.get_json(
+            f'/get_manage_state/{self.plant1.uuid}?history_days=-1'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_plant_history(self):
+        # Create events and notes in 2023 and 2024
+        for timestamp in ('2023-06-01T12:00:00+00:00', '2024-06-01T12:00:00+00:00'):
+            WaterEvent.objects.create(
+                plant=self.plant1,
+                timestamp=datetime.fromisoformat(timestamp)
+            )
+            RepotEvent.objects.create(
+                plant=self.plant1,
+                timestamp=datetime.fromisoformat(timestamp)
+            )
+            NoteEvent.objects.create(
+                plant=self.plant1,
+                timestamp=datetime.fromisoformat(timestamp),
+                text=f'note {timestamp[:4]}'
+            )
+
+        # Request history for 2023 (no timezone, should be treated as UTC)
+        response = self.client.get_json(
+            f'/get_plant_history/{self.plant1.uuid}'
+            '?start=2023-01-01T00:00:00&end=2024-01-01T00:00:00'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'events': {
+                'water': ['2023-06-01T12:00:00+00:00'],
+                'fertilize': [],
+                'prune': [],
+                'repot': ['2023-06-01T12:00:00+00:00']
+            },
+            'notes': {'2023-06-01T12:00:00+00:00': 'note 2023'},
+            'start': '2023-01-01T00:00:00+00:00',
+            'end': '2024-01-01T00:00:00+00:00'
+        })
+
+        # Request history without end, confirm contains both years
+        response = self.client.get_json(
+            f'/get_plant_history/{self.plant1.uuid}?start=2023-01-01T00:00:00Z'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['events']['water'],
+            ['2024-06-01T12:00:00+00:00', '2023-06-01T12:00:00+00:00']
+        )
+        self.assertEqual(len(response.json()['notes']), 2)
+
+    def test_get_plant_history_errors(self):
+        # Request without start, confirm error
+        response = self.client.get_json(f'/get_plant_history/{self.plant1.uuid}')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'start is required'})
+
+        # Request with invalid timestamp, confirm error
+        response = self.client.get_json(
+            f'/get_plant_history/{self.plant1.uuid}?start=yesterday'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {'error': 'start and end must be ISO timestamps'}
+        )
+
+        # Request with start after end, confirm error
+        response = self.client.get_json(
+            f'/get_plant_history/{self.plant1.uuid}'
+            '?start=2024-01-01T00:00:00&end=2023-01-01T00:00:00'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'start must be before end'})
+
+        # Request with invalid UUID, confirm error
+        response = self.client.get_json('/get_plant_history/plant1?start=2024-01-01')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'Error': 'Requires valid UUID'})
+
+        # Request with group UUID, confirm error
+        response = self.client.get_json(
+            f'/get_plant_history/{self.group1.uuid}?start=2024-01-01'
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'error': 'plant not found'})
+
+    def test_manage_plant_photo_limit(self):
+        # Create 5 photos with different timestamps
+        photos = [
+            Photo.objects.create(
+                photo=create_mock_photo(f'2024:03:2{day} 10:52:03', f'photo{day}.jpg'),
+                plant=self.plant1
+            )
+            for day in range(1, 6)
+        ]
+
+        # Request state with photo_limit, confirm only contains 2 newest photos
+        response = self.client.get_json(
+            f'/get_manage_state/{self.plant1.uuid}?photo_limit=2'
+        )
+        self.assertEqual(response.status_code, 200)
+        state = response.json()['state']
+        self.assertEqual(
+            list(state['photos'].keys()),
+            [str(photos[4].pk), str(photos[3].pk)]
+        )
+        self.assertEqual(state['photo_count'], 5)
+        self.assertIsNotNone(state['photos_next_cursor'])
+
+        # Request next page with cursor from state, confirm next 2 photos
+        response = self.client.get_json(
+            f'/get_plant_photos/{self.plant1.uuid}'
+            f'?cursor={state["photos_next_cursor"]}&limit=2'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.json()['photos'].keys()),
+            [str(photos[2].pk), str(photos[1].pk)]
+        )
+        self.assertEqual(
+            response.json()['photos'][str(photos[2].pk)],
+            photos[2].get_details()
+        )
+
+        # Request last page, confirm contains oldest photo and no next_cursor
+        response = self.client.get_json(
+            f'/get_plant_photos/{self.plant1.uuid}'
+            f'?cursor={response.json()["next_cursor"]}&limit=2'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.json()['photos'].keys()), [str(photos[0].pk)])
+        self.assertIsNone(response.json()['next_cursor'])
+
+        # Request state with limit higher than number of photos, confirm
+        # contains all photos and no cursor
+        response = self.client.get_json(
+            f'/get_manage_state/{self.plant1.uuid}?photo_limit=10'
+        )
+        state = response.json()['state']
+        self.assertEqual(len(state['photos']), 5)
+        self.assertIsNone(state['photos_next_cursor'])
+
+    def test_get_plant_photos_errors(self):
+        # Request with invalid limit, confirm error
+        response = self.client.get_json(
+            f'/get_plant_photos/{self.plant1.uuid}?limit=0'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {'error': 'limit must be between 1 and 500'}
+        )
+
+        # Request with invalid cursor, confirm error
+        response = self.client.get_json(
+            f'/get_plant_photos/{self.plant1.uuid}?cursor=invalid'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'invalid cursor'})
+
+        # Request with group UUID, confirm error
+        response = self.client.get_json(f'/get_plant_photos/{self.group1.uuid}')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'error': 'plant not found'})
+
+        # Request state with invalid photo_limit, confirm error
+        response = self.client.get_json(
+            f'/get_manage_state/{self.plant1.uuid}?photo_limit=all'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'photo_limit must be an integer'})
+
     def test_manage_group_with_no_plants(self):
         # Request management page for test group, confirm status
         response = self.client.get(f'/manage/{self.group1.uuid}')
@@ -2864,3 +3174,54 @@ class PlantPhotoEndpointTests(TestCase):
         self.assertEqual(response.json(), {"error": "unable to find photo"})
         self.plant.refresh_from_db()
         self.assertIsNone(self.plant.default_photo)
+
+
+class DatabaseConnectionStatsTests(TestCase):
+    def setUp(self):
+        # Disable SINGLE_USER_MODE (default user is not staff)
+        settings.SINGLE_USER_MODE = False
+
+    def tearDown(self):
+        # Revert back to SINGLE_USER_MODE
+        settings.SINGLE_USER_MODE = True
+
+    def test_get_database_connection_stats(self):
+        # Request stats without logging in, confirm error
+        response = self.client.get(
+            '/get_database_connection_stats',
+            HTTP_ACCEPT='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {'error': 'authentication required'})
+
+        # Log in with non-staff account, confirm error
+        user = get_user_model().objects.create_user(username='unittest', password='12345')
+        self.client.login(username='unittest', password='12345')
+        response = self.client.get('/get_database_connection_stats')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'error': 'staff account required'})
+
+        # Make account staff, send POST request, confirm error
+        user.is_staff = True
+        user.save()
+        response = self.client.post('/get_database_connection_stats')
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response.json(), {'error': 'must send GET request'})
+
+        # Request stats twice
+        first = self.client.get('/get_database_connection_stats').json()
+        second = self.client.get('/get_database_connection_stats').json()
+
+        # Confirm reports this process, default settings, no pool
+        self.assertEqual(second['pid'], os.getpid())
+        self.assertEqual(second['connection_mode'], 'none')
+        self.assertFalse(second['pgbouncer'])
+        self.assertIsNone(second['pool'])
+        # Confirm counted request that finished between responses
+        self.assertEqual(second['requests'], first['requests'] + 1)
+
+        # Log out, enable SINGLE_USER_MODE, confirm default user is rejected
+        self.client.logout()
+        settings.SINGLE_USER_MODE = True
+        response = self.client.get('/get_database_connection_stats')
+        self.assertEqual(response.status_code, 403)
@@ -17,9 +17,14 @@ urlpatterns = [
 
     # SPA state endpoints
     path('get_overview_state', get_state_views.get_overview_page_state, name='get_overview_state'),
+    path('get_overview_state_changes', get_state_views.get_overview_state_changes, name='get_overview_state_changes'),
+    path('get_overview_state_page', get_state_views.get_overview_state_page, name='get_overview_state_page'),
+    path('stream_overview_state', get_state_views.stream_overview_state, name='stream_overview_state'),
     path('get_archived_overview_state', get_state_views.get_archived_overview_state, name='get_archived_overview_state'),
     path('get_user_details', auth_views.get_user_details, name='get_user_details'),
     path('get_manage_state/<str:uuid>', get_state_views.get_manage_state, name='get_manage_state'),
+    path('get_plant_history/<str:uuid>', get_state_views.get_plant_history, name='get_plant_history'),
+    path('get_plant_photos/<str:uuid>', get_state_views.get_plant_photos, name='get_plant_photos'),
     path('get_plant_options', get_state_views.get_plant_options, name='get_plant_options'),
     path('get_plant_species_options', get_state_views.get_plant_species_options, name='get_plant_species_options'),
     path('get_add_to_group_options', get_state_views.get_add_to_group_options, name='get_add_to_group_options'),
@@ -61,5 +66,8 @@ urlpatterns = [
     path('add_plant_photos', views.add_plant_photos, name='add_plant_photos'),
     path('get_photo_upload_status', views.get_photo_upload_status, name='get_photo_upload_status'),
     path('delete_plant_photos', views.delete_plant_photos, name='delete_plant_photos'),
-    path('set_plant_default_photo', views.set_plant_default_photo, name='set_plant_default_photo')
+    path('set_plant_default_photo', views.set_plant_default_photo, name='set_plant_default_photo'),
+
+    # Monitoring endpoints
+    path('get_database_connection_stats', views.get_database_connection_stats, name='get_database_connection_stats')
 ]
@@ -0,0 +1,102 @@
+'''Read-through cache mapping Plant and Group UUIDs to model type, primary key,
+and owner.
+
+The view decorators use cached entries to reject UUIDs that are missing, are
+the wrong model type, or are owned by a different user without querying the
+database, and to load the requested instance by primary key. Entries are read
+from the UUID registry table (see models/uuid.py) or from the instance loaded
+by the decorator when not cached.
+
+UUIDs that do not exist are cached for a short time (MISSING_UUID_TIMEOUT) so
+repeated requests for an unregistered QR code don't query the database.
+
+Entries only change when a plant or group is registered, deleted, or its UUID
+changes, so the views that do this delete the affected entries after the
+database is updated (register_plant, register_group, change_uuid,
+bulk_delete_plants_and_groups). All entries are deleted when the server starts
+in case the database was modified offline. Entries still expire after
+UUID_CACHE_TIMEOUT (changes made outside the views, eg the admin site).
+'''
+
+from django.db import models
+from django.core.cache import cache
+
+from .models import UUID
+
+# Seconds before cached UUID entries expire
+UUID_CACHE_TIMEOUT = 60 * 60
+
+# Seconds before cached entries for UUIDs that do not exist expire
+MISSING_UUID_TIMEOUT = 60
+
+
+def get_uuid_cache_key(uuid):
+    '''Takes UUID object, returns name of cached UUID entry key.'''
+    return f'uuid_lookup_{uuid}'
+
+
+def parse_uuid(uuid):
+    '''Takes UUID string, returns UUID object. Raises ValidationError if the
+    string is not a valid UUID (same error as querying a UUIDField).
+    '''
+    return models.UUIDField().to_python(uuid)
+
+
+def get_cached_uuid_entry(uuid):
+    '''Takes UUID string, returns cached dict with model_type (plant, group, or
+    None if UUID does not exist), pk, and user_id keys. Returns None if UUID is
+    not cached. Raises ValidationError if the string is not a valid UUID.
+    '''
+    return cache.get(get_uuid_cache_key(parse_uuid(uuid)))
+
+
+def cache_uuid_entry(instance):
+    '''Takes Plant or Group, caches UUID entry with its type, pk, and owner.'''
+    cache.set(
+        get_uuid_cache_key(instance.uuid),
+        {
+            'model_type': instance._meta.model_name,
+            'pk': instance.pk,
+            'user_id': instance.user_id
+        },
+        UUID_CACHE_TIMEOUT
+    )
+
+
+def lookup_uuid(uuid):
+    '''Takes UUID string, returns dict with model_type (plant, group, or None
+    if UUID does not exist), pk, and user_id keys. Reads from cache if present,
+    otherwise reads UUID registry (1 primary key lookup) and caches result.
+    Raises ValidationError if the string is not a valid UUID.
+    '''
+    uuid = parse_uuid(uuid)
+    key = get_uuid_cache_key(uuid)
+    entry = cache.get(key)
+    if entry is not None:
+        return entry
+
+    row = (
+        UUID.objects
+            .filter(uuid=uuid, model_type__isnull=False)
+            .values_list('model_type', 'object_id', 'user_id')
+            .first()
+    )
+    if row is None:
+        entry = {'model_type': None, 'pk': None, 'user_id': None}
+        cache.set(key, entry, MISSING_UUID_TIMEOUT)
+    else:
+        entry = dict(zip(('model_type', 'pk', 'user_id'), row))
+        cache.set(key, entry, UUID_CACHE_TIMEOUT)
+    return entry
+
+
+def delete_cached_uuid_entries(uuids):
+    '''Takes list of UUIDs (strings or UUID objects), deletes cached entries.
+    Call after plants or groups are registered, deleted, or UUID is changed.
+    '''
+    cache.delete_many([get_uuid_cache_key(parse_uuid(uuid)) for uuid in uuids])
+
+
+def delete_all_uuid_entries():
+    '''Deletes all cached UUID entries (called when server starts).'''
+    cache.delete_pattern('uuid_lookup_*')
@@ -11,13 +11,13 @@ from datetime import datetime
 from functools import wraps, cache
 
 from django.conf import settings
-from django.db.models import Value
 from django.shortcuts import render
 from django.contrib.auth import get_user_model
 from django.http import JsonResponse, HttpResponseRedirect
 from django.core.exceptions import ValidationError
 
 from .models import (
+    UUID,
     Group,
     Plant,
     WaterEvent,
@@ -25,6 +25,13 @@ from .models import (
     PruneEvent,
     RepotEvent
 )
+from .uuid_cache import (
+    parse_uuid,
+    lookup_uuid,
+    cache_uuid_entry,
+    get_cached_uuid_entry,
+    delete_cached_uuid_entries
+)
 
 
 # Map event types to model that should be instantiated
@@ -43,25 +50,15 @@ EVENT_TYPE_OPTIONS = "'{}'".format("', '".join(options[:-1]) + "', or '" + optio
 
 
 def find_model_type(uuid):
-    '''Takes uuid, queries both Plant and Group models. Returns "plant" if
-    matches a Plant entry, "group" if matches a Group entry, or None if neither.
+    '''Takes uuid, looks up in UUID registry. Returns "plant" if matches a
+    Plant entry, "group" if matches a Group entry, or None if neither.
     '''
-    plant_queryset = (
-        Plant.objects
-        .filter(uuid=uuid)
-        .annotate(model_type=Value('plant'))
-        .values('model_type')[:1]
-    )
-    group_queryset = (
-        Group.objects
-        .filter(uuid=uuid)
-        .annotate(model_type=Value('group'))
-        .values('model_type')[:1]
+    return (
+        UUID.objects
+            .filter(uuid=uuid)
+            .values_list('model_type', flat=True)
+            .first()
     )
-    try:
-        return plant_queryset.union(group_queryset)[0]['model_type']
-    except IndexError:
-        return None
 
 
 @cache
@@ -124,6 +121,42 @@ def requires_json_post(required_keys=None):
     return decorator
 
 
+def get_instance_by_uuid(queryset, uuid, entry=None):
+    '''Takes Plant or Group queryset, UUID string, and optional cached UUID
+    entry (see uuid_cache.py). Returns matching instance, or None if not found.
+
+    Returns None without querying if entry is cached and UUID does not exist or
+    belongs to a different model. Queries by primary key if entry is cached,
+    otherwise queries by UUID and caches entry.
+    '''
+    if entry is not None:
+        if entry['model_type'] != queryset.model._meta.model_name:
+            return None
+        # Filter by UUID too in case entry is outdated (changed outside views)
+        instance = queryset.filter(pk=entry['pk'], uuid=parse_uuid(uuid)).first()
+        if instance is not None:
+            return instance
+        delete_cached_uuid_entries([uuid])
+
+    instance = queryset.filter(uuid=uuid).first()
+    if instance is not None:
+        cache_uuid_entry(instance)
+    return instance
+
+
+def is_owned_by_other_user(entry, model_type, **kwargs):
+    '''Takes cached UUID entry (or None), expected model_type, and decorator
+    kwargs. Returns True if entry is the expected model type and is owned by a
+    different user than the user kwarg (reject without querying instance).
+    '''
+    return (
+        entry is not None
+        and 'user' in kwargs
+        and entry['model_type'] == model_type
+        and entry['user_id'] != kwargs['user'].pk
+    )
+
+
 def get_plant_from_post_body(select_related=None, **kwargs):
     '''Decorator looks up plant by UUID, throws error if not found. Optional
     select_related arg can be used to query foreignkey related objects. Passes
@@ -137,10 +170,16 @@ def get_plant_from_post_body(select_related=None, **kwargs):
         @wraps(func)
         def wrapper(data, **kwargs):
             try:
-                plant = (
-                    Plant.objects
-                        .select_related(select_related)
-                        .get_by_uuid(data["plant_id"])
+                entry = get_cached_uuid_entry(data["plant_id"])
+                if is_owned_by_other_user(entry, 'plant', **kwargs):
+                    return JsonResponse(
+                        {"error": "plant is owned by a different user"},
+                        status=403
+                    )
+                plant = get_instance_by_uuid(
+                    Plant.objects.select_related(select_related),
+                    data["plant_id"],
+                    entry
                 )
                 if plant is None:
                     return JsonResponse({"error": "plant not found"}, status=404)
@@ -180,10 +219,16 @@ def get_group_from_post_body(select_related=None, **kwargs):
         @wraps(func)
         def wrapper(data, **kwargs):
             try:
-                group = (
-                    Group.objects
-                        .select_related(select_related)
-                        .get_by_uuid(data["group_id"])
+                entry = get_cached_uuid_entry(data["group_id"])
+                if is_owned_by_other_user(entry, 'group', **kwargs):
+                    return JsonResponse(
+                        {"error": "group is owned by a different user"},
+                        status=403
+                    )
+                group = get_instance_by_uuid(
+                    Group.objects.select_related(select_related),
+                    data["group_id"],
+                    entry
                 )
                 if group is None:
                     return JsonResponse({"error": "group not found"}, status=404)
@@ -217,16 +262,37 @@ model_type_map = {
 }
 
 
-def get_plant_or_group_by_uuid(uuid, annotate=False):
+def get_plant_or_group_by_uuid(uuid, annotate=False, entry=None):
     '''Returns Plant or Group instance matching UUID, or None if neither found.
     Includes overview annotations if optional annotate kwarg is True.
+
+    Looks up model type and primary key in UUID cache (reads UUID registry if
+    not cached), then queries the instance by primary key. Optional entry arg
+    skips the lookup if caller already has it (returned by lookup_uuid).
     '''
-    model_type = find_model_type(uuid)
-    if not model_type:
+    if entry is None:
+        entry = lookup_uuid(uuid)
+    if entry['model_type'] is None:
         return None
+    # Filter by UUID too in case entry is outdated (changed outside views)
+    queryset = model_type_map[entry['model_type']].objects.filter(
+        pk=entry['pk'],
+        uuid=parse_uuid(uuid)
+    )
     if annotate:
-        return model_type_map[model_type].objects.get_with_overview_annotation(uuid)
-    return model_type_map[model_type].objects.get_by_uuid(uuid)
+        queryset = queryset.with_overview_annotation()
+    instance = queryset.first()
+    if instance is None:
+        # Delete outdated entry, look up again (reads UUID registry)
+        delete_cached_uuid_entries([uuid])
+        entry = lookup_uuid(uuid)
+        if entry['model_type'] is None:
+            return None
+        queryset = model_type_map[entry['model_type']].objects.filter(pk=entry['pk'])
+        if annotate:
+            queryset = queryset.with_overview_annotation()
+        instance = queryset.first()
+    return instance
 
 
 def get_qr_instance_from_post_body(annotate=False, **kwargs):
@@ -242,7 +308,17 @@ def get_qr_instance_from_post_body(annotate=False, **kwargs):
         @wraps(func)
         def wrapper(data, **kwargs):
             try:
-                instance = get_plant_or_group_by_uuid(data["uuid"], annotate)
+                entry = lookup_uuid(data["uuid"])
+                if (
+                    'user' in kwargs
+                    and entry['model_type'] is not None
+                    and entry['user_id'] != kwargs['user'].pk
+                ):
+                    return JsonResponse(
+                        {"error": "instance is owned by a different user"},
+                        status=403
+                    )
+                instance = get_plant_or_group_by_uuid(data["uuid"], annotate, entry)
                 if instance is None:
                     return JsonResponse(
                         {"error": "uuid does not match any plant or group"},
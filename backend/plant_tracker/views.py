@@ -6,12 +6,15 @@ import json
 import base64
 from uuid import UUID
 from io import BytesIO
+from operator import or_
+from functools import reduce
 from itertools import chain
 
 from ua_parser import parse
 from django.conf import settings
 from django.shortcuts import render
 from django.http import JsonResponse
+from django.db.models import Q
 from django.db import transaction, IntegrityError
 from django.core.exceptions import ValidationError
 from django.views.decorators.csrf import ensure_csrf_cookie
@@ -23,6 +26,7 @@ from .models import (
     Group,
     Plant,
     RepotEvent,
+    PlantEvent,
     Photo,
     extract_timestamp_from_exif,
     NoteEvent,
@@ -45,8 +49,27 @@ from .get_state_views import (
     update_cached_overview_details_keys,
     add_instance_to_cached_overview_state,
     remove_instance_from_cached_overview_state,
-    update_cached_overview_state_show_archive_bool
+    update_cached_overview_state_show_archive_bool,
+    update_cached_unnamed_display_names,
+    update_cached_group_details_of_plants,
+    overview_state_batch,
+    add_event_to_cached_manage_plant_states,
+    remove_events_from_cached_manage_plant_state,
+    add_note_to_cached_manage_plant_state,
+    remove_notes_from_cached_manage_plant_state,
+    add_photos_to_cached_manage_plant_state,
+    remove_photos_from_cached_manage_plant_state,
+    add_change_event_to_cached_manage_plant_state,
+    delete_cached_manage_plant_states,
+    delete_cached_manage_plant_states_with_group,
+    update_cached_manage_group_details_keys,
+    add_plants_to_cached_manage_group_state,
+    remove_plants_from_cached_manage_group_states,
+    delete_cached_manage_group_states
 )
+from .state_versions import bump_state_versions
+from .uuid_cache import delete_cached_uuid_entries
+from .connection_stats import get_connection_stats
 from .tasks import process_photo_upload
 
 
@@ -140,6 +163,11 @@ def register_plant(user, data, **kwargs):
             with transaction.atomic():
                 RepotEvent.objects.create(plant=plant, timestamp=plant.created)
 
+        # Update versions (ETags) of states containing new plant
+        bump_state_versions(user.pk, [plant])
+        # Delete cached UUID entry (may be cached as missing)
+        delete_cached_uuid_entries([plant.uuid])
+
         # Return new plant details
         return JsonResponse(
             {
@@ -174,11 +202,14 @@ def register_group(user, data, **kwargs):
             group = Group(user=user, **data)
             group.clean_fields(exclude=['user'])
             group.save()
-            # Set annotation attributes (avoid querying for get_details params)
-            group.plant_count = 0
             # Add to cached overview state
             add_instance_to_cached_overview_state(group)
 
+        # Update versions (ETags) of states containing new group
+        bump_state_versions(user.pk, [group])
+        # Delete cached UUID entry (may be cached as missing)
+        delete_cached_uuid_entries([group.uuid])
+
         # Return new group details
         return JsonResponse(
             {
@@ -206,6 +237,7 @@ def change_uuid(request, instance, data, **kwargs):
     '''Changes UUID of an existing Plant or Group.
     Requires JSON POST with uuid (uuid) and new_id (uuid) keys.
     '''
+    old_uuid = str(instance.uuid)
     try:
         # Use transaction.atomic to prevent DetailsChangedEvent from being
         # created if new_id is a duplicate (IntegrityError at instance.save)
@@ -217,13 +249,12 @@ def change_uuid(request, instance, data, **kwargs):
             if isinstance(instance, Plant):
                 user_tz = request.headers.get("User-Timezone", "Etc/UTC")
                 changes = {'uuid': data['new_id']}
-                log_changed_details([instance], changes, user_tz=user_tz)
+                change_events = log_changed_details([instance], changes, user_tz=user_tz)
             # Change UUID
             instance.uuid = UUID(data["new_id"])
             instance.save(update_fields=["uuid"])
             # Add back to cached overview state under new UUID
             add_instance_to_cached_overview_state(instance)
-            return JsonResponse({"new_uuid": str(instance.uuid)}, status=200)
     except (ValidationError, ValueError):
         return JsonResponse({"error": "new_id key is not a valid UUID"}, status=400)
     except IntegrityError:
@@ -232,6 +263,23 @@ def change_uuid(request, instance, data, **kwargs):
             status=409
         )
 
+    # Update cached manage states containing new uuid (after commit)
+    if isinstance(instance, Plant):
+        add_change_event_to_cached_manage_plant_state(change_events[0])
+        if instance.group_id:
+            remove_plants_from_cached_manage_group_states(
+                {instance.group_id: [old_uuid]}
+            )
+            add_plants_to_cached_manage_group_state(instance.group, [instance])
+    else:
+        delete_cached_manage_plant_states_with_group(instance.user_id, [instance])
+
+    # Update versions (ETags) of states containing instance (after commit)
+    bump_state_versions(instance.user_id, [instance])
+    # Delete cached UUID entries (old UUID released, new may be cached as missing)
+    delete_cached_uuid_entries([old_uuid, instance.uuid])
+    return JsonResponse({"new_uuid": str(instance.uuid)}, status=200)
+
 
 @get_user_token
 @requires_json_post(["plant_id", "name", "species", "description", "pot_size"])
@@ -265,12 +313,9 @@ def edit_plant_details(request, user, plant, data, **kwargs):
         setattr(plant, field_name, value)
     plant.save(update_fields=['name', 'species', 'description', 'pot_size'])
 
-    # Clear cached overview state if plant was named or unnamed (need to update
-    # all sequential "Unnamed plant n" display names)
-    if unnamed_before ^ plant.is_unnamed():
-        cache.delete(f'overview_state_{user.pk}')
-    # Otherwise update edited plant details in cached overview state
-    else:
+    # Update edited plant details in cached overview state
+    renamed_unnamed = unnamed_before ^ plant.is_unnamed()
+    with overview_state_batch():
         update_cached_overview_details_keys(
             plant,
             {
@@ -281,6 +326,16 @@ def edit_plant_details(request, user, plant, data, **kwargs):
                 'description': plant.description
             }
         )
+        # If plant was named or unnamed update sequential "Unnamed plant n"
+        # display names of unnamed plants created after it
+        if renamed_unnamed:
+            update_cached_unnamed_display_names(user, Plant, plant.created, plant.pk)
+
+    # Add DetailsChangedEvent to cached manage_plant state
+    add_change_event_to_cached_manage_plant_state(change_events[0])
+
+    # Update versions (ETags) of states containing plant details
+    bump_state_versions(user.pk, [plant], display_names=renamed_unnamed)
 
     # Return DetailsChangedEvent details object used to update frontend state
     return JsonResponse(change_events[0].get_details(), status=200)
@@ -295,8 +350,9 @@ def edit_group_details(user, group, data, **kwargs):
     Requires JSON POST with group_id (uuid), name, and location (string) keys.
     '''
 
-    # Check if group was unnamed before editing
+    # Check if group was unnamed before editing, save fields used for name
     unnamed_before = group.is_unnamed()
+    name_before = (group.name, group.location)
 
     # Overwrite database params with user values
     group.name = data["name"]
@@ -309,12 +365,16 @@ def edit_group_details(user, group, data, **kwargs):
     except ValidationError as error:
         return JsonResponse({"error": error.message_dict}, status=400)
 
-    # Clear cached overview state if group was named or unnamed (need to update
-    # all sequential "Unnamed group n" display names)
-    if unnamed_before ^ group.is_unnamed():
-        cache.delete(f'overview_state_{user.pk}')
-    # Otherwise update edited group details in cached overview state
-    else:
+    # Get new group name shown in details of group's plants if it changed
+    # (unnamed groups are updated when renumbered below)
+    renamed_unnamed = unnamed_before ^ group.is_unnamed()
+    group_details = {}
+    if group.plant_count and not group.is_unnamed() and name_before != (group.name, group.location):
+        group_details[group.pk] = {'name': group.get_display_name(), 'uuid': str(group.uuid)}
+
+    # Update edited group details in cached overview state
+    renumbered = []
+    with overview_state_batch():
         update_cached_overview_details_keys(
             group,
             {
@@ -324,6 +384,25 @@ def edit_group_details(user, group, data, **kwargs):
                 'description': group.description
             }
         )
+        # If group was named or unnamed update sequential "Unnamed group n"
+        # display names of unnamed groups created after it (and group name in
+        # details of their plants)
+        if renamed_unnamed:
+            renumbered = update_cached_unnamed_display_names(
+                user, Group, group.created, group.pk, group_details
+            )
+        else:
+            update_cached_group_details_of_plants(user, group_details)
+
+    # Delete cached manage_plant states with DetailsChangedEvents containing
+    # group name (and renumbered unnamed groups)
+    if renamed_unnamed:
+        delete_cached_manage_plant_states_with_group(user.pk, [group.pk, *renumbered])
+    elif name_before != (group.name, group.location):
+        delete_cached_manage_plant_states_with_group(user.pk, [group])
+
+    # Update versions (ETags) of states containing group details
+    bump_state_versions(user.pk, [group], display_names=renamed_unnamed)
 
     # Return modified payload with new display_name
     del data["group_id"]
@@ -339,50 +418,104 @@ def bulk_delete_plants_and_groups(user, data, **kwargs):
     '''
     deleted = []
     groups_to_update = set([])
-    cache_cleared = False
 
     plants = Plant.objects.filter(user_id=user.pk, uuid__in=data["uuids"]).select_related("group")
     groups = Group.objects.filter(user_id=user.pk, uuid__in=data["uuids"])
 
-    # Clear cached overview state if unnamed plant/group is being deleted
-    # (need to update all sequential "Unnamed plant/group n" display names)
-    for instance in chain(plants, groups):
+    instances = list(chain(plants, groups))
+
+    # Get created timestamp and primary key of first deleted unnamed plant and
+    # group (unnamed entries created after are renumbered once deleted)
+    first_unnamed = {}
+    for instance in instances:
         if instance.is_unnamed():
-            cache.delete(f'overview_state_{user.pk}')
-            cache_cleared = True
-            break
+            first_unnamed[type(instance)] = min(
+                (instance.created, instance.pk),
+                first_unnamed.get(type(instance), (instance.created, instance.pk))
+            )
 
-    for instance in chain(plants, groups):
-        deleted.append(str(instance.uuid))
-        if not cache_cleared:
+    # Delete cached manage_plant states of deleted plants, and states with
+    # DetailsChangedEvents containing deleted groups
+    delete_cached_manage_plant_states([plant.pk for plant in plants])
+    if groups:
+        delete_cached_manage_plant_states_with_group(user.pk, groups)
+
+    # Delete cached manage_group states of deleted groups, remove deleted
+    # plants from cached manage_group states of their groups
+    delete_cached_manage_group_states([group.pk for group in groups])
+    plants_by_group = {}
+    for plant in plants:
+        if plant.group_id:
+            plants_by_group.setdefault(plant.group_id, []).append(str(plant.uuid))
+    remove_plants_from_cached_manage_group_states(plants_by_group)
+
+    # Write all cached overview state changes in 1 transaction at end of block
+    with overview_state_batch():
+        for instance in instances:
+            deleted.append(str(instance.uuid))
             # Remove from cached overview state
             remove_instance_from_cached_overview_state(instance)
             # Plant in group: save group (need to update number of plants)
             if instance.__class__ == Plant and instance.group:
                 groups_to_update.add(instance.group)
 
-    # Delete all plants in 1 query, all groups in 1 query
-    # Conditionals avoid unnecessary query for empty queryset
-    if plants:
-        plants.delete()
-    if groups:
-        groups.delete()
+        # Remove deleted groups from details of their plants (must query
+        # before deleting, group is set to NULL)
+        update_cached_group_details_of_plants(user, {
+            group.pk: None for group in groups if group.plant_count
+        })
 
-    # Update number of plants in groups that had plants deleted (overview state)
-    for group in groups_to_update:
-        # Avoid extra query for group user (used to get cached overview state)
-        # Already confirmed requesting user owns plant, and plant was in group
-        group.user = user
-        update_cached_overview_details_keys(
-            group,
-            {'plants': group.get_number_of_plants()}
-        )
+        # Delete all plants in 1 query, all groups in 1 query
+        # Conditionals avoid unnecessary query for empty queryset
+        if plants:
+            plants.delete()
+        if groups:
+            groups.delete()
+
+        # Update number of plants in groups that had plants deleted (overview state)
+        # Get new plant_count of all groups in 1 query (skips deleted groups)
+        plant_counts = {}
+        if groups_to_update:
+            plant_counts = dict(
+                Group.objects
+                    .filter(pk__in=[group.pk for group in groups_to_update])
+                    .values_list('pk', 'plant_count')
+            )
+        for group in groups_to_update:
+            if group.pk not in plant_counts:
+                continue
+            # Avoid extra query for group user (used to get cached overview state)
+            # Already confirmed requesting user owns plant, and plant was in group
+            group.user = user
+            group.plant_count = plant_counts[group.pk]
+            update_cached_overview_details_keys(
+                group,
+                {'plants': group.get_number_of_plants()}
+            )
 
-    # Update show_archive bool in cached overview state (remove archived
-    # overview link from dropdown if last archived plant/group deleted)
-    if not cache_cleared:
+        # Update sequential "Unnamed plant/group n" display names of unnamed
+        # plants and groups created after the first deleted unnamed entry
+        renumbered_groups = []
+        for model, (created, pk) in first_unnamed.items():
+            renumbered = update_cached_unnamed_display_names(user, model, created, pk)
+            if model is Group:
+                renumbered_groups = renumbered
+
+        # Update show_archive bool in cached overview state (remove archived
+        # overview link from dropdown if last archived plant/group deleted)
         update_cached_overview_state_show_archive_bool(user)
 
+    # Delete cached manage_plant states with DetailsChangedEvents containing
+    # renumbered unnamed groups
+    if renumbered_groups:
+        delete_cached_manage_plant_states_with_group(user.pk, renumbered_groups)
+
+    # Update versions (ETags) of states that contained deleted plants/groups
+    bump_state_versions(user.pk, instances, display_names=bool(first_unnamed))
+    # Delete cached UUID entries of deleted plants/groups
+    if deleted:
+        delete_cached_uuid_entries(deleted)
+
     return JsonResponse(
         {"deleted": deleted, "failed": list(set(data["uuids"]) - set(deleted))},
         status=200 if deleted else 400
@@ -404,20 +537,33 @@ def bulk_archive_plants_and_groups(request, user, data, **kwargs):
     # Update archived_after in DetailsChangedEvents for each plant
     user_tz = request.headers.get("User-Timezone", "Etc/UTC")
     log_changed_details(plants, {'archived': data["archived"]}, user_tz=user_tz)
+    # Delete cached manage_plant states (rebuilt with new DetailsChangedEvents)
+    delete_cached_manage_plant_states([plant.pk for plant in plants])
+
+    # Write all cached overview state changes in 1 transaction at end of block
+    with overview_state_batch():
+        # Update archived bool for each plant and group
+        for instance in chain(plants, groups):
+            archived.append(str(instance.uuid))
+            instance.archived = data["archived"]
+            # Move between cached overview and archived overview states
+            add_instance_to_cached_overview_state(instance)
+            # Update archived bool in cached manage_group state (if in group)
+            if isinstance(instance, Plant):
+                update_cached_manage_group_details_keys(
+                    instance,
+                    {'archived': instance.archived}
+                )
 
-    # Update archived bool for each plant and group
-    for instance in chain(plants, groups):
-        archived.append(str(instance.uuid))
-        instance.archived = data["archived"]
-        # Add to cached overview state if un-archived, remove if archived
-        add_instance_to_cached_overview_state(instance)
+        # Update all plants in 1 query, all groups in 1 query
+        Plant.objects.bulk_update(plants, ["archived"])
+        Group.objects.bulk_update(groups, ["archived"])
 
-    # Update all plants in 1 query, all groups in 1 query
-    Plant.objects.bulk_update(plants, ["archived"])
-    Group.objects.bulk_update(groups, ["archived"])
+        # Update show_archive bool in cached overview state
+        update_cached_overview_state_show_archive_bool(user)
 
-    # Update show_archive bool in cached overview state
-    update_cached_overview_state_show_archive_bool(user)
+    # Update versions (ETags) of states containing archived plants/groups
+    bump_state_versions(user.pk, chain(plants, groups))
 
     return JsonResponse(
         {"archived": archived, "failed": list(set(data["uuids"]) - set(archived))},
@@ -460,6 +606,16 @@ def add_plant_event(plant, timestamp, event_type, **kwargs):
                     {'last_fertilized': last_fertilized}
                 )
 
+        # Add event to cached manage_plant state
+        add_event_to_cached_manage_plant_states([plant], event_type, event.timestamp)
+
+        # Update versions (ETags) of states containing plant events
+        bump_state_versions(
+            plant.user_id,
+            [plant],
+            overview=event_type in ('water', 'fertilize')
+        )
+
         return JsonResponse(
             {
                 "action": event_type,
@@ -505,23 +661,35 @@ def bulk_add_plant_events(user, timestamp, event_type, data, **kwargs):
         ignore_conflicts = True
     )
 
-    # Update last_watered if timestamp is newer than annotation
-    if event_type == 'water':
-        for plant in plants:
-            if not plant.last_watered_time or timestamp > plant.last_watered_time:
-                update_cached_overview_details_keys(
-                    plant,
-                    {'last_watered': timestamp.isoformat()}
-                )
-
-    # Update last_fertilized if timestamp is newer than annotation
-    if event_type == 'fertilize':
-        for plant in plants:
-            if not plant.last_fertilized_time or timestamp > plant.last_fertilized_time:
-                update_cached_overview_details_keys(
-                    plant,
-                    {'last_fertilized': timestamp.isoformat()}
-                )
+    # Write all cached overview state changes in 1 transaction at end of block
+    with overview_state_batch():
+        # Update last_watered if timestamp is newer than annotation
+        if event_type == 'water':
+            for plant in plants:
+                if not plant.last_watered_time or timestamp > plant.last_watered_time:
+                    update_cached_overview_details_keys(
+                        plant,
+                        {'last_watered': timestamp.isoformat()}
+                    )
+
+        # Update last_fertilized if timestamp is newer than annotation
+        if event_type == 'fertilize':
+            for plant in plants:
+                if not plant.last_fertilized_time or timestamp > plant.last_fertilized_time:
+                    update_cached_overview_details_keys(
+                        plant,
+                        {'last_fertilized': timestamp.isoformat()}
+                    )
+
+    # Add events to cached manage_plant states (1 transaction for all plants)
+    add_event_to_cached_manage_plant_states(plants, event_type, timestamp)
+
+    # Update versions (ETags) of states containing plant events
+    bump_state_versions(
+        user.pk,
+        plants,
+        overview=event_type in ('water', 'fertilize')
+    )
 
     # Return 200 if at least 1 succeeded, otherwise return error
     return JsonResponse(
@@ -544,21 +712,20 @@ def delete_plant_events(plant, data, **kwargs):
     The events dict must contain event type keys, list of timestamps as values.
     '''
 
-    # Convert payload events key to mapping dict with type keys, queryset values
-    querysets_by_type = {
-        event_type: events_map[event_type].objects.filter(
-            plant=plant,
-            timestamp__in=timestamps
-        )
+    # Convert payload events key to filter matching requested timestamps of
+    # each type (queries partitioned table containing all event types)
+    events_filter = [
+        Q(type=event_type, timestamp__in=timestamps)
         for event_type, timestamps in data['events'].items()
-    }
+    ]
 
-    # Append each event in queryset to deleted list, delete whole queryset
+    # Append each event in queryset to deleted list, delete all types in 1 query
     deleted = {key: [] for key in events_map}
-    for event_type, queryset in querysets_by_type.items():
-        for event in queryset:
-            deleted[event_type].append(event.timestamp.isoformat())
-        queryset.delete()
+    if events_filter:
+        events = PlantEvent.objects.filter(reduce(or_, events_filter), plant=plant)
+        for event_type, timestamp in events.values_list('type', 'timestamp'):
+            deleted[event_type].append(timestamp.isoformat())
+        events.delete()
 
     # Get events that were not found in database
     failed = {
@@ -583,6 +750,16 @@ def delete_plant_events(plant, data, **kwargs):
             {'last_fertilized': plant.last_fertilized()}
         )
 
+    # Update cached manage_plant state and versions (ETags) of states
+    # containing plant events
+    if any(deleted.values()):
+        remove_events_from_cached_manage_plant_state(plant, deleted)
+        bump_state_versions(
+            plant.user_id,
+            [plant],
+            overview=bool(deleted['water'] or deleted['fertilize'])
+        )
+
     return JsonResponse(
         {"deleted": deleted, "failed": failed},
         status=200 if any(deleted.values()) else 400
@@ -608,6 +785,8 @@ def add_plant_note(plant, timestamp, data, **kwargs):
             )
             note.clean_fields(exclude=['plant'])
             note.save()
+        add_note_to_cached_manage_plant_state(note)
+        bump_state_versions(plant.user_id, [plant], overview=False)
         return JsonResponse(
             {
                 "action": "add_note",
@@ -645,6 +824,8 @@ def edit_plant_note(plant, timestamp, data, **kwargs):
             note.text = data["note_text"]
             note.clean_fields(exclude=['plant'])
             note.save()
+        add_note_to_cached_manage_plant_state(note)
+        bump_state_versions(plant.user_id, [plant], overview=False)
         return JsonResponse(
             {
                 "action": "edit_note",
@@ -677,6 +858,9 @@ def delete_plant_notes(plant, data, **kwargs):
 
     # Delete all found NoteEvents
     notes.delete()
+    if deleted:
+        remove_notes_from_cached_manage_plant_state(plant, deleted)
+        bump_state_versions(plant.user_id, [plant], overview=False)
 
     return JsonResponse(
         {"deleted": deleted, "failed": failed},
@@ -694,11 +878,27 @@ def add_plant_to_group(request, plant, group, **kwargs):
     '''
     user_tz = request.headers.get("User-Timezone", "Etc/UTC")
     change_events = log_changed_details([plant], {'group': group}, user_tz=user_tz)
+    old_group_id = plant.group_id
     plant.group = group
     plant.save(update_fields=["group"])
+    # Get number of plants updated by trigger when plant was saved
+    group.refresh_plant_count()
     # Update cached overview state
     update_cached_overview_details_keys(plant, {'group': plant.get_group_details()})
     update_cached_overview_details_keys(group, {'plants': group.get_number_of_plants()})
+    add_change_event_to_cached_manage_plant_state(change_events[0])
+    # Move plant details to new group's cached manage_group state
+    if old_group_id:
+        remove_plants_from_cached_manage_group_states(
+            {old_group_id: [str(plant.uuid)]}
+        )
+    add_plants_to_cached_manage_group_state(group, [plant])
+    # Update versions (ETags) of plant and group states
+    bump_state_versions(
+        plant.user_id,
+        [plant],
+        old_group_pks=[old_group_id] if old_group_id else []
+    )
 
     return JsonResponse(
         {
@@ -728,6 +928,8 @@ def remove_plant_from_group(request, plant, **kwargs):
     change_events = log_changed_details([plant], {'group': None}, user_tz=user_tz)
     plant.group = None
     plant.save(update_fields=["group"])
+    # Get number of plants updated by trigger when plant was saved
+    old_group.refresh_plant_count()
 
     # Update cached overview state
     update_cached_overview_details_keys(plant, {'group': None})
@@ -735,6 +937,12 @@ def remove_plant_from_group(request, plant, **kwargs):
         old_group,
         {'plants': old_group.get_number_of_plants()}
     )
+    add_change_event_to_cached_manage_plant_state(change_events[0])
+    remove_plants_from_cached_manage_group_states(
+        {old_group.pk: [str(plant.uuid)]}
+    )
+    # Update versions (ETags) of plant and group states
+    bump_state_versions(plant.user_id, [plant, old_group])
 
     return JsonResponse(
         {
@@ -767,17 +975,36 @@ def bulk_add_plants_to_group(request, user, group, data, **kwargs):
     # Update group_after in DetailsChangedEvents for each plant
     user_tz = request.headers.get("User-Timezone", "Etc/UTC")
     log_changed_details(plants, {'group': group}, user_tz=user_tz)
+    # Delete cached manage_plant states (rebuilt with new DetailsChangedEvents)
+    delete_cached_manage_plant_states([plant.pk for plant in plants])
 
     added = []
+    old_group_ids = set(plant.group_id for plant in plants if plant.group_id)
+    # Remove plants from cached manage_group states of groups they were in
+    plants_by_group = {}
     for plant in plants:
-        plant.group = group
-        added.append(plant.get_details())
-        # Add group details to plant details in cached overview state
-        update_cached_overview_details_keys(plant, {'group': plant.get_group_details()})
-    Plant.objects.bulk_update(plants, ['group'])
+        if plant.group_id and plant.group_id != group.pk:
+            plants_by_group.setdefault(plant.group_id, []).append(str(plant.uuid))
+    # Write all cached overview state changes in 1 transaction at end of block
+    with overview_state_batch():
+        for plant in plants:
+            plant.group = group
+            added.append(plant.get_details())
+            # Add group details to plant details in cached overview state
+            update_cached_overview_details_keys(plant, {'group': plant.get_group_details()})
+        Plant.objects.bulk_update(plants, ['group'])
 
-    # Update number of plants in group in cached overview state
-    update_cached_overview_details_keys(group, {'plants': group.get_number_of_plants()})
+        # Update number of plants in group in cached overview state (get count
+        # updated by trigger when plants were saved)
+        group.refresh_plant_count()
+        update_cached_overview_details_keys(group, {'plants': group.get_number_of_plants()})
+
+        # Move plant details to group's cached manage_group state
+        remove_plants_from_cached_manage_group_states(plants_by_group)
+        add_plants_to_cached_manage_group_state(group, plants)
+
+    # Update versions (ETags) of plant and group states
+    bump_state_versions(user.pk, plants, old_group_pks=old_group_ids)
 
     return JsonResponse({"added": added, "failed": failed}, status=200)
 
@@ -804,17 +1031,32 @@ def bulk_remove_plants_from_group(request, user, data, group, **kwargs):
     # Update group_after in DetailsChangedEvents for each plant
     user_tz = request.headers.get("User-Timezone", "Etc/UTC")
     log_changed_details(plants, {'group': None}, user_tz=user_tz)
+    # Delete cached manage_plant states (rebuilt with new DetailsChangedEvents)
+    delete_cached_manage_plant_states([plant.pk for plant in plants])
 
     removed = []
+    # Remove plants from cached manage_group states of groups they were in
+    plants_by_group = {}
     for plant in plants:
-        plant.group = None
-        removed.append(plant.get_details())
-        # Clear group details in plant details in cached overview state
-        update_cached_overview_details_keys(plant, {'group': None})
-    Plant.objects.bulk_update(plants, ['group'])
+        if plant.group_id:
+            plants_by_group.setdefault(plant.group_id, []).append(str(plant.uuid))
+    # Write all cached overview state changes in 1 transaction at end of block
+    with overview_state_batch():
+        remove_plants_from_cached_manage_group_states(plants_by_group)
+        for plant in plants:
+            plant.group = None
+            removed.append(plant.get_details())
+            # Clear group details in plant details in cached overview state
+            update_cached_overview_details_keys(plant, {'group': None})
+        Plant.objects.bulk_update(plants, ['group'])
 
-    # Update number of plants in group in cached overview state
-    update_cached_overview_details_keys(group, {'plants': group.get_number_of_plants()})
+        # Update number of plants in group in cached overview state (get count
+        # updated by trigger when plants were saved)
+        group.refresh_plant_count()
+        update_cached_overview_details_keys(group, {'plants': group.get_number_of_plants()})
+
+    # Update versions (ETags) of plant and group states
+    bump_state_versions(user.pk, [*plants, group])
 
     return JsonResponse({"removed": removed, "failed": failed}, status=200)
 
@@ -835,7 +1077,9 @@ def repot_plant(request, plant, timestamp, data, **kwargs):
             RepotEvent.objects.create(plant=plant, timestamp=timestamp)
         change_event_details = None
         # If pot size changed update plant.pot_size and DetailsChangedEvent
-        if data["new_pot_size"] and plant.pot_size != int(data["new_pot_size"]):
+        new_pot_size = data["new_pot_size"]
+        pot_size_changed = bool(new_pot_size) and plant.pot_size != int(new_pot_size)
+        if pot_size_changed:
             change_events = log_changed_details(
                 [plant],
                 {'pot_size': int(data["new_pot_size"])},
@@ -846,6 +1090,9 @@ def repot_plant(request, plant, timestamp, data, **kwargs):
             plant.pot_size = data["new_pot_size"]
             plant.save(update_fields=["pot_size"])
             update_cached_overview_details_keys(plant, {'pot_size': plant.pot_size})
+            add_change_event_to_cached_manage_plant_state(change_events[0])
+        add_event_to_cached_manage_plant_states([plant], 'repot', timestamp)
+        bump_state_versions(plant.user_id, [plant], overview=pot_size_changed)
         return JsonResponse(
             {
                 "action": "repot",
@@ -880,6 +1127,7 @@ def divide_plant(plant, timestamp, **kwargs):
                 plant=plant,
                 timestamp=timestamp
             )
+        bump_state_versions(plant.user_id, [plant], overview=False)
         return JsonResponse(
             {
                 "action": "divide",
@@ -944,6 +1192,10 @@ def add_plant_photos(request, user):
 
     # Instantiate model for each valid file
     Photo.objects.bulk_create(created)
+    # Add pending photos to cached manage_plant state (before queuing tasks,
+    # which overwrite with final details when thumbnails are generated)
+    if created:
+        add_photos_to_cached_manage_plant_state(plant, created)
     # Queue celery tasks to generate thumbnails for each valid file
     # Cache key will be overwritten by task when complete
     for photo in created:
@@ -953,6 +1205,8 @@ def add_plant_photos(request, user):
             None
         )
         process_photo_upload.delay(photo.pk)
+    if created:
+        bump_state_versions(user.pk, [plant], overview=False)
 
     # Return list of new photo URLs (added to frontend state)
     return JsonResponse(
@@ -1044,6 +1298,12 @@ def delete_plant_photos(plant, data, **kwargs):
             {'thumbnail': plant.get_thumbnail_url()}
         )
 
+    # Update cached manage_plant state and versions (ETags) of states
+    # containing photos or thumbnail
+    if deleted:
+        remove_photos_from_cached_manage_plant_state(plant, deleted)
+        bump_state_versions(plant.user_id, [plant])
+
     return JsonResponse(
         {"deleted": deleted, "failed": failed},
         status=200 if deleted else 400
@@ -1066,9 +1326,23 @@ def set_plant_default_photo(plant, data, **kwargs):
             plant,
             {'thumbnail': plant.get_thumbnail_url()}
         )
+        bump_state_versions(plant.user_id, [plant])
     except Photo.DoesNotExist:
         return JsonResponse({"error": "unable to find photo"}, status=404)
     return JsonResponse(
         {"default_photo": plant.get_default_photo_details()},
         status=200
     )
+
+
+@get_user_token
+def get_database_connection_stats(request, user):
+    '''Returns database connection statistics for the worker process that
+    handled the request (see connection_stats.py). Requires GET request from
+    staff account.
+    '''
+    if request.method != "GET":
+        return JsonResponse({'error': 'must send GET request'}, status=405)
+    if not user.is_staff:
+        return JsonResponse({'error': 'staff account required'}, status=403)
+    return JsonResponse(get_connection_stats(), status=200)
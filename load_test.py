@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+'''Load test script used to measure add_plant_event latency percentiles.
+
+Each thread registers a plant, then posts water events with unique timestamps
+as fast as possible. Prints p50/p90/p99 latency and throughput when finished.
+
+Used to compare DATABASE_CONNECTION_MODE settings: restart the server with each
+mode and run the same command against it, eg:
+
+    python3 load_test.py --url http://localhost:8005/ --threads 8 --requests 2000
+
+Requires SINGLE_USER_MODE (requests are not logged in).
+'''
+
+import time
+import argparse
+import statistics
+import urllib.parse
+from uuid import uuid4
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def get_session(url):
+    '''Takes instance URL, returns session with CSRF token header set.'''
+    session = requests.session()
+    session.get(url, timeout=5)
+    session.headers['X-CSRFToken'] = session.cookies['csrftoken']
+    return session
+
+
+def register_plant(session, url):
+    '''Takes session and instance URL, registers plant and returns UUID.'''
+    uuid = str(uuid4())
+    response = session.post(
+        urllib.parse.urljoin(url, '/register_plant'),
+        json={
+            'uuid': uuid,
+            'name': 'load test plant',
+            'species': '',
+            'description': '',
+            'pot_size': ''
+        },
+        timeout=5
+    )
+    response.raise_for_status()
+    return uuid
+
+
+def delete_plant(session, url, uuid):
+    '''Takes session, instance URL, and UUID, deletes plant.'''
+    session.post(
+        urllib.parse.urljoin(url, '/bulk_delete_plants_and_groups'),
+        json={'uuids': [uuid]},
+        timeout=5
+    )
+
+
+def post_events(url, count):
+    '''Takes instance URL and number of requests, registers a plant and posts
+    that many water events. Deletes plant and returns list of latencies (ms).
+    '''
+    session = get_session(url)
+    uuid = register_plant(session, url)
+    endpoint = urllib.parse.urljoin(url, '/add_plant_event')
+    start_timestamp = datetime.now()
+
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        response = session.post(
+            endpoint,
+            json={
+                'plant_id': uuid,
+                'event_type': 'water',
+                'timestamp': (start_timestamp - timedelta(minutes=i)).isoformat()
+            },
+            timeout=5
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+
+    delete_plant(session, url, uuid)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--url', default='http://localhost:8005/')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000, help='total requests')
+    args = parser.parse_args()
+
+    per_thread = args.requests // args.threads
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        results = executor.map(post_events, [args.url] * args.threads, [per_thread] * args.threads)
+        latencies = [latency for result in results for latency in result]
+    elapsed = time.perf_counter() - start
+
+    # 99 cut points, index N-1 is the Nth percentile
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f'{len(latencies)} requests, {args.threads} threads, {elapsed:.1f}s')
+    print(f'throughput: {len(latencies) / elapsed:.1f} req/s')
+    print(f'p50: {percentiles[49]:.1f}ms')
+    print(f'p90: {percentiles[89]:.1f}ms')
+    print(f'p99: {percentiles[98]:.1f}ms')
+    print(f'max: {max(latencies):.1f}ms')
+
+
+if __name__ == '__main__':
+    main()